@@ -3,7 +3,7 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
-from shema_api.data.base import SQLALCHEMY_DATABASE_URL
+from shema_api.data.base import DATABASE_URL, SQLALCHEMY_DATABASE_URL
 from shema_api.mod import models
 
 
@@ -18,6 +18,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Миграции идут в ту же базу, что и приложение (URL из окружения/.env)
+if SQLALCHEMY_DATABASE_URL or DATABASE_URL:
+    config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL or DATABASE_URL)
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -47,6 +51,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=models.include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +75,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # Поисковый индекс ведётся DDL-скриптами, а не метаданными
+            include_object=models.include_object,
         )
 
         with context.begin_transaction():
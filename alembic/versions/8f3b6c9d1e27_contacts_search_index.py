@@ -0,0 +1,68 @@
+"""contacts search index
+
+Revision ID: 8f3b6c9d1e27
+Revises: 5d0e7a1c2b43
+Create Date: 2026-10-18 11:02:17.504912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3b6c9d1e27'
+down_revision: Union[str, None] = '5d0e7a1c2b43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contacts_mod_fts USING fts5("
+    "first_name, last_name, email, content='contacts_mod', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS contacts_mod_fts_ai AFTER INSERT ON contacts_mod BEGIN "
+    "INSERT INTO contacts_mod_fts(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_mod_fts_ad AFTER DELETE ON contacts_mod BEGIN "
+    "INSERT INTO contacts_mod_fts(contacts_mod_fts, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_mod_fts_au AFTER UPDATE ON contacts_mod BEGIN "
+    "INSERT INTO contacts_mod_fts(contacts_mod_fts, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); "
+    "INSERT INTO contacts_mod_fts(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+    # Заполняем индекс уже существующими контактами
+    "INSERT INTO contacts_mod_fts(contacts_mod_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS contacts_mod_fts_au",
+    "DROP TRIGGER IF EXISTS contacts_mod_fts_ad",
+    "DROP TRIGGER IF EXISTS contacts_mod_fts_ai",
+    "DROP TABLE IF EXISTS contacts_mod_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_contacts_mod_search_trgm ON contacts_mod "
+    "USING gin ((first_name || ' ' || last_name || ' ' || email) gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_contacts_mod_search_trgm",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE}
+    for statement in statements.get(dialect, []):
+        op.execute(statement)
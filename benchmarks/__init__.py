@@ -0,0 +1 @@
+"""Module providing a function printing python version."""
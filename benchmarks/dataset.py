@@ -0,0 +1,88 @@
+"""Module providing a function printing python version."""
+
+import random
+from datetime import date, timedelta
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from shema_api.fun.hashing import pwd_context
+from shema_api.mod.models import Contact_mod, User_mod, birthday_key
+
+BENCH_PASSWORD = "benchpassword"
+
+FIRST_NAMES = (
+    "Anna", "Boris", "Daria", "Egor", "Ivan", "Irina", "Kirill", "Maria",
+    "Nikita", "Olga", "Pavel", "Sofia", "Taras", "Vera", "Yuri", "Zoya",
+)
+LAST_NAMES = (
+    "Bondar", "Hrytsenko", "Ivanova", "Kovalenko", "Lysenko", "Melnyk",
+    "Petrenko", "Savchenko", "Shevchenko", "Tkachenko",
+)
+
+
+def user_email(index: int) -> str:
+    """Function user_email printing python version."""
+    return f"bench-user-{index}@example.com"
+
+
+def contact_rows(owner_id: int, user_index: int, count: int, rng: random.Random):
+    """Function contact_rows printing python version."""
+    for n in range(count):
+        birthday = date(1960, 1, 1) + timedelta(days=rng.randrange(40 * 365))
+        yield {
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "email": f"c{user_index}-{n}@example.com",
+            "phone_number": f"+380{rng.randrange(10**9):09d}",
+            "birthday": birthday,
+            # Массовая вставка обходит валидатор модели
+            "birthday_mmdd": birthday_key(birthday),
+            "additional_info": None,
+            "owner_id": owner_id,
+        }
+
+
+def seed_dataset(
+    engine, users: int, contacts_per_user: int, seed: int = 0, batch_size: int = 5000
+) -> dict:
+    """Function seed_dataset printing python version."""
+    # Один и тот же seed даёт одинаковые данные на разных коммитах
+    rng = random.Random(seed)
+    # bcrypt дорогой, поэтому хеш один на всех пользователей
+    hashed = pwd_context.hash(BENCH_PASSWORD)
+    with Session(engine) as db:
+        user_ids = db.scalars(
+            insert(User_mod).returning(User_mod.id),
+            [
+                {
+                    "email": user_email(index),
+                    "first_name": f"Bench{index}",
+                    "hashed_password": hashed,
+                    "confirmed": True,
+                }
+                for index in range(users)
+            ],
+        ).all()
+        batch = []
+        for user_index, owner_id in enumerate(user_ids):
+            for row in contact_rows(owner_id, user_index, contacts_per_user, rng):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    db.execute(insert(Contact_mod), batch)
+                    batch = []
+        if batch:
+            db.execute(insert(Contact_mod), batch)
+        db.commit()
+
+        ranges = db.execute(
+            select(Contact_mod.owner_id, func.min(Contact_mod.id), func.max(Contact_mod.id))
+            .where(Contact_mod.owner_id.in_(user_ids))
+            .group_by(Contact_mod.owner_id)
+        ).all()
+    contact_ids = {owner_id: (low, high) for owner_id, low, high in ranges}
+    return {
+        "users": [
+            {"id": user_id, "email": user_email(index), "contacts": contact_ids.get(user_id)}
+            for index, user_id in enumerate(user_ids)
+        ],
+        "contacts": users * contacts_per_user,
+    }
@@ -0,0 +1,325 @@
+"""Module providing a function printing python version.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.run --users 1000 --contacts 10000 --output bench.json
+    python -m benchmarks.run --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+SCENARIOS = {
+    "contacts": lambda ctx, user, i: ("GET", "/contacts", {"params": {"limit": 100}}),
+    "contacts_page": lambda ctx, user, i: (
+        "GET",
+        "/contacts",
+        {"params": {"limit": 100, "cursor": user["contacts"][0] + 100}},
+    ),
+    "contact": lambda ctx, user, i: (
+        "GET",
+        f"/contacts/search_id/{ctx['rng'].randint(*user['contacts'])}",
+        {},
+    ),
+    "search": lambda ctx, user, i: (
+        "GET",
+        "/contacts/search",
+        {"params": {"q": ctx["rng"].choice(ctx["names"]), "limit": 20}},
+    ),
+    "birthdays": lambda ctx, user, i: (
+        "GET",
+        "/contacts/birthday-upcoming/0",
+        {"params": {"days": 30}},
+    ),
+    "sync": lambda ctx, user, i: ("GET", "/contacts/sync", {"params": {"limit": 500}}),
+    "create": lambda ctx, user, i: (
+        "POST",
+        "/contacts/create",
+        {
+            "json": {
+                "first_name": "Bench",
+                "last_name": "Create",
+                "email": f"new-{ctx['run']}-{user['id']}-{i}@example.com",
+            }
+        },
+    ),
+    "login": lambda ctx, user, i: (
+        "POST",
+        "/login",
+        {"data": {"username": user["email"], "password": ctx["password"]}, "auth": False},
+    ),
+}
+
+# Для диффа между коммитами важны задержки и пропускная способность
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "alloc_peak_kib")
+
+
+def percentile(ordered: list, q: float) -> float:
+    """Function percentile printing python version."""
+    if not ordered:
+        return 0.0
+    # Линейная интерполяция между соседними рангами
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(latencies: list, elapsed: float, statuses: dict) -> dict:
+    """Function summarize printing python version."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": sum(n for code, n in statuses.items() if int(code) >= 400),
+        "status": {str(code): n for code, n in sorted(statuses.items())},
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def compare(baseline: dict, current: dict) -> dict:
+    """Function compare printing python version."""
+    diff = {}
+    for name, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        diff[name] = {
+            metric: round((stats[metric] - before[metric]) / before[metric] * 100, 1)
+            for metric in COMPARED_METRICS
+            if before.get(metric) and metric in stats
+        }
+    return diff
+
+
+async def send(client, ctx: dict, name: str, i: int):
+    """Function send printing python version."""
+    user = ctx["users"][i % len(ctx["users"])]
+    method, url, kwargs = SCENARIOS[name](ctx, user, i)
+    headers = {}
+    if kwargs.pop("auth", True):
+        headers["Authorization"] = f"Bearer {ctx['tokens'][user['id']]}"
+    started = time.perf_counter()
+    response = await client.request(method, url, headers=headers, **kwargs)
+    return time.perf_counter() - started, response.status_code
+
+
+async def run_endpoint(
+    client, ctx: dict, name: str, requests: int, concurrency: int, warmup: int
+) -> dict:
+    """Function run_endpoint printing python version."""
+    for i in range(warmup):
+        await send(client, ctx, name, i)
+
+    latencies, statuses = [], {}
+    counter = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        for i in counter:
+            latency, code = await send(client, ctx, name, i)
+            latencies.append(latency)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, statuses)
+
+
+async def measure_allocations(
+    client, ctx: dict, name: str, requests: int, offset: int = 0
+) -> dict:
+    """Function measure_allocations printing python version."""
+    # tracemalloc сильно замедляет код, поэтому отдельный последовательный проход
+    peaks, retained = [], []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for i in range(offset, offset + requests):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await send(client, ctx, name, i)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    retained.sort()
+    return {
+        "alloc_peak_kib": round(percentile(peaks, 50) / 1024, 1),
+        "alloc_retained_bytes": int(percentile(retained, 50)),
+    }
+
+
+async def run_benchmarks(
+    app,
+    ctx: dict,
+    names: list,
+    requests: int = 200,
+    concurrency: int = 10,
+    warmup: int = 20,
+    alloc_requests: int = 20,
+) -> dict:
+    """Function run_benchmarks printing python version."""
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    # lifespan запускается вручную: ASGITransport его не вызывает
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in names:
+                stats = await run_endpoint(client, ctx, name, requests, concurrency, warmup)
+                if alloc_requests:
+                    # Номера запросов продолжаются, чтобы создаваемые email не повторялись
+                    allocations = await measure_allocations(
+                        client, ctx, name, alloc_requests, warmup + requests
+                    )
+                    stats.update(allocations)
+                results[name] = stats
+    return results
+
+
+def git_commit() -> str:
+    """Function git_commit printing python version."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    """Function parse_args printing python version."""
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints in-process")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=1000, help="Contacts per user")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--alloc-requests", type=int, default=20)
+    parser.add_argument(
+        "--endpoints",
+        default=",".join(SCENARIOS),
+        help=f"Comma separated subset of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to seed (default: fresh SQLite file in a temp directory)",
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Previous JSON results to compare against")
+    return parser.parse_args(argv)
+
+
+def configure_environment(database_url: str):
+    """Function configure_environment printing python version."""
+    # Всё задаётся до импорта приложения: настройки читаются при импорте модулей
+    os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+    os.environ.setdefault("MAIL_OUTBOX_WORKER", "false")
+    from shema_api.fun.rate_limit import DEFAULT_RATE_LIMITS
+
+    for name in DEFAULT_RATE_LIMITS:
+        env_name = "RATE_LIMIT_" + re.sub(r"[^A-Z0-9]+", "_", name.upper())
+        os.environ[env_name] = "1000000000/1"
+
+
+def main(argv=None) -> dict:
+    """Function main printing python version."""
+    args = parse_args(argv)
+    names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    database_url = args.database_url or (
+        f"sqlite:///{tempfile.mkdtemp(prefix='cont-bench-')}/bench.db"
+    )
+    configure_environment(database_url)
+    logging.disable(logging.WARNING)
+
+    from main import app
+    from shema_api.data.base import Base, engine
+    from shema_api.fun.utils import create_access_token
+    from benchmarks.dataset import BENCH_PASSWORD, FIRST_NAMES, seed_dataset
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    dataset = seed_dataset(engine, args.users, args.contacts, args.seed)
+    seed_seconds = time.perf_counter() - started
+
+    ctx = {
+        "users": dataset["users"],
+        "tokens": {
+            user["id"]: create_access_token({"sub": user["email"]}, expires_delta=3600)
+            for user in dataset["users"]
+        },
+        "names": FIRST_NAMES,
+        "password": BENCH_PASSWORD,
+        "rng": random.Random(args.seed),
+        "run": time.time_ns(),
+    }
+    endpoints = asyncio.run(
+        run_benchmarks(
+            app,
+            ctx,
+            names,
+            args.requests,
+            args.concurrency,
+            args.warmup,
+            args.alloc_requests,
+        )
+    )
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split("://")[0],
+            "users": args.users,
+            "contacts_per_user": args.contacts,
+            "seed": args.seed,
+            "seed_seconds": round(seed_seconds, 2),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "endpoints": endpoints,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["diff_percent"] = compare(json.load(f), report)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
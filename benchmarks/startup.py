@@ -0,0 +1,106 @@
+"""Module providing a function printing python version.
+
+Время холодного старта воркера, каждый замер в новом процессе:
+
+    python -m benchmarks.startup --runs 10 --max-import-ms 1500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.run import percentile
+
+# Выполняется в отдельном интерпретаторе: импорт, сборка приложения и lifespan
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.create_app()
+created = time.perf_counter()
+
+async def lifespan():
+    async with app.router.lifespan_context(app):
+        entered = time.perf_counter()
+    return entered
+
+entered = asyncio.run(lifespan())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "lifespan_ms": (entered - created) * 1000,
+    "modules": len(sys.modules),
+}))
+"""
+
+METRICS = ("import_ms", "create_app_ms", "lifespan_ms", "process_ms")
+
+
+def probe_once(env: dict) -> dict:
+    """Function probe_once printing python version."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - started) * 1000
+    return sample
+
+
+def measure(runs: int, env: dict) -> dict:
+    """Function measure printing python version."""
+    samples = [probe_once(env) for _ in range(runs)]
+    report = {"runs": runs, "modules": samples[-1]["modules"]}
+    for metric in METRICS:
+        values = sorted(sample[metric] for sample in samples)
+        report[metric] = {
+            "p50": round(percentile(values, 50), 1),
+            "max": round(values[-1], 1),
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    """Function main printing python version."""
+    parser = argparse.ArgumentParser(description="Measure application cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        help="Fail when the median import time of main.py exceeds this budget",
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    # Без фоновых задач и внешних сервисов: меряется только сам старт
+    env = dict(os.environ, MAIL_OUTBOX_WORKER="false", PYTHONDONTWRITEBYTECODE="1")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    # Сначала прогрев: байткод компилируется один раз и не искажает замеры
+    probe_once(env)
+    report = measure(args.runs, env)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+    if args.max_import_ms and report["import_ms"]["p50"] > args.max_import_ms:
+        print(
+            f"import main took {report['import_ms']['p50']} ms "
+            f"(budget {args.max_import_ms} ms)",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
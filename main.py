@@ -1,41 +1,43 @@
-import uvicorn
-import redis.asyncio as redis
-from fastapi import FastAPI, Depends
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_limiter import FastAPILimiter
-from fastapi_limiter.depends import RateLimiter
-from shema_api.rout import contacts, auth, ava, email, reset
-from shema_api.data.base import engine
-from shema_api.mod import models
-from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from shema_api.config import env_flag
+from shema_api.rout import contacts, auth, ava, email, reset
+from shema_api.data.base import DB_QUERY_STATS, engine, async_engine, get_pool_metrics
+from shema_api.fun.contact_cache import contact_cache, use_redis_for_contact_cache
+from shema_api.fun.dependencies import token_cache, use_redis_for_user_cache, user_cache
+from shema_api.fun.email_templates import precompile_templates
+from shema_api.fun.hashing import hash_pool
+from shema_api.fun.mailer import outbox_worker
+from shema_api.fun.metrics import MetricsMiddleware, metrics_refresher, render_metrics
+from shema_api.fun.query_stats import QueryStatsMiddleware
+from shema_api.fun.rate_limit import limiter, rate_limit
+from shema_api.fun.storage import (
+    AVATAR_LOCAL_DIR,
+    AVATAR_LOCAL_URL,
+    AVATAR_STORAGE,
+    ImmutableStaticFiles,
+    UploadLimitMiddleware,
+)
 
-# Создание таблиц БД
-models.Base.metadata.create_all(bind=engine)
+# Схема БД ведётся только миграциями: alembic upgrade head
 
-# Инициализация FastAPI
-app = FastAPI()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+USER_CACHE_REDIS = env_flag("USER_CACHE_REDIS", "false")
+CONTACT_CACHE_REDIS = env_flag("CONTACT_CACHE_REDIS", "false")
+RATE_LIMIT_REDIS = env_flag("RATE_LIMIT_REDIS", "false")
+MAIL_OUTBOX_WORKER = env_flag("MAIL_OUTBOX_WORKER", "true")
 
 # CORS middleware
 origins = [
     "http://localhost:3000",
     "https://example.com",
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Подключение роутеров
-app.include_router(contacts.router, tags=["contacts"])
-app.include_router(auth.router, tags=["auth"])
-app.include_router(ava.router, tags=["auth"])
-app.include_router(email.router, tags=["email"])
-app.include_router(reset.router, tags=["password-reset"])
 
+router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -46,26 +48,131 @@ def get_token(token: str = Depends(oauth2_scheme)):
             detail="Invalid token",
         )
     return token
-# Пример с ограничением запросов
-@app.get("/limited")
+# Пример с ограничением запросов (на токен)
+@router.get(
+    "/limited",
+    tags=["rate limiting"],
+    dependencies=[Depends(rate_limit("limited", per="token"))],
+)
 async def limited_endpoint(token: str = Depends(get_token)):
     return {"message": "This endpoint is rate limited to 5 requests per minute."}
 
 
 # Пример без ограничения запросов
-@app.get("/unlimited", tags=["rate limiting"])
+@router.get("/unlimited", tags=["rate limiting"])
 async def unlimited_endpoint():
     """Function unlimited_endpoint printing python version."""
     return {"message": "This endpoint has no rate limiting."}
 
-redis_url = "redis://localhost:6379"  # Adjust this to your Redis URL
-redis = redis.from_url(redis_url)
+@router.get("/db-pool", tags=["metrics"])
+async def db_pool_metrics():
+    """Function db_pool_metrics printing python version."""
+    return {
+        "sync": get_pool_metrics(engine),
+        "async": get_pool_metrics(async_engine),
+    }
+
+@router.get("/cache", tags=["metrics"])
+async def cache_metrics():
+    """Function cache_metrics printing python version."""
+    return {
+        cache.name: cache.stats() for cache in (token_cache, user_cache, contact_cache)
+    }
+
+@router.get("/rate-limit", tags=["metrics"])
+async def rate_limit_metrics():
+    """Function rate_limit_metrics printing python version."""
+    return limiter.stats()
+
+@router.get("/mail-outbox", tags=["metrics"])
+async def mail_outbox_metrics():
+    """Function mail_outbox_metrics printing python version."""
+    return await outbox_worker.stats()
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Function prometheus_metrics printing python version."""
+    body, content_type = await render_metrics()
+    return Response(content=body, media_type=content_type)
+
 
-@app.on_event("startup")
-async def startup():
-    # Инициализация FastAPILimiter с нужными параметрами, например, подключение к Redis
-    await FastAPILimiter.init(redis)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Function lifespan printing python version."""
+    # Подключения и фоновые задачи создаются при старте воркера, а не при импорте
+    redis_client = None
+    if RATE_LIMIT_REDIS or USER_CACHE_REDIS or CONTACT_CACHE_REDIS:
+        import redis.asyncio as redis
 
-# Точка входа для запуска приложения
+        redis_client = redis.from_url(REDIS_URL)
+    # Лимиты считаются локально; с Redis счётчики узлов сводятся пачками
+    if RATE_LIMIT_REDIS:
+        limiter.use_redis(redis_client)
+        limiter.start()
+    # Шаблоны писем компилируются один раз при старте
+    precompile_templates()
+    if USER_CACHE_REDIS:
+        use_redis_for_user_cache(redis_client)
+    if CONTACT_CACHE_REDIS:
+        use_redis_for_contact_cache(redis_client)
+    if MAIL_OUTBOX_WORKER:
+        outbox_worker.start()
+    metrics_refresher.start()
+    try:
+        yield
+    finally:
+        # Дожидаемся текущей пачки писем и закрываем SMTP-соединение
+        await outbox_worker.stop()
+        await limiter.stop()
+        await metrics_refresher.stop()
+        # shutdown(wait=True) ждёт потоки bcrypt — не на цикле событий
+        await asyncio.to_thread(hash_pool.shutdown)
+        if redis_client is not None:
+            await redis_client.aclose()
+
+
+def create_app() -> FastAPI:
+    """Function create_app printing python version."""
+    app = FastAPI(lifespan=lifespan)
+
+    # Слишком большая загрузка аватара отклоняется до разбора формы
+    # (самый внутренний слой: ответ всё равно получает CORS-заголовки и метрики)
+    app.add_middleware(UploadLimitMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Метрики Prometheus: задержки, запросы в работе, число SQL на запрос
+    # (внутри QueryStatsMiddleware, чтобы видеть статистику запросов к БД)
+    app.add_middleware(MetricsMiddleware)
+    # Число запросов к БД и время в БД по каждому HTTP-запросу
+    if DB_QUERY_STATS:
+        app.add_middleware(QueryStatsMiddleware)
+
+    # Подключение роутеров
+    app.include_router(contacts.router, tags=["contacts"])
+    app.include_router(auth.router, tags=["auth"])
+    app.include_router(ava.router, tags=["auth"])
+    app.include_router(email.router, tags=["email"])
+    app.include_router(reset.router, tags=["password-reset"])
+    app.include_router(router)
+
+    # Локальное хранилище аватаров (для разработки и тестов)
+    if AVATAR_STORAGE == "local":
+        os.makedirs(AVATAR_LOCAL_DIR, exist_ok=True)
+        app.mount(
+            AVATAR_LOCAL_URL, ImmutableStaticFiles(directory=AVATAR_LOCAL_DIR), name="media"
+        )
+    return app
+
+
+app = create_app()
+
+# Точка входа для разработки; продакшен: python -m shema_api.fun.server
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", port=8000, reload=True)
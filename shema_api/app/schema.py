@@ -1,8 +1,8 @@
 """Module providing a function printing python version."""
 
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
-from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from datetime import date, datetime
 
 class ContactBase(BaseModel):
     """Class ContactBase representing a person"""
@@ -36,6 +36,68 @@ class ContactResponse(ContactBase):
         """Class ConfigContactResponse representing a person"""
         from_attributes = True
 
+class ContactSyncItem(ContactResponse):
+    """Class ContactSyncItem representing a person"""
+    updated_at: Optional[datetime] = None
+
+class ContactSyncResponse(BaseModel):
+    """Class ContactSyncResponse representing a person"""
+    changed: List[ContactSyncItem]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
+
+class ContactPatch(BaseModel):
+    """Class ContactPatch representing a person"""
+    first_name: Optional[str] = Field(None, max_length=50)
+    last_name: Optional[str] = Field(None, max_length=50)
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = Field(None, max_length=15)
+    birthday: Optional[date] = None
+    additional_info: Optional[str] = None
+
+    @field_validator("first_name", "last_name", "email", mode="before")
+    @classmethod
+    def _not_null(cls, value):
+        # Колонки NOT NULL: явный null — ошибка запроса (422), а не конфликт в БД
+        if value is None:
+            raise ValueError("Field cannot be null")
+        return value
+
+class ContactFilter(BaseModel):
+    """Class ContactFilter representing a person"""
+    first_name: Optional[str] = Field(None, max_length=50)
+    last_name: Optional[str] = Field(None, max_length=50)
+    email: Optional[str] = Field(None, max_length=100)
+    updated_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        # Пустой фильтр задел бы все контакты владельца
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("Filter needs at least one condition")
+        return self
+
+class ContactBatchDelete(BaseModel):
+    """Class ContactBatchDelete representing a person"""
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[ContactFilter] = None
+
+    @model_validator(mode="after")
+    def _ids_or_filter(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Pass either ids or filter")
+        return self
+
+class ContactBatchUpdate(ContactBatchDelete):
+    """Class ContactBatchUpdate representing a person"""
+    patch: ContactPatch
+
+class ContactBatchResult(BaseModel):
+    """Class ContactBatchResult representing a person"""
+    affected: int
+    ids: List[int]
+
 class UserCreate(BaseModel):
     """Class UserCreate representing a person"""
     email: EmailStr
@@ -1,23 +1,45 @@
 """Module providing a function printing python version."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from fastapi_mail import ConnectionConfig
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=".env")
 
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
-    MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
-    MAIL_FROM=os.getenv("MAIL_FROM"),
-    MAIL_PORT=int(os.getenv("MAIL_PORT")),
-    MAIL_SERVER=os.getenv("MAIL_SERVER"),
-    MAIL_FROM_NAME=os.getenv("MAIL_FROM_NAME"),
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=True,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / 'temp',
-)
\ No newline at end of file
+def env_flag(name: str, default: str) -> bool:
+    """Function env_flag printing python version."""
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+TEMPLATE_FOLDER = Path(__file__).parent / 'temp'
+
+
+@lru_cache(maxsize=None)
+def get_mail_config():
+    """Function get_mail_config printing python version."""
+    # fastapi_mail тянет за собой много модулей, импортируем при первом письме
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
+        MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
+        MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
+        MAIL_FROM=os.getenv("MAIL_FROM"),
+        MAIL_PORT=int(os.getenv("MAIL_PORT")),
+        MAIL_SERVER=os.getenv("MAIL_SERVER"),
+        MAIL_FROM_NAME=os.getenv("MAIL_FROM_NAME"),
+        # Для MailHog: MAIL_SSL_TLS=false, USE_CREDENTIALS=false
+        MAIL_STARTTLS=env_flag("MAIL_STARTTLS", "false"),
+        MAIL_SSL_TLS=env_flag("MAIL_SSL_TLS", "true"),
+        USE_CREDENTIALS=env_flag("USE_CREDENTIALS", "true"),
+        VALIDATE_CERTS=env_flag("VALIDATE_CERTS", "true"),
+        TEMPLATE_FOLDER=TEMPLATE_FOLDER,
+    )
+
+
+def __getattr__(name):
+    # Старый импорт "from shema_api.config import conf" продолжает работать
+    if name == "conf":
+        return get_mail_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,17 @@
 """Module providing a function printing python version."""
 
 import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 
 load_dotenv(dotenv_path=".env")
@@ -12,12 +20,224 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL")
 
-SQLALCHEMY_DATABASE_URLS = "sqlite:///./test.db"
+SQLALCHEMY_DATABASE_URLS = (
+    SQLALCHEMY_DATABASE_URL or DATABASE_URL or "sqlite:///./test.db"
+)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URLS)
+# Настройки пула соединений (задаются через .env для каждого деплоя)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+# Учёт запросов к БД по каждому HTTP-запросу (число, время, самый медленный)
+DB_QUERY_STATS = os.getenv("DB_QUERY_STATS", "true").lower() in ("1", "true", "yes")
+
+# Асинхронные драйверы для синхронных URL (sqlite -> aiosqlite, postgres -> asyncpg)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Function to_async_url printing python version."""
+    sa_url = make_url(url)
+    backend = sa_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return url
+    return sa_url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URLS)
+
+
+class TimedPoolMixin:
+    """Class TimedPoolMixin representing a person"""
+
+    wait_count = 0
+    wait_time_total = 0.0
+    wait_time_max = 0.0
+    timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    """Class TimedQueuePool representing a person"""
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    """Class TimedAsyncAdaptedQueuePool representing a person"""
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Function engine_options printing python version."""
+    sa_url = make_url(url)
+    backend = sa_url.get_backend_name()
+    options = {"echo": DB_ECHO}
+
+    # SQLite в памяти живёт в одном соединении — пул для него не настраиваем
+    if backend == "sqlite" and sa_url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+def get_pool_metrics(db_engine) -> dict:
+    """Function get_pool_metrics printing python version."""
+    pool = getattr(db_engine, "sync_engine", db_engine).pool
+    metrics = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, TimedPoolMixin):
+        metrics.update(
+            wait_count=pool.wait_count,
+            wait_time_total=pool.wait_time_total,
+            wait_time_max=pool.wait_time_max,
+            timeouts=pool.timeouts,
+        )
+    return metrics
+
+
+class QueryStats:
+    """Class QueryStats representing a person"""
+
+    __slots__ = ("count", "total", "slowest", "slowest_time", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = None
+        self.slowest_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        """Function record printing python version."""
+        self.count += 1
+        self.total += elapsed
+        self.statements[statement] += 1
+        if self.slowest is None or elapsed > self.slowest_time:
+            self.slowest, self.slowest_time = statement, elapsed
+
+    def repeated(self, threshold: int) -> list:
+        """Function repeated printing python version."""
+        # Один и тот же SQL много раз за запрос — типичный признак N+1
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# Статистика текущего HTTP-запроса; задаётся middleware, None вне запроса
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+# Дополнительные счётчики (count_queries в тестах), видят запросы из всех потоков
+_query_listeners = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for listener in _query_listeners:
+        listener.record(statement, elapsed)
+
+
+def instrument_engine(db_engine):
+    """Function instrument_engine printing python version."""
+    # У AsyncEngine события вешаются на синхронный движок внутри
+    sync_engine = getattr(db_engine, "sync_engine", db_engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return db_engine
+
+
+@contextmanager
+def count_queries():
+    """Function count_queries printing python version."""
+    stats = QueryStats()
+    _query_listeners.append(stats)
+    try:
+        yield stats
+    finally:
+        _query_listeners.remove(stats)
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URLS, **engine_options(SQLALCHEMY_DATABASE_URLS)
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True)
+)
+
+if DB_QUERY_STATS:
+    instrument_engine(engine)
+    instrument_engine(async_engine)
+
+
+def _reset_pools_after_fork():
+    # Соединения мастера не переиспользуются в воркере (preload через fork):
+    # пул забывает их, не закрывая, и воркер открывает свои
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -28,3 +248,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Function get_async_db printing python version."""
+    async with AsyncSessionLocal() as db:
+        yield db
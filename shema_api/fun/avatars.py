@@ -0,0 +1,130 @@
+"""Module providing a function printing python version."""
+
+import asyncio
+import hashlib
+import io
+import os
+from typing import BinaryIO, Dict, Iterable
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from shema_api.fun.cache import TTLCache
+from shema_api.fun.storage import (
+    IMAGE_CONTENT_TYPES,
+    IMAGE_EXTENSIONS,
+    UPLOAD_CHUNK_SIZE,
+    StorageBackend,
+)
+
+load_dotenv(dotenv_path=".env")
+
+AVATAR_SIZES = tuple(
+    sorted(int(size) for size in os.getenv("AVATAR_SIZES", "32,128").split(","))
+)
+AVATAR_MAX_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", str(40_000_000)))
+IMAGE_FORMATS = {"jpeg": "JPEG", "png": "PNG"}
+
+# Ключ - sha256 исходного файла, значение - {размер: URL}
+variants_cache = TTLCache(maxsize=1024, ttl=24 * 3600)
+# Ключ - md5 email (как у Gravatar) и набор размеров
+gravatar_cache = TTLCache(maxsize=4096, ttl=24 * 3600)
+
+
+def content_hash(fileobj: BinaryIO) -> str:
+    """Function content_hash printing python version."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(UPLOAD_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def resize_avatar(
+    fileobj: BinaryIO, kind: str, sizes: Iterable[int] = AVATAR_SIZES
+) -> Dict[int, bytes]:
+    """Function resize_avatar printing python version."""
+    # Pillow нужен только при загрузке аватара, не при старте приложения
+    from PIL import Image, ImageOps
+
+    sizes = sorted(sizes, reverse=True)
+    with Image.open(fileobj) as image:
+        if image.width * image.height > AVATAR_MAX_PIXELS:
+            raise ValueError("Image is too large")
+        if kind == "jpeg":
+            # JPEG декодируется сразу в уменьшенном масштабе (DCT scaling)
+            image.draft("RGB", (sizes[0], sizes[0]))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA" if kind == "png" else "RGB")
+
+        thumbnails = {}
+        source = image
+        for size in sizes:
+            # Каждый следующий размер строится из предыдущего, а не из оригинала
+            source = ImageOps.fit(source, (size, size), Image.Resampling.LANCZOS)
+            if kind == "jpeg" and source.mode != "RGB":
+                source = source.convert("RGB")
+            buffer = io.BytesIO()
+            options = {"quality": 85} if kind == "jpeg" else {}
+            source.save(buffer, format=IMAGE_FORMATS[kind], optimize=True, **options)
+            thumbnails[size] = buffer.getvalue()
+    return thumbnails
+
+
+async def store_avatar_variants(
+    fileobj: BinaryIO,
+    kind: str,
+    storage: StorageBackend,
+    sizes: Iterable[int] = AVATAR_SIZES,
+) -> Dict[str, str]:
+    """Function store_avatar_variants printing python version."""
+    digest = await asyncio.to_thread(content_hash, fileobj)
+    cached = variants_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    from PIL import Image
+
+    try:
+        thumbnails = await asyncio.to_thread(resize_avatar, fileobj, kind, sizes)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise HTTPException(status_code=400, detail="Invalid image file.")
+
+    extension = IMAGE_EXTENSIONS[kind]
+    sizes = sorted(thumbnails)
+    urls = await asyncio.gather(
+        *(
+            storage.save_async(
+                io.BytesIO(thumbnails[size]),
+                f"avatars/{digest[:32]}/{size}.{extension}",
+                IMAGE_CONTENT_TYPES[kind],
+            )
+            for size in sizes
+        )
+    )
+    variants = {str(size): url for size, url in zip(sizes, urls)}
+    variants_cache.set(digest, variants)
+    return variants
+
+
+def email_hash(email: str) -> str:
+    """Function email_hash printing python version."""
+    return hashlib.md5(email.strip().lower().encode("utf-8")).hexdigest()
+
+
+def gravatar_variants(email: str, sizes: Iterable[int] = AVATAR_SIZES) -> Dict[str, str]:
+    """Function gravatar_variants printing python version."""
+    sizes = tuple(sorted(sizes))
+    key = (email_hash(email), sizes)
+    variants = gravatar_cache.get(key)
+    if variants is None:
+        from libgravatar import Gravatar
+
+        gravatar = Gravatar(email)
+        variants = {str(size): gravatar.get_image(size=size) for size in sizes}
+        gravatar_cache.set(key, variants)
+    return variants
+
+
+def default_avatar(variants: Dict[str, str]) -> str:
+    """Function default_avatar printing python version."""
+    return variants[max(variants, key=int)]
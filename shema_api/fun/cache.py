@@ -0,0 +1,140 @@
+"""Module providing a function printing python version."""
+
+import json
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Class TTLCache representing a person"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Function get printing python version."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        """Function set printing python version."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        """Function delete printing python version."""
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Function clear printing python version."""
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """Class RedisCache representing a person"""
+
+    def __init__(self, client, prefix: str):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key):
+        """Function get printing python version."""
+        raw = await self.client.get(self._key(key))
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key, value, ttl: float):
+        """Function set printing python version."""
+        await self.client.set(
+            self._key(key), json.dumps(value, default=str), ex=max(int(ttl), 1)
+        )
+
+    async def delete(self, *keys):
+        """Function delete printing python version."""
+        if keys:
+            await self.client.delete(*(self._key(key) for key in keys))
+
+
+class TieredCache:
+    """Class TieredCache representing a person"""
+
+    # Пока подключён Redis, локальная копия живёт недолго, чтобы инвалидация
+    # из другого воркера доходила быстро
+    local_ttl_with_remote = 5
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.remote = None
+        self.hits = 0
+        self.misses = 0
+
+    def use_redis(self, client):
+        """Function use_redis printing python version."""
+        self.remote = RedisCache(client, prefix=f"cache:{self.name}")
+        self.local.ttl = min(self.ttl, self.local_ttl_with_remote)
+
+    async def get(self, key):
+        """Function get printing python version."""
+        value = self.local.get(key)
+        if value is None and self.remote is not None:
+            value = await self.remote.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key, value, ttl: float = None):
+        """Function set printing python version."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self.local.set(key, value, ttl)
+        if self.remote is not None:
+            await self.remote.set(key, value, ttl)
+
+    async def delete(self, *keys):
+        """Function delete printing python version."""
+        self.local.delete(*keys)
+        if self.remote is not None:
+            await self.remote.delete(*keys)
+
+    def stats(self) -> dict:
+        """Function stats printing python version."""
+        total = self.hits + self.misses
+        return {
+            "backend": "redis" if self.remote is not None else "memory",
+            "size": len(self.local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
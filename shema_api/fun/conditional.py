@@ -0,0 +1,71 @@
+"""Module providing a function printing python version."""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable
+from fastapi import Request, Response
+
+
+def as_utc(value: datetime) -> datetime:
+    """Function as_utc printing python version."""
+    # В БД время хранится без зоны, в UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def contact_validators(contacts: Iterable, last_modified: bool = True) -> Dict[str, str]:
+    """Function contact_validators printing python version."""
+    # ETag считается по id и updated_at, тело ответа не сериализуется
+    digest = hashlib.sha256()
+    newest = None
+    for contact in contacts:
+        updated_at = contact.updated_at
+        stamp = updated_at.isoformat() if updated_at else ""
+        digest.update(f"{contact.id}:{stamp};".encode("ascii"))
+        if updated_at and (newest is None or updated_at > newest):
+            newest = updated_at
+    headers = {
+        "ETag": f'"{digest.hexdigest()[:32]}"',
+        "Cache-Control": "private, no-cache",
+    }
+    if last_modified and newest is not None:
+        headers["Last-Modified"] = format_datetime(as_utc(newest), usegmt=True)
+    return headers
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Function etag_matches printing python version."""
+    # Для If-None-Match используется слабое сравнение (RFC 9110, 13.1.2)
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """Function is_not_modified printing python version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, headers["ETag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def conditional_response(request: Request, response: Response, headers: Dict[str, str]):
+    """Function conditional_response printing python version."""
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
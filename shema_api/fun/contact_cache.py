@@ -0,0 +1,127 @@
+"""Module providing a function printing python version."""
+
+import os
+import time
+from datetime import date, datetime
+from typing import List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import Date, DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from shema_api.fun.cache import TieredCache
+from shema_api.fun.serialization import ContactRow, select_contact_rows
+from shema_api.mod.models import Contact_mod
+
+load_dotenv(dotenv_path=".env")
+
+CONTACT_CACHE_TTL = int(os.getenv("CONTACT_CACHE_TTL", "300"))
+CONTACT_CACHE_SIZE = int(os.getenv("CONTACT_CACHE_SIZE", "50000"))
+
+# "<owner>:v" -> версия данных владельца, "<owner>:<версия>:<id>" -> снимок контакта,
+# "<owner>:list:<версия>:<cursor>:<limit>" -> страница строк (списки значений)
+contact_cache = TieredCache("contact", maxsize=CONTACT_CACHE_SIZE, ttl=CONTACT_CACHE_TTL)
+
+
+def use_redis_for_contact_cache(client):
+    """Function use_redis_for_contact_cache printing python version."""
+    contact_cache.use_redis(client)
+
+
+def dump_contact(contact: Contact_mod) -> dict:
+    """Function dump_contact printing python version."""
+    snapshot = {}
+    for column in Contact_mod.__table__.columns:
+        value = getattr(contact, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        snapshot[column.key] = value
+    return snapshot
+
+
+def load_contact(snapshot: dict) -> Contact_mod:
+    """Function load_contact printing python version."""
+    values = dict(snapshot)
+    for column in Contact_mod.__table__.columns:
+        value = values.get(column.key)
+        if not isinstance(value, str):
+            continue
+        if isinstance(column.type, DateTime):
+            values[column.key] = datetime.fromisoformat(value)
+        elif isinstance(column.type, Date):
+            values[column.key] = date.fromisoformat(value)
+    contact = Contact_mod(**values)
+    make_transient_to_detached(contact)
+    return contact
+
+
+async def list_version(owner_id: int) -> int:
+    """Function list_version printing python version."""
+    version = await contact_cache.get(f"{owner_id}:v")
+    if version is None:
+        version = time.time_ns()
+        await contact_cache.set(f"{owner_id}:v", version)
+    return version
+
+
+async def invalidate_contacts(owner_id: int):
+    """Function invalidate_contacts printing python version."""
+    # Новая версия делает все закешированные контакты и страницы владельца недостижимыми
+    await contact_cache.set(f"{owner_id}:v", time.time_ns())
+
+
+async def get_contact_cached(
+    db: AsyncSession, owner_id: int, contact_id: int
+) -> Optional[Contact_mod]:
+    """Function get_contact_cached printing python version."""
+    # Версия читается до запроса к БД: если запись закоммитят и сбросят кеш, пока мы
+    # читаем старую строку, снимок ляжет под старой версией и больше не будет прочитан
+    version = await list_version(owner_id)
+    key = f"{owner_id}:{version}:{contact_id}"
+    snapshot = await contact_cache.get(key)
+    if snapshot is not None:
+        return load_contact(snapshot)
+    contact = await db.scalar(
+        select(Contact_mod).where(
+            Contact_mod.id == contact_id, Contact_mod.owner_id == owner_id
+        )
+    )
+    if contact is not None:
+        await contact_cache.set(key, dump_contact(contact))
+    return contact
+
+
+def dump_row(row) -> list:
+    """Function dump_row printing python version."""
+    return [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in row
+    ]
+
+
+def load_row(values: list) -> ContactRow:
+    """Function load_row printing python version."""
+    row = ContactRow(*values)
+    # В кеше даты хранятся строками ISO
+    birthday, updated_at = row.birthday, row.updated_at
+    if isinstance(birthday, str):
+        birthday = date.fromisoformat(birthday)
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+    return row._replace(birthday=birthday, updated_at=updated_at)
+
+
+async def get_contact_page_cached(
+    db: AsyncSession, owner_id: int, cursor: Optional[int], limit: int
+) -> List[ContactRow]:
+    """Function get_contact_page_cached printing python version."""
+    version = await list_version(owner_id)
+    key = f"{owner_id}:list:{version}:{cursor}:{limit}"
+    cached = await contact_cache.get(key)
+    if cached is not None:
+        return [load_row(values) for values in cached]
+    query = select_contact_rows().where(Contact_mod.owner_id == owner_id)
+    if cursor is not None:
+        query = query.where(Contact_mod.id > cursor)
+    rows = (await db.execute(query.order_by(Contact_mod.id).limit(limit))).all()
+    await contact_cache.set(key, [dump_row(row) for row in rows])
+    return [ContactRow(*row) for row in rows]
@@ -0,0 +1,297 @@
+"""Module providing a function printing python version."""
+
+import codecs
+import csv
+import io
+import json
+import re
+import zlib
+from shema_api.app.schema import ContactResponse
+
+CONTACT_FIELDS = [
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "birthday",
+    "additional_info",
+]
+
+IMPORT_FORMATS = {
+    "application/json": "json",
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "text/vcard": "vcard",
+    "text/x-vcard": "vcard",
+    "text/directory": "vcard",
+}
+
+
+def detect_format(content_type: str) -> str:
+    """Function detect_format printing python version."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return IMPORT_FORMATS.get(media_type)
+
+
+async def iter_text_lines(chunks, encoding: str = "utf-8"):
+    """Function iter_text_lines printing python version."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    tail = ""
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        lines = tail.splitlines(keepends=True)
+        # Последняя строка может быть неполной — ждём следующий кусок
+        tail = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Один контакт в JSON не может быть больше этого (символов)
+JSON_MAX_ITEM_CHARS = 64 * 1024
+
+
+async def parse_json(chunks, max_item_chars: int = JSON_MAX_ITEM_CHARS):
+    """Function parse_json printing python version."""
+    # Массив разбирается по элементам по мере прихода кусков: в памяти только
+    # текущий контакт, а не всё тело запроса
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    source = chunks.__aiter__()
+    buffer, pos = "", 0
+    state = "start"  # start -> first -> (item -> next)* -> end
+    final = False
+    while True:
+        pos = JSON_WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array of contacts")
+                pos, state = pos + 1, "first"
+                continue
+            if state == "first" and char == "]":
+                pos, state = pos + 1, "end"
+                continue
+            if state in ("first", "item"):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Элемент ещё не пришёл целиком
+                    if final:
+                        raise
+                    if len(buffer) - pos > max_item_chars:
+                        raise ValueError("Contact in JSON array is too large")
+                else:
+                    # Число на границе куска могло оборваться — ждём разделитель
+                    if end < len(buffer) or final:
+                        yield item
+                        pos, state = end, "next"
+                        continue
+            elif state == "next":
+                if char not in ",]":
+                    raise ValueError("Expected ',' or ']' in JSON array")
+                pos, state = pos + 1, "item" if char == "," else "end"
+                continue
+            else:
+                raise ValueError("Unexpected data after JSON array")
+        if final:
+            # Пустое тело — пустой импорт
+            if state not in ("start", "end"):
+                raise ValueError("Unexpected end of JSON array")
+            return
+        buffer = buffer[pos:]
+        pos = 0
+        try:
+            buffer += utf8.decode(await source.__anext__())
+        except StopAsyncIteration:
+            buffer += utf8.decode(b"", final=True)
+            final = True
+
+
+async def parse_csv(chunks):
+    """Function parse_csv printing python version."""
+    header = None
+    pending = ""
+    async for line in iter_text_lines(chunks):
+        pending += line
+        # Поле в кавычках может содержать перевод строки
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [value.strip().lower().lstrip("\ufeff") for value in values]
+            continue
+        yield {
+            key: value.strip() or None
+            for key, value in zip(header, values)
+            if key in CONTACT_FIELDS
+        }
+
+
+def _vcard_unescape(value: str) -> str:
+    return re.sub(
+        r"\\([\\;,nN])",
+        lambda m: "\n" if m.group(1) in "nN" else m.group(1),
+        value,
+    )
+
+
+def _vcard_birthday(value: str):
+    digits = value.replace("-", "")
+    if len(digits) == 8 and digits.isdigit():
+        return f"{digits[:4]}-{digits[4:6]}-{digits[6:]}"
+    return value or None
+
+
+def vcard_to_contact(properties: list) -> dict:
+    """Function vcard_to_contact printing python version."""
+    contact = {}
+    for name, value in properties:
+        if name == "N" and "last_name" not in contact:
+            parts = value.split(";")
+            contact["last_name"] = _vcard_unescape(parts[0]) or None
+            if len(parts) > 1:
+                contact["first_name"] = _vcard_unescape(parts[1]) or None
+        elif name == "FN" and not contact.get("first_name"):
+            full_name = _vcard_unescape(value).split(" ", 1)
+            contact["first_name"] = full_name[0]
+            if len(full_name) > 1 and not contact.get("last_name"):
+                contact["last_name"] = full_name[1]
+        elif name == "EMAIL" and "email" not in contact:
+            contact["email"] = value.strip()
+        elif name == "TEL" and "phone_number" not in contact:
+            contact["phone_number"] = value.strip()
+        elif name == "BDAY":
+            contact["birthday"] = _vcard_birthday(value.strip())
+        elif name == "NOTE":
+            contact["additional_info"] = _vcard_unescape(value)
+    return contact
+
+
+async def parse_vcards(chunks):
+    """Function parse_vcards printing python version."""
+    properties = None
+    current = None
+
+    def flush():
+        if properties is not None and current is not None:
+            properties.append(current)
+
+    async for raw_line in iter_text_lines(chunks):
+        line = raw_line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            # Перенос длинной строки (RFC 6350, 3.2)
+            if current is not None:
+                current = (current[0], current[1] + line[1:])
+            continue
+        flush()
+        current = None
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        name = key.split(";")[0].split(".")[-1].upper()
+        if name == "BEGIN" and value.strip().upper() == "VCARD":
+            properties = []
+        elif name == "END" and value.strip().upper() == "VCARD":
+            if properties is not None:
+                yield vcard_to_contact(properties)
+            properties = None
+        elif properties is not None:
+            current = (name, value)
+    flush()
+
+
+PARSERS = {"json": parse_json, "csv": parse_csv, "vcard": parse_vcards}
+
+
+EXPORT_MEDIA_TYPES = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "vcard": ("text/vcard; charset=utf-8", "vcf"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def contact_to_ndjson(contact) -> str:
+    """Function contact_to_ndjson printing python version."""
+    return ContactResponse.model_validate(contact).model_dump_json() + "\n"
+
+
+def contact_to_csv(contact) -> str:
+    """Function contact_to_csv printing python version."""
+    values = [getattr(contact, field) for field in CONTACT_FIELDS]
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(["" if value is None else value for value in values])
+    return buffer.getvalue()
+
+
+def _vcard_escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def contact_to_vcard(contact) -> str:
+    """Function contact_to_vcard printing python version."""
+    first_name = _vcard_escape(contact.first_name)
+    last_name = _vcard_escape(contact.last_name)
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"N:{last_name};{first_name};;;",
+        f"FN:{first_name} {last_name}",
+        f"EMAIL:{contact.email}",
+    ]
+    if contact.phone_number:
+        lines.append(f"TEL:{_vcard_escape(contact.phone_number)}")
+    if contact.birthday:
+        lines.append(f"BDAY:{contact.birthday.isoformat()}")
+    if contact.additional_info:
+        lines.append(f"NOTE:{_vcard_escape(contact.additional_info)}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+
+SERIALIZERS = {
+    "csv": contact_to_csv,
+    "vcard": contact_to_vcard,
+    "ndjson": contact_to_ndjson,
+}
+
+
+async def export_chunks(contacts, export_format: str, buffer_size: int = 64 * 1024):
+    """Function export_chunks printing python version."""
+    serialize = SERIALIZERS[export_format]
+    parts, size = [], 0
+    if export_format == "csv":
+        parts.append(",".join(CONTACT_FIELDS) + "\r\n")
+    async for contact in contacts:
+        part = serialize(contact)
+        parts.append(part)
+        size += len(part)
+        # Копим строки в буфер, чтобы не отправлять клиенту мелкие куски
+        if size >= buffer_size:
+            yield "".join(parts).encode("utf-8")
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+async def gzip_chunks(chunks, level: int = 6):
+    """Function gzip_chunks printing python version."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
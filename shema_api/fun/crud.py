@@ -1,14 +1,47 @@
 """Module providing a function printing python version."""
 
+import base64
+import json
+import logging
 import os
+import re
 import bcrypt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from jose import jwt
-from libgravatar import Gravatar
-from passlib.context import CryptContext
+from pydantic import ValidationError
+from sqlalchemy import (
+    and_,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from shema_api.mod.models import Contact_mod, User_mod, User
+from shema_api.data.base import AsyncSessionLocal
+from shema_api.fun.avatars import default_avatar, gravatar_variants
+from shema_api.fun.contact_cache import invalidate_contacts
+from shema_api.fun.dependencies import invalidate_cached_user
+from shema_api.fun.hashing import hash_password_async, pwd_context
+from shema_api.fun.serialization import ContactRow, select_contact_rows
+from shema_api.mod.models import (
+    Contact_mod,
+    ContactTombstone,
+    SYNC_VERSION_PENDING,
+    User_mod,
+    User,
+    birthday_key,
+    sync_version_for,
+)
 from shema_api.app.schema import ContactCreate, ContactUpdate, UserCreate
 
 
@@ -16,14 +49,12 @@ load_dotenv(dotenv_path=".env")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "100000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_REJECTED = "Contact with this email cannot be imported"
 
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-try:
-    hashed_password = pwd_context.hash("testpassword")
-    print(f"Hashed password: {hashed_password}")
-except Exception as e:
-    print(f"Password hashing failed: {e}")
+logger = logging.getLogger(__name__)
 
 
 def get_contact_mod(db: Session, current_user: User_mod):
@@ -31,9 +62,12 @@ def get_contact_mod(db: Session, current_user: User_mod):
     return db.query(Contact_mod).filter(Contact_mod.owner_id == current_user.id).all()
 
 
-def get_contact_by_id(db: Session, contact_id: int):
+def get_contact_by_id(db: Session, contact_id: int, owner_id: int = None):
     """Function create_contact printing python version."""
-    return db.query(Contact_mod).filter(Contact_mod.id == contact_id).first()
+    query = db.query(Contact_mod).filter(Contact_mod.id == contact_id)
+    if owner_id:
+        query = query.filter(Contact_mod.owner_id == owner_id)
+    return query.first()
 
 
 def create_contact(db: Session, contact: ContactCreate, owner_id: int):
@@ -46,9 +80,11 @@ def create_contact(db: Session, contact: ContactCreate, owner_id: int):
 
 
 
-def update_contact(db: Session, contact_id: int, contact: ContactUpdate):
+def update_contact(
+    db: Session, contact_id: int, contact: ContactUpdate, owner_id: int = None
+):
     """Function update_contact printing python version."""
-    db_contact = get_contact_by_id(db, contact_id)
+    db_contact = get_contact_by_id(db, contact_id, owner_id)
     if db_contact:
         for key, value in contact.model_dump(exclude_unset=True).items():
             setattr(db_contact, key, value)
@@ -57,26 +93,42 @@ def update_contact(db: Session, contact_id: int, contact: ContactUpdate):
     return db_contact
 
 
-def delete_contact(db: Session, contact_id: int):
+def delete_contact(db: Session, contact_id: int, owner_id: int = None):
     """Function delete_contact printing python version."""
-    db_contact = get_contact_by_id(db, contact_id)
+    db_contact = get_contact_by_id(db, contact_id, owner_id)
     if db_contact:
         db.delete(db_contact)
         db.commit()
     return db_contact
 
 
+def upcoming_birthdays_window(days: int = 7):
+    """Function upcoming_birthdays_window printing python version."""
+    today = datetime.today().date()
+    start = birthday_key(today)
+    end = birthday_key(today + timedelta(days=days))
+    if days >= 365:
+        condition = Contact_mod.birthday_mmdd.isnot(None)
+    elif start <= end:
+        condition = Contact_mod.birthday_mmdd.between(start, end)
+    else:
+        # Окно переходит через 31 декабря
+        condition = or_(
+            Contact_mod.birthday_mmdd >= start, Contact_mod.birthday_mmdd <= end
+        )
+    # Сначала дни рождения до конца года, затем после перехода
+    order = (Contact_mod.birthday_mmdd < start, Contact_mod.birthday_mmdd)
+    return condition, order
+
+
 def get_upcoming_birthdays_mod(db: Session, days: int = 7, owner_id: int = None):
     """Function get_upcoming_birthdays_mod printing python version."""
-    today = datetime.today().date()
-    upcoming_date = today + timedelta(days=days)
-    query = db.query(Contact_mod).filter(
-        Contact_mod.birthday >= today, Contact_mod.birthday <= upcoming_date
-    )
+    condition, order = upcoming_birthdays_window(days)
+    query = db.query(Contact_mod).filter(condition)
     if owner_id:
         query = query.filter(Contact_mod.owner_id == owner_id)
 
-    return query.all()
+    return query.order_by(*order).all()
 
 
 def get_user_by_email(db: Session, email: str):
@@ -121,13 +173,6 @@ def create_user(db: Session, user: UserCreate) -> User_mod:
 
 def create_user_with_avatar(body: UserCreate, db: Session) -> User_mod:
     """Function create_user_with_avatar printing python version."""
-    avatar = None
-    try:
-        g = Gravatar(body.email)
-        avatar = g.get_image()
-    except Exception as e:
-        print(e)
-
     hashed_password = bcrypt.hashpw(body.password.encode("utf-8"), bcrypt.gensalt())
 
     hashed_password_str = hashed_password.decode("utf-8")
@@ -136,7 +181,6 @@ def create_user_with_avatar(body: UserCreate, db: Session) -> User_mod:
         first_name=body.first_name,
         email=body.email,
         hashed_password=hashed_password_str,
-        avatar=avatar,
     )
 
     db.add(new_user)
@@ -156,3 +200,527 @@ def generate_email_token(email: str) -> str:
     """Function generate_email_token printing python version."""
     payload = {"sub": email}
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+async def get_contact_mod_async(db: AsyncSession, current_user: User_mod):
+    """Function get_contact_mod_async printing python version."""
+    result = await db.execute(
+        select(Contact_mod).where(Contact_mod.owner_id == current_user.id)
+    )
+    return result.scalars().all()
+
+
+async def get_contact_page_async(
+    db: AsyncSession, owner_id: int, cursor: int = None, limit: int = 100
+):
+    """Function get_contact_page_async printing python version."""
+    query = select(Contact_mod).where(Contact_mod.owner_id == owner_id)
+    if cursor is not None:
+        query = query.where(Contact_mod.id > cursor)
+    result = await db.execute(query.order_by(Contact_mod.id).limit(limit))
+    return result.scalars().all()
+
+
+async def stream_contacts_async(db: AsyncSession, owner_id: int, batch_size: int = 1000):
+    """Function stream_contacts_async printing python version."""
+    query = (
+        select(Contact_mod)
+        .where(Contact_mod.owner_id == owner_id)
+        .order_by(Contact_mod.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream_scalars(query)
+    async for contact in result:
+        yield contact
+
+
+def _search_terms(q: str) -> list:
+    """Function _search_terms printing python version."""
+    return re.findall(r"\w+", q.lower())
+
+
+def _like_pattern(q: str) -> str:
+    """Function _like_pattern printing python version."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def search_contacts_async(
+    db: AsyncSession, owner_id: int, q: str, limit: int = 20, offset: int = 0
+):
+    """Function search_contacts_async printing python version."""
+    query = select(Contact_mod).where(Contact_mod.owner_id == owner_id)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        # Выражение совпадает с выражением индекса ix_contacts_mod_search_trgm
+        document = (
+            Contact_mod.first_name
+            + literal_column("' '")
+            + Contact_mod.last_name
+            + literal_column("' '")
+            + Contact_mod.email
+        )
+        query = query.where(
+            or_(
+                document.ilike(_like_pattern(q), escape="\\"),
+                literal(q).op("<%")(document.self_group()),
+            )
+        ).order_by(func.word_similarity(q, document).desc(), Contact_mod.id)
+    elif dialect == "sqlite":
+        terms = _search_terms(q)
+        if not terms:
+            return []
+        fts = table("contacts_mod_fts", column("rowid"))
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        query = (
+            query.join(fts, fts.c.rowid == Contact_mod.id)
+            .where(text("contacts_mod_fts MATCH :match").bindparams(match=match))
+            .order_by(text("bm25(contacts_mod_fts)"), Contact_mod.id)
+        )
+    else:
+        pattern = _like_pattern(q)
+        query = query.where(
+            or_(
+                Contact_mod.first_name.ilike(pattern, escape="\\"),
+                Contact_mod.last_name.ilike(pattern, escape="\\"),
+                Contact_mod.email.ilike(pattern, escape="\\"),
+            )
+        ).order_by(Contact_mod.id)
+
+    result = await db.execute(query.limit(limit).offset(offset))
+    return result.scalars().all()
+
+
+def _insert_ignoring_duplicates(dialect: str):
+    """Function _insert_ignoring_duplicates printing python version."""
+    if dialect == "postgresql":
+        return postgresql.insert(Contact_mod).on_conflict_do_nothing(
+            index_elements=["email"]
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(Contact_mod).on_conflict_do_nothing(
+            index_elements=["email"]
+        )
+    return None
+
+
+async def _insert_contact_batch(db: AsyncSession, batch: list, report: dict):
+    """Function _insert_contact_batch printing python version."""
+    emails = [values["email"] for _, values in batch]
+    existing = await db.execute(
+        select(Contact_mod.email).where(Contact_mod.email.in_(emails))
+    )
+    taken = set(existing.scalars().all())
+    fresh = [(row, values) for row, values in batch if values["email"] not in taken]
+
+    inserted = set()
+    if fresh:
+        statement = _insert_ignoring_duplicates(db.get_bind().dialect.name)
+        if statement is None:
+            await db.execute(insert(Contact_mod), [values for _, values in fresh])
+            inserted = {values["email"] for _, values in fresh}
+        else:
+            # ON CONFLICT закрывает гонку с параллельными вставками того же email
+            result = await db.execute(
+                statement.returning(Contact_mod.email),
+                [values for _, values in fresh],
+            )
+            inserted = set(result.scalars().all())
+
+    report["imported"] += len(inserted)
+    for row, values in batch:
+        if values["email"] not in inserted:
+            # Email уникален среди всех контактов: текст не говорит, чей он,
+            # иначе импорт выдавал бы контакты других пользователей
+            _report_error(report, row, IMPORT_REJECTED)
+
+
+def _report_error(report: dict, row: int, error: str):
+    """Function _report_error printing python version."""
+    report["failed"] += 1
+    if len(report["errors"]) < IMPORT_MAX_ERRORS:
+        report["errors"].append({"row": row, "error": error})
+
+
+async def import_contacts_async(
+    db: AsyncSession, owner_id: int, records, batch_size: int = IMPORT_BATCH_SIZE
+) -> dict:
+    """Function import_contacts_async printing python version."""
+    report = {"imported": 0, "failed": 0, "errors": []}
+    batch, seen = [], set()
+    row = 0
+    async for record in records:
+        row += 1
+        if row > IMPORT_MAX_ROWS:
+            _report_error(report, row, f"Import is limited to {IMPORT_MAX_ROWS} rows")
+            break
+        try:
+            contact = ContactCreate.model_validate(record)
+        except ValidationError as e:
+            messages = [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ]
+            _report_error(report, row, "; ".join(messages))
+            continue
+        if contact.email in seen:
+            _report_error(report, row, f"Duplicate email in import: {contact.email}")
+            continue
+        seen.add(contact.email)
+
+        values = contact.model_dump()
+        values.update(
+            owner_id=owner_id,
+            birthday_mmdd=birthday_key(contact.birthday),
+            sync_version=SYNC_VERSION_PENDING,
+        )
+        batch.append((row, values))
+        if len(batch) >= batch_size:
+            await _insert_contact_batch(db, batch, report)
+            batch = []
+
+    if batch:
+        await _insert_contact_batch(db, batch, report)
+    if report["imported"]:
+        # Номер берётся перед самым коммитом: долгая загрузка не держит блокировку
+        # счётчика, а все строки импорта становятся видны синхронизации разом
+        version = await db.run_sync(sync_version_for, owner_id)
+        await db.execute(
+            update(Contact_mod)
+            .where(
+                Contact_mod.owner_id == owner_id,
+                Contact_mod.sync_version == SYNC_VERSION_PENDING,
+            )
+            .values(sync_version=version),
+            execution_options={"synchronize_session": False},
+        )
+    await db.commit()
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
+
+
+async def get_contact_by_id_async(
+    db: AsyncSession, contact_id: int, owner_id: int = None
+):
+    """Function get_contact_by_id_async printing python version."""
+    query = select(Contact_mod).where(Contact_mod.id == contact_id)
+    if owner_id:
+        query = query.where(Contact_mod.owner_id == owner_id)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def create_contact_async(db: AsyncSession, contact: ContactCreate, owner_id: int):
+    """Function create_contact_async printing python version."""
+    db_contact = Contact_mod(**contact.model_dump(), owner_id=owner_id)
+    db.add(db_contact)
+    await db.commit()
+    await db.refresh(db_contact)
+    await invalidate_contacts(owner_id)
+    return db_contact
+
+
+async def update_contact_async(
+    db: AsyncSession, contact_id: int, contact: ContactUpdate, owner_id: int = None
+):
+    """Function update_contact_async printing python version."""
+    db_contact = await get_contact_by_id_async(db, contact_id, owner_id)
+    if db_contact:
+        for key, value in contact.model_dump(exclude_unset=True).items():
+            setattr(db_contact, key, value)
+        await db.commit()
+        await db.refresh(db_contact)
+        await invalidate_contacts(db_contact.owner_id)
+    return db_contact
+
+
+async def delete_contact_async(db: AsyncSession, contact_id: int, owner_id: int = None):
+    """Function delete_contact_async printing python version."""
+    db_contact = await get_contact_by_id_async(db, contact_id, owner_id)
+    if db_contact:
+        await db.delete(db_contact)
+        await db.commit()
+        await invalidate_contacts(db_contact.owner_id)
+    return db_contact
+
+
+def encode_sync_cursor(changed: tuple, deleted: tuple) -> str:
+    """Function encode_sync_cursor printing python version."""
+    raw = json.dumps({"c": list(changed), "d": list(deleted)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> tuple:
+    """Function decode_sync_cursor printing python version."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        changed = tuple(int(value) for value in data["c"])
+        deleted = tuple(int(value) for value in data["d"])
+        if len(changed) != 2 or len(deleted) != 2:
+            raise ValueError("Cursor positions must be (version, id) pairs")
+        return changed, deleted
+    except (TypeError, KeyError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid sync cursor") from e
+
+
+def _after_position(model, position: tuple):
+    """Function _after_position printing python version."""
+    version, last_id = position
+    return or_(
+        model.sync_version > version,
+        and_(model.sync_version == version, model.id > last_id),
+    )
+
+
+async def get_contact_changes_async(
+    db: AsyncSession, owner_id: int, cursor: str = None, limit: int = 500
+) -> dict:
+    """Function get_contact_changes_async printing python version."""
+    # Позиции — (номер транзакции владельца, id): номера выдаются под блокировкой
+    # строки ContactSyncState и видны по порядку коммитов, а не по часам
+    changed_at, deleted_at = decode_sync_cursor(cursor) if cursor else ((-1, 0), None)
+
+    deleted, more_deleted = [], False
+    if deleted_at is None:
+        # Первая синхронизация: удалённые не нужны, запоминаем только водяной знак
+        # (читается до контактов, чтобы не потерять удаление между запросами)
+        last = (
+            await db.execute(
+                select(ContactTombstone.sync_version, ContactTombstone.id)
+                .where(ContactTombstone.owner_id == owner_id)
+                .order_by(ContactTombstone.sync_version.desc(), ContactTombstone.id.desc())
+                .limit(1)
+            )
+        ).first()
+        deleted_at = tuple(last) if last else (-1, 0)
+    else:
+        tombstones = (
+            await db.execute(
+                select(
+                    ContactTombstone.sync_version,
+                    ContactTombstone.id,
+                    ContactTombstone.contact_id,
+                )
+                .where(
+                    ContactTombstone.owner_id == owner_id,
+                    _after_position(ContactTombstone, deleted_at),
+                )
+                .order_by(ContactTombstone.sync_version, ContactTombstone.id)
+                .limit(limit + 1)
+            )
+        ).all()
+        more_deleted = len(tombstones) > limit
+        tombstones = tombstones[:limit]
+        deleted = [tombstone.contact_id for tombstone in tombstones]
+        if tombstones:
+            deleted_at = (tombstones[-1].sync_version, tombstones[-1].id)
+
+    changed = (
+        await db.execute(
+            select_contact_rows()
+            .add_columns(Contact_mod.sync_version)
+            .where(
+                Contact_mod.owner_id == owner_id,
+                _after_position(Contact_mod, changed_at),
+            )
+            .order_by(Contact_mod.sync_version, Contact_mod.id)
+            .limit(limit + 1)
+        )
+    ).all()
+    more_changed = len(changed) > limit
+    changed = changed[:limit]
+    if changed:
+        changed_at = (changed[-1].sync_version, changed[-1].id)
+
+    return {
+        "changed": [ContactRow(*row[:-1]) for row in changed],
+        "deleted": deleted,
+        "cursor": encode_sync_cursor(changed_at, deleted_at),
+        "has_more": more_changed or more_deleted,
+    }
+
+
+def is_unique_violation(error) -> bool:
+    """Function is_unique_violation printing python version."""
+    # 23505 — unique_violation в Postgres (asyncpg/psycopg), SQLite пишет в тексте
+    orig = getattr(error, "orig", error)
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if code:
+        return code == "23505"
+    return "UNIQUE constraint failed" in str(orig)
+
+
+def _batch_condition(owner_id: int, ids: list = None, filter: dict = None):
+    """Function _batch_condition printing python version."""
+    # Владелец входит в условие всегда: чужие id просто не совпадут
+    conditions = [Contact_mod.owner_id == owner_id]
+    if ids is not None:
+        conditions.append(Contact_mod.id.in_(ids))
+    filter = filter or {}
+    for field in ("first_name", "last_name", "email"):
+        if filter.get(field):
+            # % и _ в фильтре — обычные символы, а не шаблон: удаление не отменить
+            pattern = _like_pattern(filter[field])
+            conditions.append(getattr(Contact_mod, field).ilike(pattern, escape="\\"))
+    if filter.get("updated_before"):
+        conditions.append(Contact_mod.updated_at < filter["updated_before"])
+    return and_(*conditions)
+
+
+async def update_contacts_async(
+    db: AsyncSession, owner_id: int, patch: dict, ids: list = None, filter: dict = None
+) -> list:
+    """Function update_contacts_async printing python version."""
+    values = dict(patch)
+    if not values:
+        return []
+    # Валидатор модели не срабатывает на UPDATE без загрузки строк
+    if "birthday" in values:
+        values["birthday_mmdd"] = birthday_key(values["birthday"])
+    values["updated_at"] = datetime.utcnow()
+    values["sync_version"] = await db.run_sync(sync_version_for, owner_id)
+    result = await db.execute(
+        update(Contact_mod)
+        .where(_batch_condition(owner_id, ids, filter))
+        .values(**values)
+        .returning(Contact_mod.id),
+        execution_options={"synchronize_session": "fetch"},
+    )
+    updated = list(result.scalars())
+    await db.commit()
+    if updated:
+        await invalidate_contacts(owner_id)
+    return updated
+
+
+async def delete_contacts_async(
+    db: AsyncSession, owner_id: int, ids: list = None, filter: dict = None
+) -> list:
+    """Function delete_contacts_async printing python version."""
+    # Счётчик блокируется раньше строк, как и при записи через ORM
+    version = await db.run_sync(sync_version_for, owner_id)
+    result = await db.execute(
+        delete(Contact_mod)
+        .where(_batch_condition(owner_id, ids, filter))
+        .returning(Contact_mod.id),
+        execution_options={"synchronize_session": "fetch"},
+    )
+    deleted = list(result.scalars())
+    if deleted:
+        # Массовый DELETE не вызывает after_delete, следы пишем сами
+        now = datetime.utcnow()
+        await db.execute(
+            insert(ContactTombstone),
+            [
+                {
+                    "contact_id": contact_id,
+                    "owner_id": owner_id,
+                    "deleted_at": now,
+                    "sync_version": version,
+                }
+                for contact_id in deleted
+            ],
+        )
+    await db.commit()
+    if deleted:
+        await invalidate_contacts(owner_id)
+    return deleted
+
+
+async def get_upcoming_birthdays_mod_async(
+    db: AsyncSession, days: int = 7, owner_id: int = None
+):
+    """Function get_upcoming_birthdays_mod_async printing python version."""
+    condition, order = upcoming_birthdays_window(days)
+    query = select_contact_rows().where(condition)
+    if owner_id:
+        query = query.where(Contact_mod.owner_id == owner_id)
+
+    result = await db.execute(query.order_by(*order))
+    return result.all()
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    """Function get_user_by_email_async printing python version."""
+    if not isinstance(db, AsyncSession):
+        raise ValueError("Expected db to be an AsyncSession object")
+
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
+    if not user:
+        print(f"User with email {email} not found.")
+    return user
+
+
+async def get_user_mod_by_email_async(db: AsyncSession, email: str):
+    """Function get_user_mod_by_email_async printing python version."""
+    result = await db.execute(select(User_mod).where(User_mod.email == email))
+    return result.scalars().first()
+
+
+async def create_user_async(db: AsyncSession, user: UserCreate) -> User_mod:
+    """Function create_user_async printing python version."""
+    try:
+        hashed_password = await hash_password_async(user.password)
+
+        db_user = User_mod(
+            email=user.email,
+            hashed_password=hashed_password,
+            first_name=user.first_name,
+        )
+
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+    except Exception as e:
+        await db.rollback()
+        print(f"Failed to create user: {e}")
+        raise Exception("Failed to create user")
+
+
+async def create_user_with_avatar_async(body: UserCreate, db: AsyncSession) -> User_mod:
+    """Function create_user_with_avatar_async printing python version."""
+    hashed_password = await hash_password_async(body.password)
+
+    new_user = User_mod(
+        first_name=body.first_name,
+        email=body.email,
+        hashed_password=hashed_password,
+    )
+
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+
+    return new_user
+
+
+async def fill_gravatar_async(user_id: int, session_factory=AsyncSessionLocal) -> None:
+    """Function fill_gravatar_async printing python version."""
+    # Выполняется после ответа на регистрацию, свою сессию открывает сама
+    async with session_factory() as db:
+        user = await db.get(User_mod, user_id)
+        if user is None or user.avatar:
+            return
+        try:
+            variants = gravatar_variants(user.email)
+        except Exception:
+            logger.exception("Could not build Gravatar URLs for user %s", user_id)
+            return
+        user.avatar_variants = variants
+        user.avatar = default_avatar(variants)
+        await db.commit()
+    await invalidate_cached_user(user.email)
+
+
+async def update_token_async(
+    user: User_mod, token: str | None, db: AsyncSession
+) -> None:
+    """Function update_token_async printing python version."""
+    user.refresh_token = token
+    await db.commit()
+    await invalidate_cached_user(user.email)
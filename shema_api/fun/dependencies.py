@@ -1,26 +1,90 @@
 """Module providing a function printing python version."""
 
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from shema_api.data.base import get_db
-from shema_api.mod.models import Contact_mod, User_mod
+from sqlalchemy import DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from shema_api.data.base import get_async_db
+from shema_api.fun.cache import TieredCache
+from shema_api.fun.contact_cache import get_contact_cached
+from shema_api.fun.hashing import pwd_context as shared_pwd_context
+from shema_api.mod.models import User_mod
 
 load_dotenv(dotenv_path=".env")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# sha256(token) -> email (не дольше exp токена), email -> снимок строки users_mod
+token_cache = TieredCache("token", maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+user_cache = TieredCache("user", maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+# Секреты в кеш (и Redis) не попадают; при обращении они догружаются из БД
+USER_SECRET_COLUMNS = frozenset({"hashed_password", "access_token", "refresh_token"})
+
+
+def use_redis_for_user_cache(client):
+    """Function use_redis_for_user_cache printing python version."""
+    token_cache.use_redis(client)
+    user_cache.use_redis(client)
+
+
+def dump_user(user: User_mod) -> dict:
+    """Function dump_user printing python version."""
+    snapshot = {}
+    for column in User_mod.__table__.columns:
+        if column.key in USER_SECRET_COLUMNS:
+            continue
+        value = getattr(user, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        snapshot[column.key] = value
+    return snapshot
+
+
+def load_user(snapshot: dict) -> User_mod:
+    """Function load_user printing python version."""
+    values = dict(snapshot)
+    for column in User_mod.__table__.columns:
+        value = values.get(column.key)
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            values[column.key] = datetime.fromisoformat(value)
+    user = User_mod(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def token_key(token: str) -> str:
+    """Function token_key printing python version."""
+    # Сам JWT — действующий пароль, в ключ кладём только его хеш
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+async def cache_user(user: User_mod):
+    """Function cache_user printing python version."""
+    await user_cache.set(user.email, dump_user(user))
+
+
+async def invalidate_cached_user(email: str):
+    """Function invalidate_cached_user printing python version."""
+    await user_cache.delete(email)
+
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
 ):
     """Function get_current_user printing python version."""
     credentials_exception = HTTPException(
@@ -29,34 +93,42 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload["scope"] == "access_token":
-            email = payload["sub"]
-            if email is None:
+    key = token_key(token)
+    email = await token_cache.get(key)
+    if email is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            if payload["scope"] == "access_token":
+                email = payload["sub"]
+                if email is None:
+                    raise credentials_exception
+            else:
                 raise credentials_exception
-        else:
+        except JWTError as e:
             raise credentials_exception
-    except JWTError as e:
-        raise credentials_exception
+        if payload.get("exp"):
+            await token_cache.set(key, email, ttl=payload["exp"] - time.time())
 
-    user: User_mod = db.query(User_mod).filter(User_mod.email == email).first()
+    snapshot = await user_cache.get(email)
+    if snapshot is not None:
+        # Присоединяем снимок к сессии без SELECT, чтобы роуты могли его менять
+        return await db.merge(load_user(snapshot), load=False)
+
+    result = await db.execute(select(User_mod).where(User_mod.email == email))
+    user: User_mod = result.scalars().first()
     if user is None:
         raise credentials_exception
+    await cache_user(user)
     return user
 
 
-def get_contact(
+async def get_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function get_contact printing python version."""
-    contact = (
-        db.query(Contact_mod)
-        .filter(Contact_mod.id == contact_id, Contact_mod.owner_id == current_user.id)
-        .first()
-    )
+    contact = await get_contact_cached(db, current_user.id, contact_id)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
@@ -67,7 +139,7 @@ def get_contact(
 class Auth:
     """Class Auth representing a person"""
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = shared_pwd_context
     SECRET_KEY = os.getenv("SECRET_KEY")
     ALGORITHM = os.getenv("ALGORITHM")
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/rout/auth/login")
@@ -0,0 +1,47 @@
+"""Module providing a function printing python version."""
+
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from jinja2 import Environment, FileSystemLoader, Template
+from shema_api.config import TEMPLATE_FOLDER
+
+EMAIL_TEMPLATES = ("example_email.html", "reset_password_email.html")
+
+
+@lru_cache(maxsize=1)
+def get_template_env() -> Environment:
+    """Function get_template_env printing python version."""
+    # Те же настройки, что у fastapi_mail, но окружение одно на процесс;
+    # auto_reload=False убирает проверку mtime файла при каждом get_template
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_FOLDER),
+        autoescape=True,
+        auto_reload=False,
+        cache_size=-1,
+    )
+
+
+def get_template(name: str) -> Template:
+    """Function get_template printing python version."""
+    return get_template_env().get_template(name)
+
+
+def precompile_templates(names: Iterable[str] = EMAIL_TEMPLATES) -> List[Template]:
+    """Function precompile_templates printing python version."""
+    return [get_template(name) for name in names]
+
+
+def render_template(name: str, context: dict) -> str:
+    """Function render_template printing python version."""
+    return get_template(name).render(context)
+
+
+def render_batch(
+    name: str, contexts: Iterable[dict], shared: Optional[dict] = None
+) -> List[str]:
+    """Function render_batch printing python version."""
+    # Шаблон берётся из кеша один раз на всю пачку
+    render = get_template(name).render
+    if not shared:
+        return [render(context) for context in contexts]
+    return [render({**shared, **context}) for context in contexts]
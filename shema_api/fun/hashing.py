@@ -0,0 +1,106 @@
+"""Module providing a function printing python version."""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+load_dotenv(dotenv_path=".env")
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashPool:
+    """Class HashPool representing a person"""
+
+    def __init__(
+        self, workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Создаётся лениво, чтобы каждый воркер после fork получил свои потоки
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    def _call(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args):
+        """Function run printing python version."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again later",
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), self._call, fn, *args
+            )
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        """Function stats printing python version."""
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": max(self.pending - self.running, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def reset_after_fork(self):
+        """Function reset_after_fork printing python version."""
+        # Потоки пула не переживают fork: воркер создаст свой пул при первом хеше
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = self.running = 0
+
+    def shutdown(self):
+        """Function shutdown printing python version."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hash_pool = HashPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=hash_pool.reset_after_fork)
+
+
+async def hash_password_async(password: str) -> str:
+    """Function hash_password_async printing python version."""
+    return await hash_pool.run(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Function verify_password_async printing python version."""
+    return await hash_pool.run(pwd_context.verify, plain_password, hashed_password)
@@ -0,0 +1,355 @@
+"""Module providing a function printing python version."""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Iterable, List, Optional, Tuple
+import aiosmtplib
+from dotenv import load_dotenv
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from shema_api.config import get_mail_config
+from shema_api.data.base import AsyncSessionLocal
+from shema_api.fun.email_templates import render_batch, render_template
+from shema_api.mod.models import EmailOutbox
+
+load_dotenv(dotenv_path=".env")
+
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "50"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "5"))
+MAIL_RETRY_BASE = float(os.getenv("MAIL_RETRY_BASE", "30"))
+MAIL_RETRY_MAX = float(os.getenv("MAIL_RETRY_MAX", "3600"))
+MAIL_POLL_INTERVAL = float(os.getenv("MAIL_POLL_INTERVAL", "2"))
+MAIL_SMTP_IDLE = float(os.getenv("MAIL_SMTP_IDLE", "60"))
+# Сколько письмо остаётся за воркером; после истечения его забирает другой воркер
+MAIL_CLAIM_LEASE = float(os.getenv("MAIL_CLAIM_LEASE", "300"))
+MAIL_THROUGHPUT_WINDOW = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_email(
+    db: AsyncSession,
+    recipients: Iterable[str],
+    subject: str,
+    template_name: str,
+    template_body: dict,
+) -> List[EmailOutbox]:
+    """Function enqueue_email printing python version."""
+    # Коммит делает вызывающий код - письмо сохраняется вместе с его изменениями
+    body = render_template(template_name, template_body)
+    rows = [
+        EmailOutbox(recipient=str(recipient), subject=subject, body=body)
+        for recipient in recipients
+    ]
+    db.add_all(rows)
+    return rows
+
+
+async def enqueue_batch(
+    db: AsyncSession,
+    subject: str,
+    template_name: str,
+    messages: Iterable[Tuple[str, dict]],
+    shared: Optional[dict] = None,
+) -> List[EmailOutbox]:
+    """Function enqueue_batch printing python version."""
+    # Персональные письма рендерятся одним проходом по скомпилированному шаблону
+    messages = list(messages)
+    bodies = render_batch(template_name, (body for _, body in messages), shared)
+    rows = [
+        EmailOutbox(recipient=str(recipient), subject=subject, body=body)
+        for (recipient, _), body in zip(messages, bodies)
+    ]
+    db.add_all(rows)
+    return rows
+
+
+def retry_delay(attempts: int) -> float:
+    """Function retry_delay printing python version."""
+    return min(MAIL_RETRY_BASE * 2 ** max(attempts - 1, 0), MAIL_RETRY_MAX)
+
+
+def build_message(row: EmailOutbox) -> EmailMessage:
+    """Function build_message printing python version."""
+    conf = get_mail_config()
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME or "", conf.MAIL_FROM))
+    message["To"] = row.recipient
+    message["Subject"] = row.subject
+    message.set_content(row.body, subtype="html")
+    return message
+
+
+class SMTPConnection:
+    """Class SMTPConnection representing a person"""
+
+    def __init__(self, idle_timeout: float = MAIL_SMTP_IDLE):
+        self.idle_timeout = idle_timeout
+        self.connects = 0
+        self._client = None
+        self._last_used = 0.0
+
+    def _new_client(self) -> aiosmtplib.SMTP:
+        conf = get_mail_config()
+        credentials = {}
+        if conf.USE_CREDENTIALS:
+            credentials = {
+                "username": conf.MAIL_USERNAME,
+                "password": conf.MAIL_PASSWORD.get_secret_value(),
+            }
+        return aiosmtplib.SMTP(
+            hostname=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            use_tls=conf.MAIL_SSL_TLS,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+            timeout=conf.TIMEOUT,
+            **credentials,
+        )
+
+    async def _ensure_connected(self):
+        idle = time.monotonic() - self._last_used
+        if self._client is not None and self._client.is_connected and idle < self.idle_timeout:
+            return
+        await self.close()
+        self._client = self._new_client()
+        await self._client.connect()
+        self.connects += 1
+        self._last_used = time.monotonic()
+
+    async def send(self, message: EmailMessage):
+        """Function send printing python version."""
+        await self._ensure_connected()
+        try:
+            await self._client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Сервер закрыл соединение между пачками - одна повторная попытка
+            await self.close()
+            await self._ensure_connected()
+            await self._client.send_message(message)
+        self._last_used = time.monotonic()
+
+    async def close(self):
+        """Function close printing python version."""
+        client, self._client = self._client, None
+        if client is None or not client.is_connected:
+            return
+        try:
+            await client.quit()
+        except aiosmtplib.SMTPException:
+            client.close()
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Function is_permanent_error printing python version."""
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+class OutboxWorker:
+    """Class OutboxWorker representing a person"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        connection=None,
+        batch_size: int = MAIL_BATCH_SIZE,
+        max_attempts: int = MAIL_MAX_ATTEMPTS,
+        poll_interval: float = MAIL_POLL_INTERVAL,
+        lease: float = MAIL_CLAIM_LEASE,
+    ):
+        self.session_factory = session_factory
+        self.connection = connection or SMTPConnection()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self._sent_at = deque(maxlen=10000)
+        self._task = None
+        self._stop = None
+
+    def _mark_failed_attempt(self, row: EmailOutbox, error: Exception):
+        row.last_error = f"{type(error).__name__}: {error}"[:500]
+        if is_permanent_error(error) or row.attempts >= self.max_attempts:
+            row.status = "failed"
+            self.failed += 1
+            logger.warning("Email %s to %s failed: %s", row.id, row.recipient, error)
+        else:
+            row.status = "pending"
+            row.next_attempt_at = datetime.utcnow() + timedelta(
+                seconds=retry_delay(row.attempts)
+            )
+            self.retried += 1
+
+    async def claim(self) -> List[EmailOutbox]:
+        """Function claim printing python version."""
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        # Воркер упал посреди отправки: письмо вернётся в очередь после конца аренды
+        expired = and_(EmailOutbox.status == "sending", EmailOutbox.claimed_until < now)
+        due = or_(
+            and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+            and_(expired, EmailOutbox.attempts < self.max_attempts),
+        )
+        candidates = (
+            select(EmailOutbox.id)
+            .where(due)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(self.batch_size)
+            # Postgres: параллельный воркер пропускает строки, а не ждёт их
+            .with_for_update(skip_locked=True)
+        )
+        async with self.session_factory() as db:
+            await db.execute(
+                update(EmailOutbox)
+                .where(expired, EmailOutbox.attempts >= self.max_attempts)
+                .values(status="failed", claim_token=None, claimed_until=None)
+                .execution_options(synchronize_session=False)
+            )
+            # Условие due повторяется в UPDATE: на SQLite нет блокировок строк, и
+            # письмо, уже занятое другим воркером, сюда не попадёт
+            await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(candidates), due)
+                .values(
+                    status="sending",
+                    claim_token=token,
+                    claimed_until=now + timedelta(seconds=self.lease),
+                    attempts=EmailOutbox.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = (
+                await db.scalars(
+                    select(EmailOutbox)
+                    .where(EmailOutbox.claim_token == token)
+                    .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                )
+            ).all()
+            await db.commit()
+        return rows
+
+    async def record(self, rows: List[EmailOutbox]):
+        """Function record printing python version."""
+        # Строку, которую после истечения аренды забрал другой воркер, не трогаем
+        statement = (
+            update(EmailOutbox.__table__)
+            .where(
+                EmailOutbox.id == bindparam("b_id"),
+                EmailOutbox.claim_token == bindparam("b_token"),
+            )
+            .values(
+                status=bindparam("b_status"),
+                last_error=bindparam("b_last_error"),
+                next_attempt_at=bindparam("b_next_attempt_at"),
+                sent_at=bindparam("b_sent_at"),
+                claim_token=None,
+                claimed_until=None,
+            )
+        )
+        params = [
+            {
+                "b_id": row.id,
+                "b_token": row.claim_token,
+                "b_status": row.status,
+                "b_last_error": row.last_error,
+                "b_next_attempt_at": row.next_attempt_at,
+                "b_sent_at": row.sent_at,
+            }
+            for row in rows
+        ]
+        async with self.session_factory() as db:
+            await db.execute(statement, params)
+            await db.commit()
+
+    async def run_once(self) -> int:
+        """Function run_once printing python version."""
+        rows = await self.claim()
+        if not rows:
+            return 0
+        # Отправка идёт вне транзакции: медленный SMTP не держит соединение с БД
+        for row in rows:
+            try:
+                await self.connection.send(build_message(row))
+            except (aiosmtplib.SMTPException, OSError) as error:
+                self._mark_failed_attempt(row, error)
+            else:
+                row.status = "sent"
+                row.sent_at = datetime.utcnow()
+                self.sent += 1
+                self._sent_at.append(time.monotonic())
+        await self.record(rows)
+        self.batches += 1
+        return len(rows)
+
+    async def run(self):
+        """Function run printing python version."""
+        try:
+            while not self._stop.is_set():
+                try:
+                    processed = await self.run_once()
+                except Exception:
+                    logger.exception("Email outbox batch failed")
+                    processed = 0
+                # Полная пачка - в очереди, скорее всего, есть ещё письма
+                if processed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.connection.close()
+
+    def start(self):
+        """Function start printing python version."""
+        if self._task is None or self._task.done():
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Function stop printing python version."""
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+
+    def throughput(self, window: float = MAIL_THROUGHPUT_WINDOW) -> float:
+        """Function throughput printing python version."""
+        since = time.monotonic() - window
+        return sum(1 for sent_at in self._sent_at if sent_at >= since) / window
+
+    async def stats(self) -> dict:
+        """Function stats printing python version."""
+        async with self.session_factory() as db:
+            pending, oldest = (
+                await db.execute(
+                    select(func.count(EmailOutbox.id), func.min(EmailOutbox.created_at))
+                    .where(EmailOutbox.status.in_(("pending", "sending")))
+                )
+            ).one()
+        lag = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending": pending,
+            "lag_seconds": round(max(lag, 0.0), 3),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": self.batches,
+            "smtp_connects": getattr(self.connection, "connects", 0),
+            "throughput_per_second": round(self.throughput(), 3),
+        }
+
+
+outbox_worker = OutboxWorker()
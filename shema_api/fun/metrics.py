@@ -0,0 +1,278 @@
+"""Module providing a function printing python version."""
+
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from shema_api.data.base import (
+    async_engine,
+    current_query_stats,
+    engine,
+    get_pool_metrics,
+)
+from shema_api.fun.contact_cache import contact_cache
+from shema_api.fun.dependencies import token_cache, user_cache
+from shema_api.fun.hashing import hash_pool
+from shema_api.fun.mailer import outbox_worker
+from shema_api.fun.rate_limit import limiter
+
+load_dotenv(dotenv_path=".env")
+
+# Общий каталог для нескольких воркеров; prometheus_client читает его при импорте,
+# поэтому переменная задаётся в окружении процесса, а не только в .env
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+METRICS_REFRESH_INTERVAL = float(os.getenv("METRICS_REFRESH_INTERVAL", "5"))
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements per HTTP request",
+    ["route"],
+    buckets=QUERY_BUCKETS,
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections in use",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections opened above pool size",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITS = Counter("db_pool_checkouts", "Pool checkouts", ["engine"])
+DB_POOL_WAIT_SECONDS = Counter(
+    "db_pool_wait_seconds", "Time spent waiting for a connection", ["engine"]
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts", "Pool checkout timeouts", ["engine"])
+
+CACHE_HITS = Counter("cache_hits", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("cache_misses", "Cache misses", ["cache"])
+CACHE_ENTRIES = Gauge(
+    "cache_entries", "Entries in the local cache tier", ["cache"], multiprocess_mode="livesum"
+)
+
+RATE_LIMIT_ALLOWED = Counter("rate_limit_allowed", "Requests let through by the limiter")
+RATE_LIMIT_REJECTED = Counter("rate_limit_rejected", "Requests rejected with 429")
+RATE_LIMIT_SYNC_ERRORS = Counter("rate_limit_sync_errors", "Failed Redis syncs")
+RATE_LIMIT_KEYS = Gauge(
+    "rate_limit_keys", "Tracked limiter buckets", multiprocess_mode="livesum"
+)
+
+HASH_QUEUED = Gauge(
+    "hash_pool_queued",
+    "Password hashes waiting for a worker thread",
+    multiprocess_mode="livesum",
+)
+HASH_RUNNING = Gauge(
+    "hash_pool_running", "Password hashes in progress", multiprocess_mode="livesum"
+)
+HASH_REJECTED = Counter(
+    "hash_pool_rejected", "Authentication requests rejected with 503 (queue full)"
+)
+
+MAIL_SENT = Counter("mail_outbox_sent", "Emails delivered from the outbox")
+MAIL_FAILED = Counter("mail_outbox_failed", "Emails given up on")
+MAIL_RETRIED = Counter("mail_outbox_retried", "Email delivery retries")
+# Очередь общая (в БД), поэтому берётся последнее измеренное значение
+MAIL_PENDING = Gauge(
+    "mail_outbox_pending", "Emails waiting in the outbox", multiprocess_mode="mostrecent"
+)
+MAIL_LAG = Gauge(
+    "mail_outbox_lag_seconds",
+    "Age of the oldest pending email",
+    multiprocess_mode="mostrecent",
+)
+
+# Последние прочитанные значения счётчиков: в Prometheus уходит только прирост
+_last_seen = {}
+
+
+def _advance(counter, key: str, value: float):
+    """Function _advance printing python version."""
+    delta = value - _last_seen.get(key, 0)
+    _last_seen[key] = value
+    if delta > 0:
+        counter.inc(delta)
+
+
+def refresh_runtime_metrics():
+    """Function refresh_runtime_metrics printing python version."""
+    # Статистика собирается из уже существующих счётчиков, горячий путь не трогаем
+    for name, db_engine in (("sync", engine), ("async", async_engine)):
+        pool = get_pool_metrics(db_engine)
+        if "size" in pool:
+            DB_POOL_CHECKED_OUT.labels(name).set(pool["checked_out"])
+            DB_POOL_SIZE.labels(name).set(pool["size"])
+            DB_POOL_OVERFLOW.labels(name).set(pool["overflow"])
+        if "wait_count" in pool:
+            _advance(DB_POOL_WAITS.labels(name), f"pool:{name}:waits", pool["wait_count"])
+            _advance(
+                DB_POOL_WAIT_SECONDS.labels(name),
+                f"pool:{name}:wait_time",
+                pool["wait_time_total"],
+            )
+            _advance(DB_POOL_TIMEOUTS.labels(name), f"pool:{name}:timeouts", pool["timeouts"])
+
+    for cache in (token_cache, user_cache, contact_cache):
+        stats = cache.stats()
+        _advance(CACHE_HITS.labels(cache.name), f"cache:{cache.name}:hits", stats["hits"])
+        _advance(CACHE_MISSES.labels(cache.name), f"cache:{cache.name}:misses", stats["misses"])
+        CACHE_ENTRIES.labels(cache.name).set(stats["size"])
+
+    stats = limiter.stats()
+    _advance(RATE_LIMIT_ALLOWED, "limiter:allowed", stats["allowed"])
+    _advance(RATE_LIMIT_REJECTED, "limiter:limited", stats["limited"])
+    _advance(RATE_LIMIT_SYNC_ERRORS, "limiter:sync_errors", stats["sync_errors"])
+    RATE_LIMIT_KEYS.set(stats["keys"])
+
+    stats = hash_pool.stats()
+    HASH_QUEUED.set(stats["queued"])
+    HASH_RUNNING.set(stats["running"])
+    _advance(HASH_REJECTED, "hash:rejected", stats["rejected"])
+
+    _advance(MAIL_SENT, "mail:sent", outbox_worker.sent)
+    _advance(MAIL_FAILED, "mail:failed", outbox_worker.failed)
+    _advance(MAIL_RETRIED, "mail:retried", outbox_worker.retried)
+
+
+async def refresh_outbox_backlog():
+    """Function refresh_outbox_backlog printing python version."""
+    try:
+        stats = await outbox_worker.stats()
+    except Exception:
+        logger.exception("Could not read mail outbox backlog")
+        return
+    MAIL_PENDING.set(stats["pending"])
+    MAIL_LAG.set(stats["lag_seconds"])
+
+
+async def render_metrics():
+    """Function render_metrics printing python version."""
+    refresh_runtime_metrics()
+    await refresh_outbox_backlog()
+    if PROMETHEUS_MULTIPROC_DIR:
+        # Значения всех воркеров сводятся из файлов в общем каталоге
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsRefresher:
+    """Class MetricsRefresher representing a person"""
+
+    def __init__(self, interval: float = METRICS_REFRESH_INTERVAL):
+        self.interval = interval
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            refresh_runtime_metrics()
+
+    def start(self):
+        """Function start printing python version."""
+        # Нужен только с несколькими воркерами: /metrics обслуживает один из них,
+        # остальные должны сами выгружать свои значения в общий каталог
+        if PROMETHEUS_MULTIPROC_DIR and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Function stop printing python version."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if PROMETHEUS_MULTIPROC_DIR:
+            refresh_runtime_metrics()
+            # live-метрики завершившегося воркера больше не учитываются
+            multiprocess.mark_process_dead(os.getpid())
+
+
+metrics_refresher = MetricsRefresher()
+
+
+def route_label(scope) -> str:
+    """Function route_label printing python version."""
+    # Шаблон пути, а не сам путь: id в URL не должны плодить ряды
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Class MetricsMiddleware representing a person"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = route_label(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            stats = current_query_stats.get()
+            if stats is not None:
+                HTTP_DB_QUERIES.labels(route).observe(stats.count)
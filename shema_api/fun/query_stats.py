@@ -0,0 +1,87 @@
+"""Module providing a function printing python version."""
+
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from starlette.datastructures import MutableHeaders
+from shema_api.data.base import QueryStats, current_query_stats
+
+load_dotenv(dotenv_path=".env")
+
+# Заголовки X-DB-* и Server-Timing в ответе (для разработки и стендов)
+DB_QUERY_HEADERS = os.getenv("DB_QUERY_HEADERS", "false").lower() in ("1", "true", "yes")
+DB_QUERY_WARN_COUNT = int(os.getenv("DB_QUERY_WARN_COUNT", "20"))
+DB_REPEATED_QUERY_WARN = int(os.getenv("DB_REPEATED_QUERY_WARN", "5"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+logger = logging.getLogger(__name__)
+
+
+def query_headers(stats: QueryStats) -> dict:
+    """Function query_headers printing python version."""
+    db_ms = stats.total * 1000
+    return {
+        "X-DB-Queries": str(stats.count),
+        "X-DB-Time": f"{db_ms:.1f}",
+        "Server-Timing": f'db;dur={db_ms:.1f};desc="{stats.count} queries"',
+    }
+
+
+def log_query_stats(method: str, path: str, stats: QueryStats, elapsed: float):
+    """Function log_query_stats printing python version."""
+    summary = "%s %s: %d queries, %.1f ms in DB of %.1f ms"
+    args = (method, path, stats.count, stats.total * 1000, elapsed * 1000)
+    repeated = stats.repeated(DB_REPEATED_QUERY_WARN)
+    if repeated:
+        sql, times = repeated[0]
+        logger.warning(summary + "; possible N+1, ran %d times: %s", *args, times, sql)
+    elif stats.count >= DB_QUERY_WARN_COUNT:
+        logger.warning(summary, *args)
+    elif stats.slowest_time * 1000 >= DB_SLOW_QUERY_MS:
+        logger.warning(
+            summary + "; slowest %.1f ms: %s",
+            *args,
+            stats.slowest_time * 1000,
+            stats.slowest,
+        )
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            summary + "; slowest %.1f ms: %s",
+            *args,
+            stats.slowest_time * 1000,
+            stats.slowest,
+        )
+
+
+class QueryStatsMiddleware:
+    """Class QueryStatsMiddleware representing a person"""
+
+    def __init__(self, app, headers: bool = DB_QUERY_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_headers(message):
+            # Заголовки уходят до тела: запросы потокового ответа попадут только в лог
+            if message["type"] == "http.response.start" and self.headers:
+                headers = MutableHeaders(scope=message)
+                for name, value in query_headers(stats).items():
+                    headers.append(name, value)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_query_stats.reset(token)
+            log_query_stats(
+                scope["method"], scope["path"], stats, time.perf_counter() - started
+            )
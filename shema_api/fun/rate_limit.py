@@ -0,0 +1,245 @@
+"""Module providing a function printing python version."""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.security import OAuth2PasswordBearer
+from shema_api.fun.dependencies import get_current_user, token_key
+from shema_api.mod.models import User_mod
+
+load_dotenv(dotenv_path=".env")
+
+RATE_LIMIT_SYNC_INTERVAL = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "0.5"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_PREFIX = os.getenv("RATE_LIMIT_PREFIX", "ratelimit")
+
+# Лимиты по умолчанию, "запросов/секунд"; переопределяются RATE_LIMIT_<ИМЯ>,
+# например RATE_LIMIT_CONTACTS_CREATE=10/60
+DEFAULT_RATE_LIMITS = {
+    "contacts:create": "5/60",
+    "contacts:import": "5/60",
+    "contacts:write": "60/60",
+    "auth:login": "20/60",
+    "password-reset": "5/300",
+    "limited": "5/60",
+}
+
+RATE_UNITS = {"s": 1, "second": 1, "m": 60, "minute": 60, "h": 3600, "hour": 3600}
+
+logger = logging.getLogger(__name__)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+def parse_rate(value: str) -> Tuple[int, float]:
+    """Function parse_rate printing python version."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+(?:\.\d+)?|[a-z]+)\s*", value)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    times, period = match.groups()
+    seconds = RATE_UNITS[period] if period in RATE_UNITS else float(period)
+    if seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return int(times), float(seconds)
+
+
+def rule_for(name: str) -> Tuple[int, float]:
+    """Function rule_for printing python version."""
+    env_name = "RATE_LIMIT_" + re.sub(r"[^A-Z0-9]+", "_", name.upper())
+    return parse_rate(os.getenv(env_name, DEFAULT_RATE_LIMITS[name]))
+
+
+class TokenBucket:
+    """Class TokenBucket representing a person"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "pending")
+
+    def __init__(self, capacity: int, seconds: float, now: float):
+        self.capacity = capacity
+        self.rate = capacity / seconds
+        self.tokens = float(capacity)
+        self.updated = now
+        # Потрачено локально и ещё не отправлено в Redis
+        self.pending = 0
+
+    def take(self, now: float) -> float:
+        """Function take printing python version."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.pending += 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Class RateLimiter representing a person"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.rules: Dict[str, Tuple[int, float]] = {}
+        self.allowed = 0
+        self.limited = 0
+        self.syncs = 0
+        self.sync_errors = 0
+        self.sync_interval = RATE_LIMIT_SYNC_INTERVAL
+        self._redis = None
+        self._task = None
+
+    def use_redis(self, client, sync_interval: float = RATE_LIMIT_SYNC_INTERVAL):
+        """Function use_redis printing python version."""
+        self._redis = client
+        self.sync_interval = sync_interval
+
+    def reset(self):
+        """Function reset printing python version."""
+        self.buckets.clear()
+        self.rules.clear()
+
+    def hit(self, key: str, times: int, seconds: float) -> float:
+        """Function hit printing python version."""
+        # Быстрый путь: только локальное ведро, без сетевых запросов
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(times, seconds, now)
+            self.rules[key] = (times, seconds)
+            if len(self.buckets) > self.max_keys:
+                old_key, _ = self.buckets.popitem(last=False)
+                self.rules.pop(old_key, None)
+        else:
+            self.buckets.move_to_end(key)
+        retry_after = bucket.take(now)
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    async def sync(self):
+        """Function sync printing python version."""
+        if self._redis is None:
+            return
+        # Активные ключи: есть неотправленные запросы или ведро частично израсходовано
+        # (INCRBY 0 просто читает, сколько потратили остальные узлы)
+        dirty = [
+            (key, bucket)
+            for key, bucket in self.buckets.items()
+            if bucket.pending or bucket.tokens < bucket.capacity
+        ]
+        if not dirty:
+            return
+        # Одна пачка на все ключи: INCRBY счётчика текущего окна + срок жизни
+        pipe = self._redis.pipeline(transaction=False)
+        sent = []
+        wall = time.time()
+        for key, bucket in dirty:
+            times, seconds = self.rules[key]
+            redis_key = f"{RATE_LIMIT_PREFIX}:{key}:{int(wall // seconds)}"
+            pipe.incrby(redis_key, bucket.pending)
+            pipe.expire(redis_key, int(seconds) + 1)
+            sent.append((bucket, bucket.pending))
+            bucket.pending = 0
+        try:
+            results = await pipe.execute()
+        except Exception:
+            self.sync_errors += 1
+            for bucket, pending in sent:
+                bucket.pending += pending
+            logger.exception("Rate limit sync failed")
+            return
+        self.syncs += 1
+        for (bucket, _), total in zip(sent, results[::2]):
+            # Остаток ведра не может превышать общий остаток по всем узлам
+            bucket.tokens = min(bucket.tokens, max(bucket.capacity - int(total), 0))
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    def start(self):
+        """Function start printing python version."""
+        if self._redis is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        """Function stop printing python version."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.sync()
+
+    def stats(self) -> dict:
+        """Function stats printing python version."""
+        return {
+            "backend": "redis" if self._redis is not None else "memory",
+            "keys": len(self.buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+        }
+
+
+limiter = RateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    """Function client_ip printing python version."""
+    # X-Forwarded-For не читаем: клиент подставит любой адрес и обойдёт лимит.
+    # За доверенным прокси адрес подменяет uvicorn (proxy_headers, forwarded_allow_ips)
+    return request.client.host if request.client else "unknown"
+
+
+def check_rate_limit(
+    name: str, identity: str, response: Response, times: int, seconds: float
+):
+    """Function check_rate_limit printing python version."""
+    retry_after = limiter.hit(f"{name}:{identity}", times, seconds)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too Many Requests",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+    response.headers["X-RateLimit-Limit"] = str(times)
+
+
+def rate_limit(name: str, per: str = "ip"):
+    """Function rate_limit printing python version."""
+    # Правило читается один раз при объявлении маршрута
+    times, seconds = rule_for(name)
+
+    if per == "user":
+
+        async def dependency(
+            response: Response, current_user: User_mod = Depends(get_current_user)
+        ):
+            check_rate_limit(name, f"user:{current_user.id}", response, times, seconds)
+
+    elif per == "token":
+
+        async def dependency(response: Response, token: str = Depends(oauth2_scheme)):
+            check_rate_limit(name, f"token:{token_key(token)}", response, times, seconds)
+
+    elif per == "ip":
+
+        async def dependency(request: Request, response: Response):
+            check_rate_limit(name, f"ip:{client_ip(request)}", response, times, seconds)
+
+    else:
+        raise ValueError(f"Unknown rate limit scope: {per}")
+
+    return dependency
@@ -0,0 +1,46 @@
+"""Module providing a function printing python version."""
+
+from collections import namedtuple
+from typing import Dict, Iterable
+import orjson
+from fastapi import Response
+from sqlalchemy import select
+from shema_api.app.schema import ContactResponse, ContactSyncItem
+from shema_api.mod.models import Contact_mod
+
+# Поля публичной схемы в её порядке; updated_at нужен для ETag и синхронизации
+CONTACT_FIELDS = tuple(ContactResponse.model_fields)
+CONTACT_ROW_FIELDS = tuple(ContactSyncItem.model_fields)
+CONTACT_COLUMNS = tuple(getattr(Contact_mod, field) for field in CONTACT_ROW_FIELDS)
+
+ContactRow = namedtuple("ContactRow", CONTACT_ROW_FIELDS)
+
+
+def select_contact_rows():
+    """Function select_contact_rows printing python version."""
+    # Только нужные колонки, без сборки ORM-объектов
+    return select(*CONTACT_COLUMNS)
+
+
+def contact_dicts(rows: Iterable, fields: tuple = CONTACT_FIELDS) -> list:
+    """Function contact_dicts printing python version."""
+    # zip обрезает лишние колонки (updated_at), если поле не входит в схему
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """Class FastJSONResponse representing a person"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        """Function render printing python version."""
+        # date/datetime orjson пишет в ISO 8601, как и Pydantic
+        return orjson.dumps(content)
+
+
+def contacts_response(
+    rows: Iterable, headers: Dict[str, str] = None, fields: tuple = CONTACT_FIELDS
+) -> FastJSONResponse:
+    """Function contacts_response printing python version."""
+    return FastJSONResponse(contact_dicts(rows, fields), headers=headers)
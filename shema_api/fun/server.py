@@ -0,0 +1,232 @@
+"""Module providing a function printing python version.
+
+Запуск в продакшене (все настройки берутся из окружения / .env):
+
+    python -m shema_api.fun.server
+"""
+
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+from dotenv import load_dotenv
+from shema_api.config import env_flag
+
+load_dotenv(dotenv_path=".env")
+
+SERVER_APP = os.getenv("SERVER_APP", "main:app")
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+# "auto" — по одному воркеру на ядро (нужен Redis, см. SHARED_STATE_FLAGS)
+WEB_CONCURRENCY = os.getenv("WEB_CONCURRENCY", "1")
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+# auto | uvloop | asyncio и auto | httptools | h11
+SERVER_LOOP = os.getenv("SERVER_LOOP", "auto")
+SERVER_HTTP = os.getenv("SERVER_HTTP", "auto")
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0"))
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+# Прокси, которым верим X-Forwarded-For/Proto (через запятую, "*" — всем)
+SERVER_FORWARDED_ALLOW_IPS = os.getenv(
+    "SERVER_FORWARDED_ALLOW_IPS", os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+)
+# Приложение импортируется в мастере до fork (через gunicorn: pip install cont-api[preload])
+SERVER_PRELOAD = env_flag("SERVER_PRELOAD", "false")
+
+# Без Redis кэши пользователей/контактов и лимиты живут в каждом воркере свои:
+# воркеры отдают устаревшие данные, а лимиты умножаются на число воркеров
+SHARED_STATE_FLAGS = ("USER_CACHE_REDIS", "CONTACT_CACHE_REDIS", "RATE_LIMIT_REDIS")
+
+# Модули, без которых выбранная реализация не запустится
+OPTIONAL_MODULES = {"uvloop": "uvloop", "httptools": "httptools"}
+
+# Настройки uvicorn, которые UvicornWorker сам из конфигурации gunicorn не берёт
+WORKER_CONFIG_KEYS = (
+    "loop",
+    "http",
+    "proxy_headers",
+    "forwarded_allow_ips",
+    "limit_concurrency",
+    "timeout_graceful_shutdown",
+    "access_log",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_workers(value: str = WEB_CONCURRENCY) -> int:
+    """Function resolve_workers printing python version."""
+    if value in ("", "0", "auto"):
+        return os.cpu_count() or 1
+    workers = int(value)
+    if workers < 1:
+        raise ValueError(f"WEB_CONCURRENCY must be positive, got {value}")
+    return workers
+
+
+def check_shared_state(workers: int):
+    """Function check_shared_state printing python version."""
+    if workers < 2:
+        return
+    missing = [flag for flag in SHARED_STATE_FLAGS if not env_flag(flag, "false")]
+    if missing:
+        raise RuntimeError(
+            f"{workers} workers need shared caches and rate limits; "
+            f"set {', '.join(f'{flag}=true' for flag in missing)} or WEB_CONCURRENCY=1"
+        )
+
+
+def resolve_impl(name: str, choices: tuple) -> str:
+    """Function resolve_impl printing python version."""
+    if name not in choices:
+        raise ValueError(f"Unknown server option {name!r}, expected one of {choices}")
+    module = OPTIONAL_MODULES.get(name)
+    # Явно выбранный uvloop/httptools без установленного пакета — ошибка конфигурации,
+    # а не тихий откат на медленную реализацию
+    if module and importlib.util.find_spec(module) is None:
+        raise RuntimeError(f"{name} is selected but not installed")
+    return name
+
+
+def prepare_metrics_dir(workers: int):
+    """Function prepare_metrics_dir printing python version."""
+    # Каталог задаётся до импорта приложения: prometheus_client читает его при импорте,
+    # а воркеры наследуют окружение мастера
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if workers < 2:
+        # prometheus_client не создаёт каталог сам и падает при первой записи
+        if path:
+            os.makedirs(path, exist_ok=True)
+        return path
+    if path:
+        # Файлы прошлого запуска исказили бы счётчики
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+    else:
+        path = tempfile.mkdtemp(prefix="cont-api-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+def uvicorn_options(workers: int) -> dict:
+    """Function uvicorn_options printing python version."""
+    options = {
+        "host": SERVER_HOST,
+        "port": SERVER_PORT,
+        "workers": workers,
+        "backlog": SERVER_BACKLOG,
+        "timeout_keep_alive": SERVER_KEEPALIVE,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_TIMEOUT,
+        "loop": resolve_impl(SERVER_LOOP, ("auto", "uvloop", "asyncio")),
+        "http": resolve_impl(SERVER_HTTP, ("auto", "httptools", "h11")),
+        "proxy_headers": True,
+        "forwarded_allow_ips": SERVER_FORWARDED_ALLOW_IPS,
+        "access_log": env_flag("SERVER_ACCESS_LOG", "false"),
+    }
+    if SERVER_LIMIT_CONCURRENCY:
+        options["limit_concurrency"] = SERVER_LIMIT_CONCURRENCY
+    if SERVER_MAX_REQUESTS:
+        options["limit_max_requests"] = SERVER_MAX_REQUESTS
+    return options
+
+
+def gunicorn_options(workers: int) -> dict:
+    """Function gunicorn_options printing python version."""
+    return {
+        "bind": f"{SERVER_HOST}:{SERVER_PORT}",
+        "workers": workers,
+        "backlog": SERVER_BACKLOG,
+        "keepalive": SERVER_KEEPALIVE,
+        "graceful_timeout": SERVER_GRACEFUL_TIMEOUT,
+        "max_requests": SERVER_MAX_REQUESTS,
+        "max_requests_jitter": SERVER_MAX_REQUESTS // 10,
+        "forwarded_allow_ips": SERVER_FORWARDED_ALLOW_IPS,
+        "preload_app": True,
+        "child_exit": _child_exit,
+    }
+
+
+def _child_exit(server, worker):
+    # Воркер мог упасть, не дойдя до lifespan: снимаем его live-метрики здесь
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_class(uvicorn_config: dict):
+    """Function worker_class printing python version."""
+    try:
+        from uvicorn.workers import UvicornWorker
+    except ImportError as e:
+        raise RuntimeError("SERVER_PRELOAD=true requires gunicorn to be installed") from e
+
+    class Worker(UvicornWorker):
+        """Class Worker representing a person"""
+
+        # Те же прокси-заголовки и лимиты, что и у uvicorn.run: иначе за прокси
+        # все клиенты делили бы один IP в лимитах запросов
+        CONFIG_KWARGS = {
+            **UvicornWorker.CONFIG_KWARGS,
+            **{key: uvicorn_config[key] for key in WORKER_CONFIG_KEYS if key in uvicorn_config},
+        }
+
+    return Worker
+
+
+def run_gunicorn(options: dict, uvicorn_config: dict):
+    """Function run_gunicorn printing python version."""
+    worker = worker_class(uvicorn_config)
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        """Class Application representing a person"""
+
+        def load_config(self):
+            for key, value in {**options, "worker_class": worker}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Вызывается в мастере один раз: воркеры получают готовое приложение через fork,
+            # а подключения к БД, Redis и пул хеширования создают уже у себя
+            from importlib import import_module
+
+            module, attr = SERVER_APP.split(":")
+            return getattr(import_module(module), attr)
+
+    Application().run()
+
+
+def serve():
+    """Function serve printing python version."""
+    import uvicorn
+
+    workers = resolve_workers()
+    check_shared_state(workers)
+    # Временный каталог метрик, созданный здесь же, удаляется после остановки
+    owns_metrics_dir = workers > 1 and not os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    metrics_dir = prepare_metrics_dir(workers)
+    options = uvicorn_options(workers)
+    logger.info(
+        "Starting %s with %d workers (loop=%s, http=%s, preload=%s)",
+        SERVER_APP,
+        workers,
+        options["loop"],
+        options["http"],
+        SERVER_PRELOAD,
+    )
+    try:
+        if SERVER_PRELOAD:
+            run_gunicorn(gunicorn_options(workers), options)
+        else:
+            # Воркеры uvicorn запускаются через spawn и импортируют приложение сами
+            uvicorn.run(SERVER_APP, **options)
+    finally:
+        if owns_metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,218 @@
+"""Module providing a function printing python version."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+load_dotenv(dotenv_path=".env")
+
+AVATAR_STORAGE = os.getenv("AVATAR_STORAGE", "cloudinary")
+AVATAR_LOCAL_DIR = os.getenv("AVATAR_LOCAL_DIR", "media")
+AVATAR_LOCAL_URL = os.getenv("AVATAR_LOCAL_URL", "/media")
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Запас на границы и заголовки частей multipart поверх размера файла
+UPLOAD_FORM_OVERHEAD = 16 * 1024
+UPLOAD_LIMITED_PATHS = ("/upload-avatar/",)
+
+# Сигнатуры файлов: тип определяется по содержимому, а не по расширению
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpeg",
+    b"\x89PNG\r\n\x1a\n": "png",
+}
+IMAGE_EXTENSIONS = {"jpeg": "jpg", "png": "png"}
+IMAGE_CONTENT_TYPES = {"jpeg": "image/jpeg", "png": "image/png"}
+
+
+class StorageError(Exception):
+    """Class StorageError representing a person"""
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """Function detect_image_type printing python version."""
+    for signature, kind in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+def file_too_large() -> HTTPException:
+    """Function file_too_large printing python version."""
+    return HTTPException(
+        status_code=400,
+        detail=f"File is too large. Maximum size is {AVATAR_MAX_BYTES // (1024 * 1024)}MB.",
+    )
+
+
+async def inspect_upload(
+    file: UploadFile, max_bytes: int = AVATAR_MAX_BYTES
+) -> str:
+    """Function inspect_upload printing python version."""
+    # Размер уже известен после разбора multipart - отказываем сразу
+    if file.size is not None and file.size > max_bytes:
+        raise file_too_large()
+
+    head = await file.read(UPLOAD_CHUNK_SIZE)
+    kind = detect_image_type(head)
+    if kind is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file format. Only jpg, jpeg, and png are allowed.",
+        )
+
+    # Читаем кусками, целиком файл в память не попадает
+    size = len(head)
+    while size <= max_bytes:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+    if size > max_bytes:
+        raise file_too_large()
+
+    await file.seek(0)
+    return kind
+
+
+class UploadLimitMiddleware:
+    """Class UploadLimitMiddleware representing a person"""
+
+    def __init__(
+        self,
+        app,
+        paths: tuple = UPLOAD_LIMITED_PATHS,
+        max_bytes: int = AVATAR_MAX_BYTES + UPLOAD_FORM_OVERHEAD,
+    ):
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Starlette разбирает форму целиком до вызова обработчика, поэтому
+        # размер проверяется здесь, до чтения тела
+        length = Headers(scope=scope).get("content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            error = file_too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            # Тело без Content-Length (chunked) обрываем, как только превышен лимит
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise file_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class StorageBackend(ABC):
+    """Class StorageBackend representing a person"""
+
+    @abstractmethod
+    def save(self, fileobj: BinaryIO, key: str, content_type: str) -> str:
+        """Function save printing python version."""
+
+    async def save_async(self, fileobj: BinaryIO, key: str, content_type: str) -> str:
+        """Function save_async printing python version."""
+        # Загрузка блокирующая (сеть/диск), поэтому уходит в поток
+        return await asyncio.to_thread(self.save, fileobj, key, content_type)
+
+
+class LocalStorage(StorageBackend):
+    """Class LocalStorage representing a person"""
+
+    def __init__(self, root: str = AVATAR_LOCAL_DIR, base_url: str = AVATAR_LOCAL_URL):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, fileobj: BinaryIO, key: str, content_type: str) -> str:
+        """Function save printing python version."""
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with tempfile.NamedTemporaryFile(dir=target.parent, delete=False) as tmp:
+                shutil.copyfileobj(fileobj, tmp, UPLOAD_CHUNK_SIZE)
+            os.replace(tmp.name, target)
+        except OSError as e:
+            raise StorageError(str(e)) from e
+        return f"{self.base_url}/{key}"
+
+
+class CloudinaryStorage(StorageBackend):
+    """Class CloudinaryStorage representing a person"""
+
+    def __init__(self):
+        self._configured = False
+
+    def _configure(self):
+        # cloudinary импортируется только при первой загрузке
+        import cloudinary
+
+        if not self._configured:
+            cloudinary.config(
+                cloud_name=os.getenv("CLOUD_NAME"),
+                api_key=os.getenv("API_KEY"),
+                api_secret=os.getenv("API_SECRET"),
+            )
+            self._configured = True
+        return cloudinary
+
+    def save(self, fileobj: BinaryIO, key: str, content_type: str) -> str:
+        """Function save printing python version."""
+        cloudinary = self._configure()
+        import cloudinary.uploader
+
+        public_id, _ = os.path.splitext(key)
+        try:
+            response = cloudinary.uploader.upload(
+                fileobj, public_id=public_id, resource_type="image", overwrite=True
+            )
+        except cloudinary.exceptions.Error as e:
+            raise StorageError(f"Cloudinary error: {e}") from e
+        return response.get("secure_url")
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Class ImmutableStaticFiles representing a person"""
+
+    def file_response(self, *args, **kwargs):
+        # Ключи файлов содержат хеш содержимого - их можно кешировать навсегда
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+STORAGE_BACKENDS = {
+    "cloudinary": CloudinaryStorage,
+    "local": LocalStorage,
+}
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """Function get_storage printing python version."""
+    try:
+        return STORAGE_BACKENDS[AVATAR_STORAGE]()
+    except KeyError:
+        raise RuntimeError(f"Unknown AVATAR_STORAGE: {AVATAR_STORAGE}")
@@ -7,13 +7,12 @@ from typing import Optional
 import bcrypt
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
-from fastapi_mail import FastMail, MessageSchema, MessageType
-from passlib.context import CryptContext
 from jose import JWTError, jwt
-from pydantic import EmailStr
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from shema_api.fun.dependencies import auth_service
-from shema_api.config import conf
+from shema_api.fun.dependencies import invalidate_cached_user
+from shema_api.fun.hashing import pwd_context, verify_password_async
 from shema_api.mod.models import User_mod
 
 load_dotenv(dotenv_path=".env")
@@ -21,11 +20,10 @@ load_dotenv(dotenv_path=".env")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
+RESET_HOST = "http://127.0.0.1:8000"
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def create_access_token(data: dict, expires_delta: Optional[float] = None):
     """Function create_access_token printing python version."""
     to_encode = data.copy()
@@ -55,15 +53,7 @@ def create_refresh_token(data: dict, expires_delta: Optional[float] = None):
 def verify_password_mod(plain_password: str, hashed_password: str) -> bool:
     """Function verify_password_mod printing python version."""
     try:
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        
-        print(f"Comparing: {plain_password} with hashed: {hashed_password}")
-        
-        result = pwd_context.verify(plain_password, hashed_password)
-        
-        print(f"Password match: {result}")
-        
-        return result
+        return pwd_context.verify(plain_password, hashed_password)
     except Exception as e:
         raise Exception(f"Error verifying password: {e}")
 
@@ -71,7 +61,6 @@ def verify_password_mod(plain_password: str, hashed_password: str) -> bool:
 def hash_password(password: str) -> str:
     """Function hash_password printing python version."""
     try:
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         hashed = pwd_context.hash(password)
         return hashed
     except Exception as e:
@@ -105,43 +94,30 @@ def confirmed_email(email: str, db: Session):
     return {"message": "Email confirmed"}
 
 
+async def authenticate_user_async(db: AsyncSession, username: str, password: str):
+    """Function authenticate_user_async printing python version."""
+    result = await db.execute(select(User_mod).where(User_mod.first_name == username))
+    user = result.scalars().first()
+    if user is None:
+        logger.info(f"User with email {username} not found.")
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        logger.info(f"Incorrect password for user {username}.")
+        return None
+    return user
+
 
-def send_email(email: EmailStr, username: str, host: str):
-    """Function send_email printing python version."""
-    try:
-        token_verification = auth_service.create_email_token({"sub": email})
-
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        fm.send_message(message, template_name="example_email.html")
-    except ConnectionError as err:
-        print(err)
-
-async def send_reset_password_email(email: str, token: str):
-    """Function send_reset_password_email printing python version."""
-    host = "http://127.0.0.1:8000"
-    message = MessageSchema(
-        subject="Password Reset Request",
-        recipients=[email],
-        template_body={
-            "username": email,
-            "host": host,
-            "token": token,
-        },
-        subtype=MessageType.html,
-    )
-    fm = FastMail(conf)
-    await fm.send_message(message, template_name="reset_password_email.html")
+async def confirmed_email_async(email: str, db: AsyncSession):
+    """Function confirmed_email_async printing python version."""
+    result = await db.execute(select(User_mod).where(User_mod.email == email))
+    user = result.scalars().first()
+    if user is None:
+        return {"detail": "User not found"}
+    user.confirmed = True
+    user.is_active = True
+    await db.commit()
+    await invalidate_cached_user(email)
+    return {"message": "Email confirmed"}
 
 
 def decode_refresh_token(token: str):
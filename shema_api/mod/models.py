@@ -1,10 +1,19 @@
 """Module providing a function printing python version."""
 
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Date, ForeignKey, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String, Text, Date, ForeignKey, Index, DDL, event, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session, relationship, validates
 from shema_api.data.base import Base
 
+
+def birthday_key(birthday):
+    """Function birthday_key printing python version."""
+    # Месяц*100 + день: не зависит от года и високосности, 29.02 -> 229
+    if birthday is None:
+        return None
+    return birthday.month * 100 + birthday.day
+
 class Contact_mod(Base):
     """Class Contact_mod representing a person"""
     __tablename__ = "contacts_mod"
@@ -15,13 +24,190 @@ class Contact_mod(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     phone_number = Column(String(15), nullable=True)
     birthday = Column(Date, nullable=True)
+    birthday_mmdd = Column(Integer, nullable=True)
     additional_info = Column(String(255), nullable=True)
     created_at = Column('created_at', DateTime, default=func.now())
-    updated_at = Column('updated_at', DateTime, default=func.now(), onupdate=func.now()) 
+    # Время с микросекундами на стороне Python: по нему считается ETag,
+    # CURRENT_TIMESTAMP в SQLite округляет до секунд
+    updated_at = Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     owner_id = Column(Integer, ForeignKey("users_mod.id"))
+    # Номер транзакции владельца (ContactSyncState), в которой строка изменена последней
+    sync_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     owner = relationship("User_mod", back_populates="contacts_mod")
 
+    __table_args__ = (
+        Index("ix_contacts_mod_owner_id_id", "owner_id", "id"),
+        Index("ix_contacts_mod_owner_id_birthday_mmdd", "owner_id", "birthday_mmdd"),
+        Index(
+            "ix_contacts_mod_owner_id_sync_version_id", "owner_id", "sync_version", "id"
+        ),
+    )
+
+    @validates("birthday")
+    def _sync_birthday_mmdd(self, key, value):
+        self.birthday_mmdd = birthday_key(value)
+        return value
+
+# Поисковый индекс контактов: FTS5 в SQLite, триграммы (pg_trgm) в Postgres
+CONTACT_SEARCH_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contacts_mod_fts USING fts5("
+    "first_name, last_name, email, content='contacts_mod', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS contacts_mod_fts_ai AFTER INSERT ON contacts_mod BEGIN "
+    "INSERT INTO contacts_mod_fts(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_mod_fts_ad AFTER DELETE ON contacts_mod BEGIN "
+    "INSERT INTO contacts_mod_fts(contacts_mod_fts, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS contacts_mod_fts_au AFTER UPDATE ON contacts_mod BEGIN "
+    "INSERT INTO contacts_mod_fts(contacts_mod_fts, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); "
+    "INSERT INTO contacts_mod_fts(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+]
+
+CONTACT_SEARCH_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_contacts_mod_search_trgm ON contacts_mod "
+    "USING gin ((first_name || ' ' || last_name || ' ' || email) gin_trgm_ops)",
+]
+
+for statement in CONTACT_SEARCH_SQLITE_DDL:
+    event.listen(
+        Contact_mod.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+for statement in CONTACT_SEARCH_POSTGRES_DDL:
+    event.listen(
+        Contact_mod.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+event.listen(
+    Contact_mod.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_mod_fts").execute_if(dialect="sqlite"),
+)
+
+# Объекты поискового индекса, которых нет в метаданных (FTS5 создаёт ещё и
+# теневые таблицы contacts_mod_fts_data/_idx/_docsize/_config)
+CONTACT_SEARCH_TABLE_PREFIX = "contacts_mod_fts"
+CONTACT_SEARCH_INDEXES = {"ix_contacts_mod_search_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Function include_object printing python version."""
+    # Хук Alembic: без него autogenerate предлагает удалить поисковый индекс
+    if not reflected or compare_to is not None:
+        return True
+    if type_ == "table" and name.startswith(CONTACT_SEARCH_TABLE_PREFIX):
+        return False
+    if type_ == "index" and name in CONTACT_SEARCH_INDEXES:
+        return False
+    return True
+
+class ContactTombstone(Base):
+    """Class ContactTombstone representing a person"""
+    __tablename__ = "contacts_mod_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    contact_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sync_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index(
+            "ix_contacts_mod_tombstones_owner_id_sync_version_id",
+            "owner_id",
+            "sync_version",
+            "id",
+        ),
+    )
+
+
+class ContactSyncState(Base):
+    """Class ContactSyncState representing a person"""
+    __tablename__ = "contacts_mod_sync_state"
+
+    owner_id = Column(Integer, primary_key=True)
+    # Счётчик пишущих транзакций владельца; строка блокируется до коммита,
+    # поэтому номера становятся видны строго по порядку
+    version = Column(Integer, nullable=False, default=0)
+
+
+# Метка строк импорта до коммита, см. import_contacts_async
+SYNC_VERSION_PENDING = -1
+
+
+def _bump_sync_version(session: Session, owner_id: int) -> int:
+    """Function _bump_sync_version printing python version."""
+    state = ContactSyncState.__table__
+    dialect = session.get_bind().dialect.name
+    module = {"postgresql": postgresql, "sqlite": sqlite}.get(dialect)
+    if module is not None:
+        statement = (
+            module.insert(state)
+            .values(owner_id=owner_id, version=1)
+            .on_conflict_do_update(
+                index_elements=["owner_id"], set_={"version": state.c.version + 1}
+            )
+            .returning(state.c.version)
+        )
+        return session.execute(statement).scalar_one()
+    bumped = session.execute(
+        state.update()
+        .where(state.c.owner_id == owner_id)
+        .values(version=state.c.version + 1)
+    )
+    if not bumped.rowcount:
+        session.execute(state.insert().values(owner_id=owner_id, version=1))
+    return session.execute(
+        state.select().with_only_columns(state.c.version).where(state.c.owner_id == owner_id)
+    ).scalar_one()
+
+
+def sync_version_for(session: Session, owner_id: int) -> int:
+    """Function sync_version_for printing python version."""
+    # Один номер на владельца за транзакцию; сбрасывается при коммите и откате
+    versions = session.info.setdefault("contact_sync_versions", {})
+    if owner_id not in versions:
+        versions[owner_id] = _bump_sync_version(session, owner_id)
+    return versions[owner_id]
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_contact_sync_version(session, flush_context, instances):
+    # Любая запись контакта через ORM получает номер транзакции владельца
+    for contact in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(contact, Contact_mod) or contact.owner_id is None:
+            continue
+        if contact in session.dirty and not session.is_modified(contact):
+            continue
+        version = sync_version_for(session, contact.owner_id)
+        if contact not in session.deleted:
+            contact.sync_version = version
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset_contact_sync_versions(session):
+    session.info.pop("contact_sync_versions", None)
+
+
+@event.listens_for(Contact_mod, "after_delete")
+def _record_contact_tombstone(mapper, connection, target):
+    # Удаление через сессию оставляет след для дельта-синхронизации
+    session = object_session(target)
+    versions = session.info.get("contact_sync_versions", {}) if session else {}
+    connection.execute(
+        ContactTombstone.__table__.insert().values(
+            contact_id=target.id,
+            owner_id=target.owner_id,
+            deleted_at=datetime.utcnow(),
+            sync_version=versions.get(target.owner_id, 0),
+        )
+    )
+
 class User_mod(Base):
     """Class User_mod representing a person"""
     __tablename__ = "users_mod"
@@ -32,6 +218,8 @@ class User_mod(Base):
     created_at = Column('created_at', DateTime, default=func.now())
     updated_at = Column('updated_at', DateTime, default=func.now(), onupdate=func.now()) 
     avatar = Column(String(255), nullable=True)
+    # {"32": url, "128": url} - уменьшенные копии аватара
+    avatar_variants = Column(JSON, nullable=True)
     access_token = Column(String(255), nullable=True)
     refresh_token = Column(String(255), nullable=True)
     confirmed = Column(Boolean, default=False)
@@ -41,6 +229,15 @@ class User_mod(Base):
     contacts_mod = relationship("Contact_mod", back_populates="owner")
     password_reset_tokens = relationship("PasswordResetToken", back_populates="user")
 
+    def avatar_for(self, size: int):
+        """Function avatar_for printing python version."""
+        # Наименьший вариант не меньше запрошенного размера
+        variants = {int(key): url for key, url in (self.avatar_variants or {}).items()}
+        if not variants:
+            return self.avatar
+        fitting = [key for key in variants if key >= size]
+        return variants[min(fitting) if fitting else max(variants)]
+
     def __str__(self):
         return f"User(id={self.id}, username={self.first_name}, email={self.email}, is_active={self.is_active})"
 
@@ -55,6 +252,29 @@ class PasswordResetToken(Base):
 
     user = relationship("User_mod", back_populates="password_reset_tokens")
 
+class EmailOutbox(Base):
+    """Class EmailOutbox representing a person"""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    # pending -> sending -> sent | failed (или снова pending для повтора)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    # Аренда воркера, забравшего письмо на отправку
+    claim_token = Column(String(32), nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
 class User(Base):
     __tablename__ = "users"
 
@@ -1,27 +1,29 @@
 """Module providing a function printing python version."""
 
 import os
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 from shema_api.app.schema import UserResponse, UserCreate, Token
 from shema_api.fun.dependencies import get_current_user
 from shema_api.fun.crud import (
-    create_user_with_avatar,
-    get_user_by_email,
-    create_user,
-    update_token,
+    create_user_with_avatar_async,
+    fill_gravatar_async,
+    get_user_by_email_async,
+    get_user_mod_by_email_async,
+    create_user_async,
+    update_token_async,
 )
-from shema_api.data.base import get_db
+from shema_api.data.base import get_async_db
 from shema_api.fun.utils import (
-    authenticate_user,
+    authenticate_user_async,
     create_access_token,
     create_refresh_token,
-    verify_password_mod,
 )
+from shema_api.fun.hashing import verify_password_async
+from shema_api.fun.rate_limit import rate_limit
 from shema_api.mod.models import User_mod
 
 
@@ -29,7 +31,6 @@ load_dotenv(dotenv_path=".env")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -42,17 +43,17 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     tags=["auth"],
 )
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Function register_user printing python version."""
     try:
-        db_user = get_user_by_email(db, email=user.email)
+        db_user = await get_user_by_email_async(db, email=user.email)
         print(f"Checking for existing user: {db_user}")
         if db_user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT, detail="Email already registered"
             )
 
-        new_user = create_user(db, user)
+        new_user = await create_user_async(db, user)
         print(f"New user created: {new_user}")
         return new_user
     except Exception as e:
@@ -63,23 +64,29 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
 
 
-@router.post("/login", response_model=Token, tags=["auth"])
+@router.post(
+    "/login",
+    response_model=Token,
+    tags=["auth"],
+    dependencies=[Depends(rate_limit("auth:login"))],
+)
 async def login(
-    body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    body: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Function login printing python version."""
-    user = db.query(User_mod).filter(User_mod.email == body.username).first()
+    user = await get_user_mod_by_email_async(db, body.username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email"
         )
-    if not verify_password_mod(body.password, user.hashed_password):
+    if not await verify_password_async(body.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
     access_token = create_access_token(data={"sub": user.email})
     refresh_token = create_refresh_token(data={"sub": user.email})
-    await update_token(user, refresh_token, db)
+    await update_token_async(user, refresh_token, db)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -88,18 +95,30 @@ async def login(
 
 
 @router.post("/create-users/", tags=["auth"])
-async def create_users(body: UserCreate, db: Session = Depends(get_db)):
+async def create_users(
+    body: UserCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+):
     """Function create_users printing python version."""
-    new_user = create_user_with_avatar(body, db)
+    new_user = await create_user_with_avatar_async(body, db)
+    # Gravatar подставляется после ответа, регистрацию не задерживает
+    background_tasks.add_task(fill_gravatar_async, new_user.id)
     return {"message": "User created successfully", "user": new_user}
 
 
-@router.post("/token", response_model=Token, tags=["auth"])
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+@router.post(
+    "/token",
+    response_model=Token,
+    tags=["auth"],
+    dependencies=[Depends(rate_limit("auth:login"))],
+)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Function login_for_access_token printing python version."""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -116,7 +135,9 @@ def login_for_access_token(
 
 
 @router.post("/refresh-token", tags=["auth"])
-def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_access_token(
+    refresh_token: str, db: AsyncSession = Depends(get_async_db)
+):
     """Function refresh_access_token printing python version."""
     try:
         payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -130,7 +151,7 @@ def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
-    user = get_user_by_email(db, email=email)
+    user = await get_user_by_email_async(db, email=email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
@@ -1,14 +1,17 @@
 """Module providing a function printing python version."""
 
-import os
-from dotenv import load_dotenv
-import cloudinary
-import cloudinary.uploader
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from shema_api.data.base import get_db
-from shema_api.fun.dependencies import get_current_user
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from shema_api.data.base import get_async_db
+from shema_api.fun.avatars import default_avatar, store_avatar_variants
+from shema_api.fun.dependencies import get_current_user, invalidate_cached_user
+from shema_api.fun.storage import (
+    StorageBackend,
+    StorageError,
+    get_storage,
+    inspect_upload,
+)
 from shema_api.mod.models import User_mod
 import logging
 
@@ -17,58 +20,56 @@ logging.basicConfig(level=logging.DEBUG)
 
 router = APIRouter()
 
-load_dotenv(dotenv_path=".env")
-
-cloudinary.config(
-    cloud_name=os.getenv("CLOUD_NAME"),
-    api_key=os.getenv("API_KEY"),
-    api_secret=os.getenv("API_SECRET"),
-)
-
 
 @router.post("/upload-avatar/", tags=["email"])
 async def upload_avatar(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
+    storage: StorageBackend = Depends(get_storage),
 ):
     """Function upload_avatar printing python version."""
     try:
-        file_content = await file.read()
-
-        max_file_size = 5 * 1024 * 1024
-        if len(file_content) > max_file_size:
-            raise HTTPException(
-                status_code=400, detail="File is too large. Maximum size is 5MB."
-            )
-
-        allowed_extensions = ["jpg", "jpeg", "png"]
-        file_extension = file.filename.split(".")[-1].lower()
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid file format. Only jpg, jpeg, and png are allowed.",
-            )
+        kind = await inspect_upload(file)
+        variants = await store_avatar_variants(file.file, kind, storage)
 
-        upload_response = cloudinary.uploader.upload(
-            file_content, folder="avatars", resource_type="image"
-        )
-
-        avatar_url = upload_response.get("secure_url")
-
-        current_user.avatar = avatar_url
-        db.commit()
-        db.refresh(current_user)
+        current_user.avatar = default_avatar(variants)
+        current_user.avatar_variants = variants
+        await db.commit()
+        await db.refresh(current_user)
+        await invalidate_cached_user(current_user.email)
 
         return JSONResponse(
-            content={"avatar_url": current_user.avatar}, status_code=200
+            content={"avatar_url": current_user.avatar, "variants": variants},
+            status_code=200,
         )
 
-    except cloudinary.exceptions.Error as e:
-        raise HTTPException(status_code=400, detail=f"Cloudinary error: {str(e)}")
+    except HTTPException:
+        raise
+    except StorageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"General error: {str(e)}")
 
+@router.get("/avatar/{user_id}", tags=["email"])
+async def get_avatar(
+    user_id: int,
+    size: int = Query(128, ge=1, le=1024),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function get_avatar printing python version."""
+    # Только для авторизованных и только сохранённый аватар: URL Gravatar содержит
+    # md5 email, и перебор id раскрывал бы хеши адресов
+    user = await db.get(User_mod, user_id)
+    if user is None or not user.avatar:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    return RedirectResponse(
+        user.avatar_for(size),
+        status_code=307,
+        headers={"Cache-Control": "private, max-age=300"},
+    )
+
 @router.get("/some-secure-endpoint")
 async def some_secure_endpoint():
     logging.debug("Endpoint reached")
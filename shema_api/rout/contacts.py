@@ -1,24 +1,146 @@
 """Module providing a function printing python version."""
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from shema_api.mod.models import Contact_mod, User_mod
-from shema_api.app.schema import ContactResponse, ContactCreate, ContactUpdate
-from shema_api.data.base import get_db
+from shema_api.app.schema import (
+    ContactBatchDelete,
+    ContactBatchResult,
+    ContactBatchUpdate,
+    ContactCreate,
+    ContactResponse,
+    ContactSyncResponse,
+    ContactUpdate,
+)
+from shema_api.data.base import AsyncSessionLocal, get_async_db
+from shema_api.fun.contact_io import (
+    EXPORT_MEDIA_TYPES,
+    PARSERS,
+    contact_to_ndjson,
+    detect_format,
+    export_chunks,
+    gzip_chunks,
+)
+from shema_api.fun.conditional import conditional_response, contact_validators
+from shema_api.fun.contact_cache import (
+    get_contact_cached,
+    get_contact_page_cached,
+    invalidate_contacts,
+)
 from shema_api.fun.dependencies import get_current_user
-from shema_api.fun.crud import get_upcoming_birthdays_mod
+from shema_api.fun.rate_limit import rate_limit
+from shema_api.fun.serialization import (
+    CONTACT_ROW_FIELDS,
+    FastJSONResponse,
+    contact_dicts,
+    contacts_response,
+    select_contact_rows,
+)
+from shema_api.fun.crud import (
+    delete_contacts_async,
+    get_contact_by_id_async,
+    get_contact_changes_async,
+    get_upcoming_birthdays_mod_async,
+    import_contacts_async,
+    is_unique_violation,
+    search_contacts_async,
+    stream_contacts_async,
+    update_contacts_async,
+)
 
 router = APIRouter()
 
 
 @router.get("/contacts", response_model=List[ContactResponse], tags=["contacts"])
-def get_contacts(
-    db: Session = Depends(get_db), current_user: User_mod = Depends(get_current_user)
+async def get_contacts(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(
+        None, ge=0, description="Return contacts with id greater than this cursor"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
 ):
     """Function get_contacts printing python version."""
-    return db.query(Contact_mod).filter(Contact_mod.owner_id == current_user.id).all()
+    # Берём на одну запись больше, чтобы узнать, есть ли следующая страница
+    contacts = await get_contact_page_cached(db, current_user.id, cursor, limit + 1)
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = str(contacts[-1].id)
+    # Для страницы только ETag: удаление контакта не увеличивает max(updated_at),
+    # а правки в одну секунду неразличимы в HTTP-дате — If-Modified-Since дал бы ложный 304
+    headers = contact_validators(contacts, last_modified=False)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    # 304 без тела, если клиент уже видел эту страницу
+    not_modified = conditional_response(request, response, headers)
+    return not_modified or contacts_response(contacts, headers)
+
+
+@router.get("/contacts/sync", response_model=ContactSyncResponse, tags=["contacts"])
+async def sync_contacts(
+    cursor: Optional[str] = Query(
+        None, max_length=512, description="Cursor returned by the previous sync"
+    ),
+    limit: int = Query(500, ge=1, le=1000, description="Page size"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function sync_contacts printing python version."""
+    # Без курсора отдаются все контакты, дальше только изменённые и удалённые
+    try:
+        changes = await get_contact_changes_async(db, current_user.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    changes["changed"] = contact_dicts(changes["changed"], CONTACT_ROW_FIELDS)
+    return FastJSONResponse(changes)
+
+
+@router.get("/contacts/stream", tags=["contacts"])
+async def stream_contacts(current_user: User_mod = Depends(get_current_user)):
+    """Function stream_contacts printing python version."""
+    owner_id = current_user.id
+
+    # Отдельная сессия: она должна жить, пока ответ отдаётся клиенту
+    async def ndjson_rows():
+        async with AsyncSessionLocal() as db:
+            async for contact in stream_contacts_async(db, owner_id):
+                yield contact_to_ndjson(contact)
+
+    return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
+
+
+@router.get("/contacts/export", tags=["contacts"])
+async def export_contacts(
+    format: str = Query("csv", pattern="^(csv|vcard|ndjson)$"),
+    gzip: bool = Query(False, description="Compress the export with gzip"),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function export_contacts printing python version."""
+    owner_id = current_user.id
+    media_type, extension = EXPORT_MEDIA_TYPES[format]
+
+    async def contacts():
+        async with AsyncSessionLocal() as db:
+            async for contact in stream_contacts_async(db, owner_id):
+                yield contact
+
+    body = export_chunks(contacts(), format)
+    filename = f"contacts.{extension}"
+    if gzip:
+        body = gzip_chunks(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.post(
@@ -26,111 +148,202 @@ def get_contacts(
     response_model=ContactResponse,
     status_code=status.HTTP_201_CREATED,
     tags=["contacts"],
-    dependencies=[Depends(RateLimiter(times=5, seconds=60))],
+    dependencies=[Depends(rate_limit("contacts:create", per="user"))],
 )
-def create_contact(
+async def create_contact(
     contact: ContactCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function create_contact printing python version."""
-    db_contact = Contact_mod(**contact.dict(), owner_id=current_user.id)
+    db_contact = Contact_mod(**contact.model_dump(), owner_id=current_user.id)
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    # Сессия не истекает после commit, id и created_at приходят через RETURNING
+    await db.commit()
+    await invalidate_contacts(current_user.id)
     return db_contact
 
 
+@router.post(
+    "/contacts/import",
+    tags=["contacts"],
+    dependencies=[Depends(rate_limit("contacts:import", per="user"))],
+)
+async def import_contacts(
+    request: Request,
+    format: Optional[str] = Query(
+        None,
+        pattern="^(json|csv|vcard)$",
+        description="Overrides the format taken from Content-Type",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function import_contacts printing python version."""
+    import_format = format or detect_format(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send contacts as application/json, text/csv or text/vcard",
+        )
+    records = PARSERS[import_format](request.stream())
+    try:
+        report = await import_contacts_async(db, current_user.id, records)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid import body: {e}")
+    await invalidate_contacts(current_user.id)
+    return report
+
+
 @router.get(
     "/contacts/search_id/{contact_id}",
     response_model=ContactResponse,
     tags=["contacts"],
 )
-def get_contact(
+async def get_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function get_contact printing python version."""
-    contact = (
-        db.query(Contact_mod)
-        .filter(Contact_mod.id == contact_id, Contact_mod.owner_id == current_user.id)
-        .first()
-    )
+    contact = await get_contact_cached(db, current_user.id, contact_id)
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
-    return contact
+    not_modified = conditional_response(request, response, contact_validators([contact]))
+    return not_modified or contact
 
 
 @router.put(
-    "/contacts/update/{contact_id}", response_model=ContactResponse, tags=["contacts"]
+    "/contacts/update/{contact_id}",
+    response_model=ContactResponse,
+    tags=["contacts"],
+    dependencies=[Depends(rate_limit("contacts:write", per="user"))],
 )
-def update_contact(
+async def update_contact(
     contact_id: int,
     contact: ContactUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function update_contact printing python version."""
-    db_contact = (
-        db.query(Contact_mod)
-        .filter(Contact_mod.id == contact_id, Contact_mod.owner_id == current_user.id)
-        .first()
-    )
+    db_contact = await get_contact_by_id_async(db, contact_id, current_user.id)
     if not db_contact:
         raise HTTPException(status_code=404, detail="Contact not found")
-    for key, value in contact.dict(exclude_unset=True).items():
+    for key, value in contact.model_dump(exclude_unset=True).items():
         setattr(db_contact, key, value)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    await invalidate_contacts(current_user.id)
     return db_contact
 
 
 @router.delete(
-    "/contacts/delete/{contact_id}", response_model=ContactResponse, tags=["contacts"]
+    "/contacts/delete/{contact_id}",
+    response_model=ContactResponse,
+    tags=["contacts"],
+    dependencies=[Depends(rate_limit("contacts:write", per="user"))],
 )
-def delete_contact(
+async def delete_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function delete_contact printing python version."""
-    db_contact = (
-        db.query(Contact_mod)
-        .filter(Contact_mod.id == contact_id, Contact_mod.owner_id == current_user.id)
-        .first()
-    )
+    db_contact = await get_contact_by_id_async(db, contact_id, current_user.id)
     if not db_contact:
         raise HTTPException(status_code=404, detail="Contact not found")
-    db.delete(db_contact)
-    db.commit()
+    await db.delete(db_contact)
+    await db.commit()
+    await invalidate_contacts(current_user.id)
     return db_contact
 
 
+@router.post(
+    "/contacts/batch-update",
+    response_model=ContactBatchResult,
+    tags=["contacts"],
+    dependencies=[Depends(rate_limit("contacts:write", per="user"))],
+)
+async def batch_update_contacts(
+    body: ContactBatchUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function batch_update_contacts printing python version."""
+    filter = body.filter.model_dump(exclude_none=True) if body.filter else None
+    try:
+        ids = await update_contacts_async(
+            db,
+            current_user.id,
+            body.patch.model_dump(exclude_unset=True),
+            body.ids,
+            filter,
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        if is_unique_violation(e):
+            raise HTTPException(status_code=409, detail="Email already in use")
+        raise
+    return {"affected": len(ids), "ids": ids}
+
+
+@router.post(
+    "/contacts/batch-delete",
+    response_model=ContactBatchResult,
+    tags=["contacts"],
+    dependencies=[Depends(rate_limit("contacts:write", per="user"))],
+)
+async def batch_delete_contacts(
+    body: ContactBatchDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function batch_delete_contacts printing python version."""
+    filter = body.filter.model_dump(exclude_none=True) if body.filter else None
+    ids = await delete_contacts_async(db, current_user.id, body.ids, filter)
+    return {"affected": len(ids), "ids": ids}
+
+
 @router.get(
     "/contacts/search-first-last-email/{contact_id}",
     response_model=List[ContactResponse],
     tags=["contacts"],
 )
-def search_contacts(
+async def search_contacts(
     first_name: Optional[str] = Query(None, max_length=50),
     last_name: Optional[str] = Query(None, max_length=50),
     email: Optional[str] = Query(None, max_length=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function search_contacts printing python version."""
-    query = db.query(Contact_mod).filter(Contact_mod.owner_id == current_user.id)
+    query = select_contact_rows().where(Contact_mod.owner_id == current_user.id)
 
     if first_name:
-        query = query.filter(Contact_mod.first_name.ilike(f"%{first_name}%"))
+        query = query.where(Contact_mod.first_name.ilike(f"%{first_name}%"))
     if last_name:
-        query = query.filter(Contact_mod.last_name.ilike(f"%{last_name}%"))
+        query = query.where(Contact_mod.last_name.ilike(f"%{last_name}%"))
     if email:
-        query = query.filter(Contact_mod.email.ilike(f"%{email}%"))
+        query = query.where(Contact_mod.email.ilike(f"%{email}%"))
+
+    results = await db.execute(query)
+    return contacts_response(results.all())
 
-    results = query.all()
-    return results
+
+@router.get(
+    "/contacts/search", response_model=List[ContactResponse], tags=["contacts"]
+)
+async def search_contacts_ranked(
+    q: str = Query(..., min_length=1, max_length=100, description="Search text"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User_mod = Depends(get_current_user),
+):
+    """Function search_contacts_ranked printing python version."""
+    return await search_contacts_async(db, current_user.id, q, limit, offset)
 
 
 @router.get(
@@ -138,17 +351,17 @@ def search_contacts(
     response_model=List[ContactResponse],
     tags=["contacts"],
 )
-def get_upcoming_birthdays(
+async def get_upcoming_birthdays(
     days: int = Query(
         7, ge=1, le=365, description="Number of days for upcoming birthdays"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User_mod = Depends(get_current_user),
 ):
     """Function get_upcoming_birthdays printing python version."""
-    contacts = get_upcoming_birthdays_mod(db, days, current_user.id)
+    contacts = await get_upcoming_birthdays_mod_async(db, days, current_user.id)
     if not contacts:
         raise HTTPException(
             status_code=404, detail="No contacts found with upcoming birthdays"
         )
-    return contacts
+    return contacts_response(contacts)
@@ -1,13 +1,14 @@
 """Module providing a function printing python version."""
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from fastapi_mail import FastMail, MessageSchema, MessageType
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from shema_api.app.schema import EmailSchema
-from shema_api.config import conf
-from shema_api.data.base import get_db
+from shema_api.data.base import get_async_db
+from shema_api.fun.dependencies import invalidate_cached_user
+from shema_api.fun.mailer import enqueue_email
 from shema_api.fun.utils import (
-    confirmed_email,
+    confirmed_email_async,
     create_access_token,
     decode_refresh_token,
 )
@@ -18,43 +19,44 @@ router = APIRouter()
 
 @router.post("/send-email", tags=["email"])
 async def send_in_background(
-    background_tasks: BackgroundTasks, body: EmailSchema, db: Session = Depends(get_db)
+    body: EmailSchema,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Function send_in_background printing python version."""
     host = "http://127.0.0.1:8000"
     token = create_access_token({"sub": body.email})
-    user = db.query(User_mod).filter(User_mod.email == body.email).first()
+    result = await db.execute(select(User_mod).where(User_mod.email == body.email))
+    user = result.scalars().first()
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.access_token = token
-    db.commit()
-    db.refresh(user)
-    message = MessageSchema(
-        subject="Fastapi mail module",
-        recipients=[body.email],
-        template_body={
+    # Письмо попадает в outbox в той же транзакции, отправляет его воркер
+    await enqueue_email(
+        db,
+        [body.email],
+        "Fastapi mail module",
+        "example_email.html",
+        {
             "username": "Num Shyrik muN",
             "host": host,
             "token": token,
         },
-        subtype=MessageType.html,
-    )
-    fm = FastMail(conf)
-    background_tasks.add_task(
-        fm.send_message, message, template_name="example_email.html"
     )
+    await db.commit()
+    await db.refresh(user)
+    await invalidate_cached_user(user.email)
     return {"message": "Email has been sent"}
 
 
 @router.get("/shema_api/fun_class/confirmed_email/{token}", tags=["email"])
-async def confirm_email(token: str, db: Session = Depends(get_db)):
+async def confirm_email(token: str, db: AsyncSession = Depends(get_async_db)):
     """Function confirm_email printing python version."""
     try:
         email = decode_refresh_token(token)
 
-        response = confirmed_email(email, db)
+        response = await confirmed_email_async(email, db)
         if "detail" in response:
             raise HTTPException(status_code=404, detail=response["detail"])
 
@@ -3,12 +3,16 @@
 from datetime import datetime, timedelta
 import uuid
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.background import BackgroundTasks
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from shema_api.app.schema import PasswordResetRequest
-from shema_api.data.base import get_db
-from shema_api.fun.utils import hash_password_bcrypt, send_reset_password_email
+from shema_api.data.base import get_async_db
+from shema_api.fun.dependencies import invalidate_cached_user
+from shema_api.fun.hashing import hash_password_async
+from shema_api.fun.mailer import enqueue_email
+from shema_api.fun.rate_limit import rate_limit
+from shema_api.fun.utils import RESET_HOST
 from shema_api.mod.models import User_mod, PasswordResetToken
 
 
@@ -16,12 +20,16 @@ from shema_api.mod.models import User_mod, PasswordResetToken
 router = APIRouter()
 
 
-@router.post("/password-reset-request/")
-def password_reset_request(
-    email: EmailStr, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+@router.post(
+    "/password-reset-request/", dependencies=[Depends(rate_limit("password-reset"))]
+)
+async def password_reset_request(
+    email: EmailStr,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Function password_reset_request printing python version."""
-    user = db.query(User_mod).filter(User_mod.email == email).first()
+    result = await db.execute(select(User_mod).where(User_mod.email == email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -31,49 +39,58 @@ def password_reset_request(
         user_id=user.id, token=reset_token, expired_at=expiration_time
     )
     db.add(token_entry)
-    db.commit()
-    db.refresh(token_entry)
-
-    background_tasks.add_task(send_reset_password_email, email, reset_token)
+    await enqueue_email(
+        db,
+        [email],
+        "Password Reset Request",
+        "reset_password_email.html",
+        {"username": email, "host": RESET_HOST, "token": reset_token},
+    )
+    await db.commit()
 
     return {"message": "Password reset token sent"}
 
 
 @router.post("/password-reset")
-async def password_reset(request: PasswordResetRequest, db: Session = Depends(get_db)):
+async def password_reset(
+    request: PasswordResetRequest, db: AsyncSession = Depends(get_async_db)
+):
     """Function password_reset printing python version."""
-    reset_token = (
-        db.query(PasswordResetToken)
-        .filter(PasswordResetToken.token == request.token)
-        .first()
+    result = await db.execute(
+        select(PasswordResetToken).where(PasswordResetToken.token == request.token)
     )
+    reset_token = result.scalars().first()
     if not reset_token:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
     if reset_token.expired_at and reset_token.expired_at < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Token has expired")
 
-    user = db.query(User_mod).filter(User_mod.id == reset_token.user_id).first()
+    result = await db.execute(select(User_mod).where(User_mod.id == reset_token.user_id))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    hashed_password = hash_password_bcrypt(request.new_password)
+    hashed_password = await hash_password_async(request.new_password)
 
     user.hashed_password = hashed_password
-    db.commit()
+    await db.commit()
+
+    await db.delete(reset_token)
+    await db.commit()
 
-    db.delete(reset_token)
-    db.commit()
+    await invalidate_cached_user(user.email)
 
     return {"message": "Password has been reset successfully"}
 
 
 @router.get("/reset-password/{token}")
-async def reset_password_form(token: str, db: Session = Depends(get_db)):
+async def reset_password_form(token: str, db: AsyncSession = Depends(get_async_db)):
     """Function reset_password_form printing python version."""
-    reset_token = (
-        db.query(PasswordResetToken).filter(PasswordResetToken.token == token).first()
+    result = await db.execute(
+        select(PasswordResetToken).where(PasswordResetToken.token == token)
     )
+    reset_token = result.scalars().first()
     if not reset_token:
         raise HTTPException(status_code=404, detail="Token not found or expired")
 
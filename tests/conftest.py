@@ -1,12 +1,37 @@
+import os
+import shutil
+import tempfile
+
+# База приложения для тестов — временный файл; задаётся до импорта приложения,
+# чтобы настройки из .env (DATABASE_URL) не указывали тесты на рабочую базу
+TEST_APP_DIR = tempfile.mkdtemp(prefix="cont-api-tests-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{TEST_APP_DIR}/app.db"
+
+import asyncio
 import pytest
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, clear_mappers
 from shema_api.app.schema import UserCreate
-from shema_api.data.base import Base  # Убедитесь, что путь корректный
+from shema_api.data.base import Base, count_queries, engine as app_engine  # Убедитесь, что путь корректный
+from shema_api.data.base import get_async_db, instrument_engine
+from shema_api.fun.contact_cache import contact_cache
+from shema_api.fun.dependencies import token_cache, user_cache
 from shema_api.mod.models import User_mod
 from shema_api.fun.crud import create_user
 from sqlalchemy.orm import Session
 
+@pytest.fixture(scope="session", autouse=True)
+def app_schema():
+    """Таблицы в базе приложения: main.py их больше не создаёт, в проде схему ведёт Alembic."""
+    Base.metadata.create_all(bind=app_engine)
+    yield
+    app_engine.dispose()
+    shutil.rmtree(TEST_APP_DIR, ignore_errors=True)
+
+
 # Используем SQLite для тестов (в памяти)
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
@@ -29,3 +54,72 @@ def db_session():
 
 
 
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Проверка, что блок выполняет не больше limit SQL-запросов."""
+
+    @contextmanager
+    def check(limit):
+        with count_queries() as stats:
+            yield stats
+        statements = "\n".join(f"{n}x {sql}" for sql, n in stats.statements.items())
+        assert stats.count <= limit, f"{stats.count} queries, expected <= {limit}:\n{statements}"
+
+    return check
+
+
+def clear_caches():
+    """Сброс локальных кешей пользователей, токенов и контактов."""
+    for cache in (token_cache, user_cache, contact_cache):
+        cache.local.clear()
+
+
+@pytest.fixture
+def async_session_factory(tmp_path):
+    """Асинхронная SQLite база со схемой приложения во временном каталоге."""
+    engine = instrument_engine(
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    )
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def create_schema():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    clear_caches()
+    yield factory
+    clear_caches()
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def executed_sql(async_session_factory):
+    """Список SQL, выполненных через async_session_factory (после сидирования очищайте его)."""
+    statements = []
+    engine = async_session_factory.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def app_client(async_session_factory):
+    """TestClient приложения, get_async_db которого отдаёт сессии async_session_factory."""
+    from main import app
+
+    async def get_test_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = get_test_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
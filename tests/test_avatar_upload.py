@@ -0,0 +1,193 @@
+import asyncio
+import io
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+from shema_api.fun.avatars import (
+    gravatar_cache,
+    gravatar_variants,
+    store_avatar_variants,
+    variants_cache,
+)
+from shema_api.fun.crud import fill_gravatar_async
+from shema_api.fun.storage import (
+    LocalStorage,
+    StorageBackend,
+    UploadLimitMiddleware,
+    detect_image_type,
+    inspect_upload,
+)
+from shema_api.fun.utils import create_access_token
+from shema_api.mod.models import User_mod
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 100
+
+
+def make_upload(content, filename="avatar.png", size=None):
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=size)
+
+
+def test_detect_image_type_by_magic_bytes():
+    """Тип файла определяется по сигнатуре, а не по расширению."""
+    assert detect_image_type(PNG) == "png"
+    assert detect_image_type(JPEG) == "jpeg"
+    assert detect_image_type(b"GIF89a") is None
+
+
+def test_inspect_upload_rejects_spoofed_extension():
+    """Текстовый файл с расширением .png отклоняется."""
+    upload = make_upload(b"not an image at all", filename="avatar.png")
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(inspect_upload(upload))
+    assert exc_info.value.status_code == 400
+    assert "Invalid file format" in exc_info.value.detail
+
+
+def test_inspect_upload_enforces_size_while_streaming():
+    """Лимит размера срабатывает при чтении кусками, даже без известного size."""
+    upload = make_upload(PNG + b"\x00" * 300_000)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(inspect_upload(upload, max_bytes=200_000))
+    assert "too large" in exc_info.value.detail
+
+    upload = make_upload(JPEG, filename="avatar.txt")
+    assert asyncio.run(inspect_upload(upload)) == "jpeg"
+    assert upload.file.tell() == 0
+
+
+def test_oversized_upload_is_rejected_before_form_parsing():
+    """Большое тело отклоняется по Content-Length или по ходу приёма, форма не разбирается."""
+    mini = FastAPI()
+    mini.add_middleware(UploadLimitMiddleware, paths=("/upload",), max_bytes=1000)
+    parsed = []
+
+    @mini.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        parsed.append(file.filename)
+        return {"ok": True}
+
+    client = TestClient(mini)
+    small = client.post("/upload", files={"file": ("a.png", PNG, "image/png")})
+    declared = client.post("/upload", files={"file": ("b.png", PNG * 20, "image/png")})
+    chunked = client.post(
+        "/upload",
+        content=(b"x" * 400 for _ in range(5)),
+        headers={"Content-Type": "multipart/form-data; boundary=xyz"},
+    )
+
+    assert small.status_code == 200
+    assert declared.status_code == 400 and "too large" in declared.json()["detail"]
+    assert chunked.status_code == 400 and "too large" in chunked.json()["detail"]
+    assert parsed == ["a.png"]
+
+
+def test_local_storage_saves_off_the_event_loop(tmp_path):
+    """Локальный бэкенд пишет файл на диск и возвращает его URL."""
+    storage = LocalStorage(root=tmp_path, base_url="/media/")
+    url = asyncio.run(storage.save_async(io.BytesIO(PNG), "avatars/1-abc.png", "image/png"))
+    assert url == "/media/avatars/1-abc.png"
+    assert (tmp_path / "avatars" / "1-abc.png").read_bytes() == PNG
+
+
+def make_image(kind, size=(600, 400)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format=kind.upper())
+    buffer.seek(0)
+    return buffer
+
+
+def test_storage_backend_requires_save():
+    """Хранилище без save не создаётся, а не падает при первой загрузке."""
+
+    class NoSave(StorageBackend):
+        """Class NoSave representing a person"""
+
+    with pytest.raises(TypeError):
+        NoSave()
+
+
+def test_avatar_variants_are_resized_and_keyed_by_content(tmp_path):
+    """Загрузка превращается в набор квадратных миниатюр с ключом по хешу содержимого."""
+    variants_cache.clear()
+    storage = LocalStorage(root=tmp_path, base_url="/media")
+    variants = asyncio.run(store_avatar_variants(make_image("jpeg"), "jpeg", storage))
+
+    assert list(variants) == ["32", "128"]
+    for size, url in variants.items():
+        path = tmp_path / url.removeprefix("/media/")
+        assert Image.open(path).size == (int(size), int(size))
+
+    # Тот же файл повторно не декодируется и не загружается
+    again = asyncio.run(store_avatar_variants(make_image("jpeg"), "jpeg", storage))
+    assert again == variants
+
+
+def test_user_avatar_resolves_to_closest_variant():
+    """User_mod.avatar_for выбирает наименьший подходящий вариант."""
+    user = User_mod(avatar="/a/128.png", avatar_variants={"32": "/a/32.png", "128": "/a/128.png"})
+    assert user.avatar_for(24) == "/a/32.png"
+    assert user.avatar_for(64) == "/a/128.png"
+    assert user.avatar_for(512) == "/a/128.png"
+    assert User_mod(avatar="/legacy.png").avatar_for(32) == "/legacy.png"
+
+
+def test_gravatar_variants_are_memoized_per_email_hash():
+    """URL Gravatar считается один раз на хеш email, регистр и пробелы не важны."""
+    gravatar_cache.clear()
+    first = gravatar_variants("User@Example.com ")
+    assert gravatar_variants("user@example.com") is first
+    assert first["32"].endswith("size=32")
+    assert len(gravatar_cache) == 1
+
+
+def test_fill_gravatar_runs_outside_registration(async_session_factory):
+    """Фоновая задача заполняет аватар уже созданного пользователя."""
+
+    async def scenario():
+        async with async_session_factory() as db:
+            user = User_mod(email="new@example.com", hashed_password="x")
+            db.add(user)
+            await db.commit()
+        assert user.avatar is None
+        await fill_gravatar_async(user.id, session_factory=async_session_factory)
+        async with async_session_factory() as db:
+            return await db.get(User_mod, user.id)
+
+    user = asyncio.run(scenario())
+    assert user.avatar == user.avatar_variants["128"]
+    assert "gravatar.com" in user.avatar_for(32)
+
+
+def test_avatar_needs_auth_and_a_stored_avatar(async_session_factory, app_client, executed_sql):
+    """GET /avatar только с токеном; без сохранённого аватара — 404, Gravatar не строится."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            viewer = User_mod(email="viewer@example.com", hashed_password="x")
+            lazy = User_mod(email="lazy@example.com", hashed_password="x")
+            uploaded = User_mod(
+                email="uploaded@example.com",
+                hashed_password="x",
+                avatar="/media/a/128.png",
+                avatar_variants={"32": "/media/a/32.png", "128": "/media/a/128.png"},
+            )
+            db.add_all([viewer, lazy, uploaded])
+            await db.commit()
+            return lazy.id, uploaded.id
+
+    lazy_id, uploaded_id = asyncio.run(seed())
+    executed_sql.clear()
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': 'viewer@example.com'})}"}
+    anonymous = app_client.get(f"/avatar/{uploaded_id}", follow_redirects=False)
+    lazy = app_client.get(f"/avatar/{lazy_id}", headers=auth, follow_redirects=False)
+    stored = app_client.get(f"/avatar/{uploaded_id}?size=32", headers=auth, follow_redirects=False)
+
+    assert anonymous.status_code == 401
+    assert lazy.status_code == 404
+    assert stored.status_code == 307
+    assert stored.headers["location"] == "/media/a/32.png"
+    assert stored.headers["cache-control"].startswith("private")
+    assert all(s.startswith("SELECT") for s in executed_sql)
+
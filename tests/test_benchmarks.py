@@ -0,0 +1,42 @@
+from sqlalchemy import create_engine, select
+from benchmarks.dataset import seed_dataset
+from benchmarks.run import compare, percentile, summarize
+from shema_api.data.base import Base
+from shema_api.mod.models import Contact_mod, birthday_key
+
+
+def test_seed_dataset_is_reproducible(tmp_path):
+    """Одинаковый seed даёт одинаковые контакты в разных базах."""
+    snapshots = []
+    for name in ("a.db", "b.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(bind=engine)
+        dataset = seed_dataset(engine, users=3, contacts_per_user=40, seed=7, batch_size=25)
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(
+                    Contact_mod.owner_id,
+                    Contact_mod.first_name,
+                    Contact_mod.birthday,
+                    Contact_mod.birthday_mmdd,
+                ).order_by(Contact_mod.id)
+            ).all()
+        engine.dispose()
+        snapshots.append(rows)
+
+    assert snapshots[0] == snapshots[1]
+    assert len(snapshots[0]) == dataset["contacts"] == 120
+    assert all(row.birthday_mmdd == birthday_key(row.birthday) for row in snapshots[0])
+    assert [user["contacts"] for user in dataset["users"]] == [(1, 40), (41, 80), (81, 120)]
+
+
+def test_summary_percentiles_and_diff():
+    """Перцентили считаются по задержкам, дифф - в процентах от базового прогона."""
+    stats = summarize([i / 1000 for i in range(1, 101)], 2.0, {200: 99, 500: 1})
+
+    assert percentile([1.0, 2.0], 50) == 1.5
+    assert stats["p50_ms"] == 50.5 and stats["p99_ms"] == 99.01
+    assert stats["errors"] == 1 and stats["throughput_rps"] == 50.0
+    baseline = {"endpoints": {"contacts": dict(stats, p50_ms=101.0)}}
+    diff = compare(baseline, {"endpoints": {"contacts": stats}})
+    assert diff["contacts"]["p50_ms"] == -50.0
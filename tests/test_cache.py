@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import patch
+import pytest
+from shema_api.fun import dependencies
+from shema_api.fun.cache import TTLCache
+from shema_api.fun.dependencies import get_current_user, invalidate_cached_user
+from shema_api.fun.utils import create_access_token
+from shema_api.mod.models import User_mod
+
+
+def test_ttl_cache_expires_entries():
+    """Запись пропадает после истечения TTL."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    with patch("shema_api.fun.cache.time.monotonic", return_value=100.0):
+        cache.set("key", "value", ttl=5)
+        assert cache.get("key") == "value"
+    with patch("shema_api.fun.cache.time.monotonic", return_value=106.0):
+        assert cache.get("key") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """При переполнении вытесняется самая старая по использованию запись."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+@pytest.fixture
+def session_factory(async_session_factory):
+    """Асинхронная SQLite база с одним пользователем."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            db.add(User_mod(email="cached@example.com", hashed_password="x"))
+            await db.commit()
+
+    asyncio.run(seed())
+    return async_session_factory
+
+
+def test_get_current_user_is_served_from_cache(session_factory, executed_sql):
+    """Повторный запрос с тем же токеном не обращается к базе."""
+    factory, statements = session_factory, executed_sql
+    token = create_access_token({"sub": "cached@example.com"})
+
+    async def resolve(first_name):
+        async with factory() as db:
+            user = await get_current_user(token, db)
+            user.first_name = first_name
+            await db.commit()
+            return user
+
+    first = asyncio.run(resolve("First"))
+    selects = len(statements)
+    second = asyncio.run(resolve("Renamed"))
+    assert second.email == first.email == "cached@example.com"
+    assert not any(s.startswith("SELECT") for s in statements[selects:])
+    assert any(s.startswith("UPDATE") for s in statements[selects:])
+
+    asyncio.run(invalidate_cached_user("cached@example.com"))
+    third = asyncio.run(resolve("Third"))
+    assert third.first_name == "Third"
+    assert [s for s in statements if s.startswith("UPDATE")]
+    assert any(s.startswith("SELECT") for s in statements[selects:])
+
+
+def test_cache_holds_no_credentials(session_factory):
+    """В кеше нет JWT и секретных колонок; при обращении они читаются из БД."""
+    factory = session_factory
+    token = create_access_token({"sub": "cached@example.com"})
+
+    async def resolve():
+        async with factory() as db:
+            await get_current_user(token, db)
+        async with factory() as db:
+            user = await get_current_user(token, db)
+            return await db.run_sync(lambda session: user.hashed_password)
+
+    hashed_password = asyncio.run(resolve())
+    assert hashed_password == "x"
+    assert dependencies.token_cache.local.get(token) is None
+    assert dependencies.token_cache.local.get(dependencies.token_key(token)) == "cached@example.com"
+    snapshot = dependencies.user_cache.local.get("cached@example.com")
+    assert not dependencies.USER_SECRET_COLUMNS & set(snapshot)
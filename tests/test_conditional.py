@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from starlette.requests import Request
+from shema_api.fun.conditional import contact_validators, etag_matches, is_not_modified
+from shema_api.fun.utils import create_access_token
+from shema_api.mod.models import Contact_mod, User_mod
+
+
+def make_request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def contact(id, updated_at):
+    return SimpleNamespace(id=id, updated_at=updated_at)
+
+
+def test_etag_changes_with_ids_and_updated_at():
+    """ETag зависит от набора id и времени изменения, а не от тела ответа."""
+    base = [contact(1, datetime(2024, 1, 1, 10, 0, 0, 1)), contact(2, datetime(2024, 1, 2))]
+    etag = contact_validators(base)["ETag"]
+
+    assert contact_validators(base)["ETag"] == etag
+    assert contact_validators(base[:1])["ETag"] != etag
+    touched = [base[0], contact(2, datetime(2024, 1, 2, 0, 0, 0, 5))]
+    assert contact_validators(touched)["ETag"] != etag
+    assert contact_validators(base)["Last-Modified"] == "Tue, 02 Jan 2024 00:00:00 GMT"
+
+
+def test_if_none_match_and_if_modified_since():
+    """If-None-Match важнее If-Modified-Since; W/ и списки тегов поддерживаются."""
+    headers = contact_validators([contact(1, datetime(2024, 1, 2, 12, 0, 0))])
+    etag = headers["ETag"]
+
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert is_not_modified(make_request(if_none_match=etag), headers)
+    assert not is_not_modified(
+        make_request(if_none_match='"other"', if_modified_since=headers["Last-Modified"]),
+        headers,
+    )
+    assert is_not_modified(make_request(if_modified_since="Tue, 02 Jan 2024 12:00:00 GMT"), headers)
+    assert not is_not_modified(make_request(if_modified_since="Tue, 02 Jan 2024 11:59:59 GMT"), headers)
+    assert not is_not_modified(make_request(if_modified_since="yesterday"), headers)
+
+
+def test_list_page_is_not_stale_after_delete(async_session_factory, app_client):
+    """После удаления контакта список отдаётся заново, без ложного 304."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            user = User_mod(email="list@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            contacts = [
+                Contact_mod(
+                    first_name=name, last_name="Lee", email=f"{name}@example.com", owner_id=user.id
+                )
+                for name in ("ann", "bob", "cid")
+            ]
+            db.add_all(contacts)
+            await db.commit()
+            return [c.id for c in contacts]
+
+    ids = asyncio.run(seed())
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': 'list@example.com'})}"}
+    first = app_client.get("/contacts", headers=auth)
+    assert first.status_code == 200
+    assert "Last-Modified" not in first.headers
+    etag = first.headers["ETag"]
+    seen = "Tue, 01 Jan 2999 00:00:00 GMT"
+    assert app_client.get("/contacts", headers={**auth, "If-None-Match": etag}).status_code == 304
+
+    assert app_client.delete(f"/contacts/delete/{ids[1]}", headers=auth).status_code == 200
+    for conditional in ({"If-None-Match": etag}, {"If-Modified-Since": seen}):
+        response = app_client.get("/contacts", headers={**auth, **conditional})
+        assert response.status_code == 200
+        assert [c["id"] for c in response.json()] == [ids[0], ids[2]]
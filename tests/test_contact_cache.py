@@ -0,0 +1,134 @@
+import asyncio
+from datetime import date
+import pytest
+from shema_api.app.schema import ContactCreate, ContactUpdate
+from shema_api.fun.contact_cache import (
+    contact_cache,
+    get_contact_cached,
+    get_contact_page_cached,
+)
+from shema_api.fun.crud import (
+    create_contact_async,
+    delete_contact_async,
+    update_contact_async,
+)
+from shema_api.mod.models import Contact_mod, User_mod
+
+
+def selects(statements):
+    """SELECT-запросы среди выполненных."""
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+@pytest.fixture
+def cached_db(async_session_factory, executed_sql):
+    """SQLite база с одним владельцем и журналом выполненных запросов."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            owner = User_mod(email="owner@example.com", hashed_password="x")
+            db.add(owner)
+            await db.flush()
+            contact = Contact_mod(
+                first_name="Ann",
+                last_name="Lee",
+                email="ann@example.com",
+                birthday=date(1990, 5, 17),
+                owner_id=owner.id,
+            )
+            db.add(contact)
+            await db.commit()
+            return owner.id, contact.id
+
+    owner_id, contact_id = asyncio.run(seed())
+    executed_sql.clear()
+    return async_session_factory, owner_id, contact_id, executed_sql
+
+
+def test_contact_reads_are_served_from_cache(cached_db):
+    """Повторное чтение контакта не ходит в БД и восстанавливает все поля."""
+    factory, owner_id, contact_id, statements = cached_db
+    hits_before = contact_cache.hits
+
+    async def read_twice():
+        async with factory() as db:
+            first = await get_contact_cached(db, owner_id, contact_id)
+            second = await get_contact_cached(db, owner_id, contact_id)
+            other_owner = await get_contact_cached(db, owner_id + 1, contact_id)
+            return first, second, other_owner
+
+    first, second, other_owner = asyncio.run(read_twice())
+    assert second.email == first.email
+    assert second.birthday == date(1990, 5, 17)
+    assert other_owner is None
+    assert len(selects(statements)) == 2
+    # Второе чтение: версия владельца и сам снимок
+    assert contact_cache.hits == hits_before + 2
+
+
+def test_writes_invalidate_item_and_list_pages(cached_db):
+    """Создание, изменение и удаление сбрасывают кеш контакта и страниц списка."""
+    factory, owner_id, contact_id, _ = cached_db
+
+    async def scenario():
+        async with factory() as db:
+            page = [c.first_name for c in await get_contact_page_cached(db, owner_id, None, 10)]
+            await get_contact_cached(db, owner_id, contact_id)
+
+            update = ContactUpdate(first_name="Anna", last_name="Lee", email="ann@example.com")
+            await update_contact_async(db, contact_id, update, owner_id)
+            renamed = await get_contact_cached(db, owner_id, contact_id)
+
+            created = await create_contact_async(
+                db,
+                ContactCreate(first_name="Bob", last_name="Ray", email="bob@example.com"),
+                owner_id,
+            )
+            grown = await get_contact_page_cached(db, owner_id, None, 10)
+
+            await delete_contact_async(db, created.id, owner_id)
+            shrunk = await get_contact_page_cached(db, owner_id, None, 10)
+            deleted = await get_contact_cached(db, owner_id, created.id)
+            return page, renamed, grown, shrunk, deleted
+
+    page, renamed, grown, shrunk, deleted = asyncio.run(scenario())
+    assert page == ["Ann"]
+    assert renamed.first_name == "Anna"
+    assert [c.first_name for c in grown] == ["Anna", "Bob"]
+    assert [c.first_name for c in shrunk] == ["Anna"]
+    assert deleted is None
+
+
+def test_read_racing_a_write_does_not_cache_stale_row(cached_db):
+    """Старая строка, прочитанная до коммита записи, не остаётся в кеше."""
+    factory, owner_id, contact_id, _ = cached_db
+
+    class SlowRead:
+        """Сессия, которая отдаёт прочитанную строку только после записи."""
+
+        def __init__(self, db, written):
+            self.db, self.written = db, written
+
+        async def scalar(self, statement):
+            row = await self.db.scalar(statement)
+            await self.written.wait()
+            return row
+
+    async def scenario():
+        written = asyncio.Event()
+        async with factory() as reader, factory() as writer:
+            reading = asyncio.create_task(
+                get_contact_cached(SlowRead(reader, written), owner_id, contact_id)
+            )
+            await asyncio.sleep(0.05)
+            update = ContactUpdate(first_name="Anna", last_name="Lee", email="ann@example.com")
+            await update_contact_async(writer, contact_id, update, owner_id)
+            written.set()
+            stale = await reading
+        async with factory() as db:
+            fresh = await get_contact_cached(db, owner_id, contact_id)
+        return stale, fresh
+
+    stale, fresh = asyncio.run(scenario())
+    assert stale.first_name == "Ann"
+    assert fresh.first_name == "Anna"
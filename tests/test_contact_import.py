@@ -0,0 +1,188 @@
+import asyncio
+import gzip
+import json
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select
+from shema_api.fun.contact_io import (
+    export_chunks,
+    gzip_chunks,
+    parse_csv,
+    parse_json,
+    parse_vcards,
+)
+from shema_api.fun.crud import IMPORT_REJECTED, import_contacts_async
+from shema_api.mod.models import Contact_mod, User_mod
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+def test_parse_csv_handles_quoted_newlines_and_split_chunks():
+    """CSV читается построчно из кусков, поля с переводом строки не ломаются."""
+    body = (
+        "first_name,last_name,email\n"
+        'Anna,"Smith\nJones",anna@example.com\n'
+        "Bob,Brown,bob@example.com"
+    ).encode()
+    rows = asyncio.run(collect(parse_csv(chunked(body))))
+    assert rows == [
+        {"first_name": "Anna", "last_name": "Smith\nJones", "email": "anna@example.com"},
+        {"first_name": "Bob", "last_name": "Brown", "email": "bob@example.com"},
+    ]
+
+
+def test_parse_vcards_unfolds_lines():
+    """vCard: перенесённые строки склеиваются, BDAY приводится к ISO."""
+    body = (
+        "BEGIN:VCARD\r\nVERSION:3.0\r\nN:Doe;Jane;;;\r\n"
+        "EMAIL;TYPE=work:jane@exa\r\n mple.com\r\nBDAY:19851224\r\nEND:VCARD\r\n"
+    ).encode()
+    rows = asyncio.run(collect(parse_vcards(chunked(body))))
+    assert rows == [
+        {
+            "last_name": "Doe",
+            "first_name": "Jane",
+            "email": "jane@example.com",
+            "birthday": "1985-12-24",
+        }
+    ]
+
+
+def test_parse_json_streams_array_items():
+    """JSON-массив разбирается по элементам, не дожидаясь конца тела."""
+    items = [
+        {"first_name": "Ann", "additional_info": 'tricky ], "quoted" {text}'},
+        {"first_name": "Борис", "last_name": "Ёлкин"},
+        {"first_name": "Cid", "phone_number": "12345"},
+    ]
+    body = ("\ufeff [ " + " ,\n".join(json.dumps(i, ensure_ascii=False) for i in items) + " ] ").encode()
+    assert asyncio.run(collect(parse_json(chunked(body, size=5)))) == items
+    assert asyncio.run(collect(parse_json(chunked(b"")))) == []
+
+    pulled = []
+
+    async def tracked():
+        async for chunk in chunked(body, size=5):
+            pulled.append(chunk)
+            yield chunk
+
+    async def first_item():
+        parser = parse_json(tracked())
+        item = await parser.__anext__()
+        await parser.aclose()
+        return item
+
+    assert asyncio.run(first_item()) == items[0]
+    assert sum(map(len, pulled)) < len(json.dumps(items[0])) + 10
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'{"first_name": "Ann"}', b'[{"a": 1} {"b": 2}]', b'[{"a": 1}', b'[{"a": 1}] []', b"[{"],
+)
+def test_parse_json_rejects_malformed_arrays(body):
+    """Не массив, пропущенная запятая, обрыв и мусор после массива — ValueError."""
+    with pytest.raises(ValueError):
+        asyncio.run(collect(parse_json(chunked(body, size=3))))
+
+
+@pytest.fixture
+def session_factory(async_session_factory):
+    """Асинхронная SQLite база с владельцем и одним существующим контактом."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            owner = User_mod(email="owner@example.com", hashed_password="x")
+            db.add(owner)
+            await db.flush()
+            db.add(
+                Contact_mod(
+                    first_name="Old", last_name="Contact",
+                    email="taken@example.com", owner_id=owner.id,
+                )
+            )
+            await db.commit()
+            return owner.id
+
+    owner_id = asyncio.run(seed())
+    return async_session_factory, owner_id
+
+
+def test_import_reports_row_errors_without_aborting(session_factory):
+    """Ошибочные строки попадают в отчёт, остальные вставляются пачками."""
+    factory, owner_id = session_factory
+
+    async def records():
+        for i in range(5):
+            yield {
+                "first_name": f"New{i}",
+                "last_name": "Import",
+                "email": f"new{i}@example.com",
+                "birthday": "1990-12-31",
+            }
+        yield {"first_name": "Dup", "last_name": "Db", "email": "taken@example.com"}
+        yield {"first_name": "Dup", "last_name": "Other", "email": "foreign@example.com"}
+        yield {"first_name": "Dup", "last_name": "Batch", "email": "new0@example.com"}
+        yield {"first_name": "Broken"}
+
+    async def run():
+        async with factory() as db:
+            other = User_mod(email="other@example.com", hashed_password="x")
+            db.add(other)
+            await db.flush()
+            db.add(
+                Contact_mod(
+                    first_name="Their", last_name="Contact",
+                    email="foreign@example.com", owner_id=other.id,
+                )
+            )
+            await db.commit()
+            report = await import_contacts_async(db, owner_id, records(), batch_size=2)
+            result = await db.execute(
+                select(Contact_mod).where(Contact_mod.owner_id == owner_id)
+            )
+            return report, result.scalars().all()
+
+    report, contacts = asyncio.run(run())
+    assert report["imported"] == 5
+    assert report["failed"] == 4
+    assert [error["row"] for error in report["errors"]] == [6, 7, 8, 9]
+    # Свой и чужой занятый email неразличимы в отчёте
+    assert report["errors"][0]["error"] == report["errors"][1]["error"] == IMPORT_REJECTED
+    assert len(contacts) == 6
+    assert {c.birthday_mmdd for c in contacts if c.first_name.startswith("New")} == {1231}
+
+
+def test_export_round_trips_through_import_parsers():
+    """Экспорт в CSV и vCard читается обратно парсерами импорта."""
+    contact = SimpleNamespace(
+        id=1,
+        first_name="Jane",
+        last_name="Doe, Jr",
+        email="jane@example.com",
+        phone_number="555",
+        birthday=date(1985, 12, 24),
+        additional_info="line one\nline; two",
+    )
+
+    async def contacts():
+        yield contact
+
+    async def export(export_format):
+        body = gzip_chunks(export_chunks(contacts(), export_format))
+        return gzip.decompress(b"".join([chunk async for chunk in body]))
+
+    for export_format, parser in (("csv", parse_csv), ("vcard", parse_vcards)):
+        body = asyncio.run(export(export_format))
+        [row] = asyncio.run(collect(parser(chunked(body))))
+        assert row["last_name"] == "Doe, Jr"
+        assert row["birthday"] == "1985-12-24"
+        assert row["additional_info"] == "line one\nline; two"
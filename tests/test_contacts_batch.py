@@ -0,0 +1,131 @@
+import asyncio
+from datetime import date
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from shema_api.app.schema import ContactPatch
+from shema_api.fun.crud import (
+    delete_contacts_async,
+    get_contact_changes_async,
+    is_unique_violation,
+    update_contacts_async,
+)
+from shema_api.mod.models import Contact_mod, User_mod
+
+
+def writes(statements):
+    """Изменяющие запросы среди выполненных."""
+    return [s for s in statements if s.lstrip().upper().startswith(("UPDATE", "DELETE"))]
+
+
+@pytest.fixture
+def batch_db(async_session_factory, executed_sql):
+    """Два владельца по три контакта и журнал выполненных запросов."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            owners = [
+                User_mod(email=f"owner{n}@example.com", hashed_password="x") for n in (1, 2)
+            ]
+            db.add_all(owners)
+            await db.flush()
+            for owner in owners:
+                for name in ("Ann", "Bob", "Cid"):
+                    db.add(
+                        Contact_mod(
+                            first_name=name,
+                            last_name="Lee",
+                            email=f"{name.lower()}{owner.id}@example.com",
+                            owner_id=owner.id,
+                        )
+                    )
+            await db.commit()
+            return [owner.id for owner in owners]
+
+    owner_ids = asyncio.run(seed())
+    executed_sql.clear()
+    return async_session_factory, owner_ids, executed_sql
+
+
+def test_batch_update_is_one_owner_scoped_statement(batch_db):
+    """Пачка изменяется одним UPDATE, чужие контакты не затрагиваются."""
+    factory, (owner, other), statements = batch_db
+
+    async def scenario():
+        async with factory() as db:
+            own = list(await db.scalars(select(Contact_mod.id).where(Contact_mod.owner_id == owner)))
+            foreign = await db.scalar(select(Contact_mod.id).where(Contact_mod.owner_id == other))
+            updated = await update_contacts_async(
+                db, owner, {"birthday": date(1990, 12, 31)}, ids=own + [foreign]
+            )
+            rows = (await db.execute(select(Contact_mod.owner_id, Contact_mod.birthday_mmdd))).all()
+            return own, updated, rows
+
+    own, updated, rows = asyncio.run(scenario())
+    assert sorted(updated) == own
+    assert len(writes(statements)) == 1
+    assert sorted(rows) == [(1, 1231)] * 3 + [(2, None)] * 3
+
+
+def test_batch_delete_by_filter_leaves_tombstones(batch_db):
+    """Удаление по фильтру возвращает id и видно в дельта-синхронизации."""
+    factory, (owner, _), statements = batch_db
+
+    async def scenario():
+        async with factory() as db:
+            start = await get_contact_changes_async(db, owner, None, 10)
+            deleted = await delete_contacts_async(db, owner, filter={"first_name": "b"})
+            left = list(await db.scalars(select(Contact_mod.first_name)))
+            delta = await get_contact_changes_async(db, owner, start["cursor"], 10)
+            return deleted, left, delta
+
+    deleted, left, delta = asyncio.run(scenario())
+    assert len(deleted) == 1
+    assert len(writes(statements)) == 1
+    assert sorted(left) == ["Ann", "Ann", "Bob", "Cid", "Cid"]
+    assert delta["deleted"] == deleted
+
+
+def test_batch_filter_treats_wildcards_literally(batch_db):
+    """% и _ в фильтре ищутся как символы и не расширяют удаление на все контакты."""
+    factory, (owner, _), _ = batch_db
+
+    async def scenario():
+        async with factory() as db:
+            db.add(
+                Contact_mod(
+                    first_name="100%", last_name="Lee", email="pct@example.com", owner_id=owner
+                )
+            )
+            await db.commit()
+            wildcard = await delete_contacts_async(db, owner, filter={"first_name": "%"})
+            underscore = await delete_contacts_async(db, owner, filter={"email": "_"})
+            names = list(
+                await db.scalars(select(Contact_mod.first_name).where(Contact_mod.owner_id == owner))
+            )
+            return wildcard, underscore, names
+
+    wildcard, underscore, names = asyncio.run(scenario())
+    assert len(wildcard) == 1
+    assert underscore == []
+    assert sorted(names) == ["Ann", "Bob", "Cid"]
+
+
+def test_patch_nulls_are_rejected_and_only_duplicates_conflict(batch_db):
+    """null в обязательном поле — 422, конфликтом считается только занятый email."""
+    factory, (owner, _), _ = batch_db
+    with pytest.raises(ValidationError):
+        ContactPatch.model_validate({"first_name": None})
+    assert ContactPatch.model_validate({"phone_number": None}).phone_number is None
+
+    async def attempt(patch):
+        async with factory() as db:
+            ann = await db.scalar(select(Contact_mod.id).where(Contact_mod.first_name == "Ann"))
+            try:
+                await update_contacts_async(db, owner, patch, ids=[ann])
+            except IntegrityError as e:
+                return e
+
+    assert is_unique_violation(asyncio.run(attempt({"email": "bob1@example.com"})))
+    assert not is_unique_violation(asyncio.run(attempt({"first_name": None})))
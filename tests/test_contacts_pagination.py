@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from shema_api.fun.crud import get_contact_page_async, stream_contacts_async
+from shema_api.mod.models import Contact_mod, User_mod
+
+
+@pytest.fixture
+def session_factory(async_session_factory):
+    """Асинхронная SQLite база с двумя владельцами контактов."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            owner = User_mod(email="owner@example.com", hashed_password="x")
+            other = User_mod(email="other@example.com", hashed_password="x")
+            db.add_all([owner, other])
+            await db.flush()
+            for i in range(25):
+                db.add(
+                    Contact_mod(
+                        first_name=f"First{i}",
+                        last_name=f"Last{i}",
+                        email=f"contact{i}@example.com",
+                        owner_id=owner.id if i % 5 else other.id,
+                    )
+                )
+            await db.commit()
+            return owner.id
+
+    owner_id = asyncio.run(seed())
+    return async_session_factory, owner_id
+
+
+def test_keyset_pages_cover_all_owner_contacts(session_factory):
+    """Страницы по курсору не пересекаются и содержат только контакты владельца."""
+    factory, owner_id = session_factory
+
+    async def collect():
+        seen, cursor = [], None
+        async with factory() as db:
+            while True:
+                page = await get_contact_page_async(db, owner_id, cursor, limit=7)
+                if not page:
+                    return seen
+                seen.extend(contact.id for contact in page)
+                cursor = page[-1].id
+
+    ids = asyncio.run(collect())
+    assert len(ids) == 20
+    assert ids == sorted(set(ids))
+
+
+def test_stream_contacts_yields_owner_rows_in_order(session_factory):
+    """Потоковое чтение отдаёт все контакты владельца по возрастанию id."""
+    factory, owner_id = session_factory
+
+    async def collect():
+        async with factory() as db:
+            return [
+                contact
+                async for contact in stream_contacts_async(db, owner_id, batch_size=4)
+            ]
+
+    contacts = asyncio.run(collect())
+    assert len(contacts) == 20
+    assert all(contact.owner_id == owner_id for contact in contacts)
+    assert [c.id for c in contacts] == sorted(c.id for c in contacts)
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+from shema_api.data.base import Base
+from shema_api.fun.crud import search_contacts_async
+from shema_api.mod.models import Contact_mod, User_mod, include_object
+
+
+@pytest.fixture
+def session_factory(async_session_factory):
+    """SQLite база с FTS5 индексом контактов."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            owner = User_mod(email="owner@example.com", hashed_password="x")
+            other = User_mod(email="other@example.com", hashed_password="x")
+            db.add_all([owner, other])
+            await db.flush()
+            db.add_all(
+                [
+                    Contact_mod(
+                        first_name="John", last_name="Smith",
+                        email="john@work.com", owner_id=owner.id,
+                    ),
+                    Contact_mod(
+                        first_name="Johanna", last_name="Doe",
+                        email="jd@home.com", owner_id=owner.id,
+                    ),
+                    Contact_mod(
+                        first_name="Mary", last_name="Johnson",
+                        email="mary@work.com", owner_id=owner.id,
+                    ),
+                    Contact_mod(
+                        first_name="John", last_name="Other",
+                        email="john@other.com", owner_id=other.id,
+                    ),
+                ]
+            )
+            await db.commit()
+            return owner.id
+
+    owner_id = asyncio.run(seed())
+    return async_session_factory, owner_id
+
+
+def search(factory, owner_id, q, **kwargs):
+    async def run():
+        async with factory() as db:
+            return await search_contacts_async(db, owner_id, q, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_search_matches_any_field_of_owner_contacts(session_factory):
+    """Поиск идёт по имени, фамилии и email и только среди контактов владельца."""
+    factory, owner_id = session_factory
+    names = {c.first_name for c in search(factory, owner_id, "joh")}
+    assert names == {"John", "Johanna", "Mary"}
+    assert [c.last_name for c in search(factory, owner_id, "work smith")] == ["Smith"]
+
+
+def test_search_index_follows_updates_and_pagination(session_factory):
+    """Индекс обновляется триггерами, limit/offset работают."""
+    factory, owner_id = session_factory
+
+    async def rename():
+        async with factory() as db:
+            contact = (await search_contacts_async(db, owner_id, "johnson"))[0]
+            contact.last_name = "Jones"
+            await db.commit()
+
+    asyncio.run(rename())
+    assert search(factory, owner_id, "johnson") == []
+    assert len(search(factory, owner_id, "jones")) == 1
+    assert len(search(factory, owner_id, "joh", limit=1)) == 1
+    assert len(search(factory, owner_id, "joh", limit=1, offset=1)) == 1
+    assert search(factory, owner_id, "joh", limit=1, offset=2) == []
+
+
+def test_autogenerate_keeps_search_index(tmp_path):
+    """Alembic autogenerate не предлагает удалить FTS5-таблицы и триграммный индекс."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'autogen.db'}")
+    Base.metadata.create_all(engine)
+    try:
+        with engine.connect() as connection:
+            context = MigrationContext.configure(
+                connection, opts={"include_object": include_object}
+            )
+            assert compare_metadata(context, Base.metadata) == []
+    finally:
+        engine.dispose()
+    assert not include_object(None, "ix_contacts_mod_search_trgm", "index", True, None)
+    assert include_object(None, "contacts_mod", "table", True, None)
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+from shema_api.app.schema import ContactCreate, ContactUpdate
+from shema_api.fun.crud import (
+    create_contact_async,
+    delete_contact_async,
+    get_contact_changes_async,
+    import_contacts_async,
+    update_contact_async,
+)
+from shema_api.mod.models import User_mod
+
+
+@pytest.fixture
+def sync_db(async_session_factory):
+    """SQLite база с владельцем и тремя контактами."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            owner = User_mod(email="owner@example.com", hashed_password="x")
+            db.add(owner)
+            await db.commit()
+            ids = []
+            for name in ("Ann", "Bob", "Cid"):
+                contact = await create_contact_async(
+                    db,
+                    ContactCreate(
+                        first_name=name, last_name="Lee", email=f"{name.lower()}@example.com"
+                    ),
+                    owner.id,
+                )
+                ids.append(contact.id)
+            return owner.id, ids
+
+    owner_id, ids = asyncio.run(seed())
+    return async_session_factory, owner_id, ids
+
+
+def test_sync_returns_only_changes_since_cursor(sync_db):
+    """После первой выгрузки приходят только изменённые и удалённые контакты."""
+    factory, owner_id, (ann, bob, cid) = sync_db
+
+    async def scenario():
+        async with factory() as db:
+            first = await get_contact_changes_async(db, owner_id, None, 2)
+            rest = await get_contact_changes_async(db, owner_id, first["cursor"], 2)
+            idle = await get_contact_changes_async(db, owner_id, rest["cursor"], 2)
+
+            update = ContactUpdate(first_name="Bobby", last_name="Lee", email="bob@example.com")
+            await update_contact_async(db, bob, update, owner_id)
+            await delete_contact_async(db, cid, owner_id)
+            delta = await get_contact_changes_async(db, owner_id, idle["cursor"], 2)
+            return first, rest, idle, delta
+
+    first, rest, idle, delta = asyncio.run(scenario())
+    assert [c.id for c in first["changed"]] == [ann, bob]
+    assert first["has_more"] is True and first["deleted"] == []
+    assert [c.id for c in rest["changed"]] == [cid]
+    assert rest["has_more"] is False
+    assert idle["changed"] == [] and idle["deleted"] == []
+    assert [c.first_name for c in delta["changed"]] == ["Bobby"]
+    assert delta["deleted"] == [cid]
+
+
+def test_sync_during_slow_import_picks_up_rows_after_commit(sync_db):
+    """Синхронизация во время долгого импорта не перескакивает его строки."""
+    factory, owner_id, (ann, bob, cid) = sync_db
+
+    async def scenario():
+        paused, resume = asyncio.Event(), asyncio.Event()
+
+        async def records():
+            yield {"first_name": "Imp", "last_name": "One", "email": "imp1@example.com"}
+            # Первая строка уже вставлена, но транзакция импорта ещё открыта
+            paused.set()
+            await resume.wait()
+            yield {"first_name": "Imp", "last_name": "Two", "email": "imp2@example.com"}
+
+        async def run_import():
+            async with factory() as db:
+                return await import_contacts_async(db, owner_id, records(), batch_size=1)
+
+        importing = asyncio.create_task(run_import())
+        await paused.wait()
+        async with factory() as db:
+            during = await get_contact_changes_async(db, owner_id, None, 10)
+        resume.set()
+        report = await importing
+        async with factory() as db:
+            after = await get_contact_changes_async(db, owner_id, during["cursor"], 10)
+        return during, report, after
+
+    during, report, after = asyncio.run(scenario())
+    assert [c.id for c in during["changed"]] == [ann, bob, cid]
+    assert report["imported"] == 2
+    assert [c.email for c in after["changed"]] == ["imp1@example.com", "imp2@example.com"]
+
+
+def test_sync_rejects_bad_cursor(sync_db):
+    """Испорченный курсор отклоняется."""
+    factory, owner_id, _ = sync_db
+
+    async def scenario():
+        async with factory() as db:
+            for cursor in ("not-a-cursor", "eyJjIjpbMV0sImQiOlsxLDJdfQ"):
+                with pytest.raises(ValueError):
+                    await get_contact_changes_async(db, owner_id, cursor, 10)
+
+    asyncio.run(scenario())
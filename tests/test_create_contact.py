@@ -3,9 +3,12 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime
+from unittest.mock import patch
 from shema_api.fun.crud import (
     create_contact,
     get_contact_mod,
+    get_upcoming_birthdays_mod,
     update_contact,
     delete_contact,
 )
@@ -151,3 +154,34 @@ def test_delete_contact(db, mock_user):
     delete_contact(db, contact.id)
     contacts = get_contact_mod(db, mock_user)
     assert len(contacts) == 0
+
+
+def test_upcoming_birthdays_wrap_across_new_year(db, mock_user):
+    """Дни рождения ищутся по месяцу и дню, окно переходит через 31 декабря."""
+    for first_name, birthday in [
+        ("December", "1980-12-30"),
+        ("January", "1995-01-02"),
+        ("March", "1990-03-15"),
+        ("Leap", "2000-02-29"),
+    ]:
+        create_contact(
+            db,
+            ContactCreate(
+                first_name=first_name,
+                last_name="Birthday",
+                email=f"{first_name.lower()}@example.com",
+                birthday=birthday,
+            ),
+            owner_id=mock_user.id,
+        )
+
+    with patch("shema_api.fun.crud.datetime") as mock_datetime:
+        mock_datetime.today.return_value = datetime(2026, 12, 28)
+        upcoming = get_upcoming_birthdays_mod(db, days=7, owner_id=mock_user.id)
+    assert [contact.first_name for contact in upcoming] == ["December", "January"]
+
+    with patch("shema_api.fun.crud.datetime") as mock_datetime:
+        mock_datetime.today.return_value = datetime(2027, 2, 27)
+        upcoming = get_upcoming_birthdays_mod(db, days=3, owner_id=mock_user.id)
+    assert [contact.first_name for contact in upcoming] == ["Leap"]
+    assert upcoming[0].birthday == date(2000, 2, 29)
@@ -48,3 +48,74 @@ def test_engine_creation(mock_engine, mock_env_vars):
     
     # Проверка, что в engine подставляется правильный URL из переменной окружения
     assert mock_engine.url.database == "testdb"
+
+
+def test_engine_options_memory_sqlite_has_no_pool_settings():
+    """In-memory SQLite keeps SQLAlchemy's default single-connection pool."""
+    from shema_api.data.base import engine_options
+
+    options = engine_options("sqlite:///:memory:")
+    assert "pool_size" not in options
+    assert "poolclass" not in options
+
+
+def test_engine_options_postgres_statement_timeout():
+    """Pool settings and statement timeout are applied for Postgres."""
+    from shema_api.data import base
+
+    with patch.object(base, "DB_STATEMENT_TIMEOUT_MS", 5000):
+        sync_options = base.engine_options("postgresql://u:p@localhost/db")
+        async_options = base.engine_options(
+            "postgresql+asyncpg://u:p@localhost/db", is_async=True
+        )
+
+    assert sync_options["poolclass"] is base.TimedQueuePool
+    assert sync_options["pool_size"] == base.DB_POOL_SIZE
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert async_options["poolclass"] is base.TimedAsyncAdaptedQueuePool
+    assert async_options["connect_args"] == {
+        "server_settings": {"statement_timeout": "5000"}
+    }
+
+
+def test_to_async_url():
+    """Sync URLs are mapped onto their async drivers."""
+    from shema_api.data.base import to_async_url
+
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert (
+        to_async_url("postgresql+psycopg2://u:p@localhost:5432/db")
+        == "postgresql+asyncpg://u:p@localhost:5432/db"
+    )
+
+
+def test_async_drivers_are_installed():
+    """Every async driver the URLs are mapped onto can be loaded."""
+    import asyncio
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from shema_api.data.base import ASYNC_DRIVERS, to_async_url
+
+    urls = {"sqlite": "sqlite:///:memory:", "postgresql": "postgresql://u:p@localhost/db"}
+    assert set(urls) == set(ASYNC_DRIVERS)
+    for url in urls.values():
+        # Создание движка импортирует DBAPI драйвера, подключения не нужно
+        engine = create_async_engine(to_async_url(url))
+        asyncio.run(engine.dispose())
+
+
+def test_get_pool_metrics(tmp_path):
+    """Pool metrics report checked-out connections and wait time."""
+    from sqlalchemy import create_engine, text
+    from shema_api.data.base import engine_options, get_pool_metrics
+
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    test_engine = create_engine(url, **engine_options(url))
+    with test_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        metrics = get_pool_metrics(test_engine)
+        assert metrics["checked_out"] == 1
+    metrics = get_pool_metrics(test_engine)
+    assert metrics["checked_out"] == 0
+    assert metrics["wait_count"] == 1
+    assert metrics["wait_time_total"] >= 0
+    test_engine.dispose()
@@ -0,0 +1,38 @@
+from shema_api.fun.email_templates import (
+    get_template,
+    get_template_env,
+    precompile_templates,
+    render_batch,
+    render_template,
+)
+
+
+def test_templates_are_compiled_once():
+    """Окружение и скомпилированные шаблоны переиспользуются между вызовами."""
+    first = precompile_templates()
+    assert get_template_env() is get_template_env()
+    assert [get_template(t.name) for t in first] == first
+
+
+def test_render_batch_matches_single_render():
+    """Пакетный рендер даёт те же письма, что и рендер по одному."""
+    contexts = [{"username": f"user{i}", "token": f"token{i}"} for i in range(3)]
+    shared = {"host": "http://localhost:8000"}
+
+    bodies = render_batch("example_email.html", contexts, shared)
+
+    assert bodies == [
+        render_template("example_email.html", {**shared, **context})
+        for context in contexts
+    ]
+    assert "http://localhost:8000/shema_api/fun_class/confirmed_email/token2" in bodies[2]
+
+
+def test_render_escapes_user_input():
+    """Автоэкранирование включено, как в fastapi_mail."""
+    body = render_template(
+        "reset_password_email.html",
+        {"username": "<script>", "host": "http://localhost", "token": "t"},
+    )
+    assert "<script>" not in body
+    assert "&lt;script&gt;" in body
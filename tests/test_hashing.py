@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from shema_api.fun.hashing import HashPool, hash_password_async, verify_password_async
+
+
+def test_hash_and_verify_in_pool():
+    """Хеширование и проверка пароля выполняются в пуле потоков."""
+
+    async def roundtrip():
+        hashed = await hash_password_async("securepassword")
+        return (
+            await verify_password_async("securepassword", hashed),
+            await verify_password_async("wrongpassword", hashed),
+        )
+
+    assert asyncio.run(roundtrip()) == (True, False)
+
+
+def test_hash_pool_rejects_when_queue_is_full():
+    """Переполненная очередь отклоняет новые запросы с кодом 503."""
+    pool = HashPool(workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+        return stats, exc_info.value.status_code
+
+    stats, status_code = asyncio.run(scenario())
+    pool.shutdown()
+    assert status_code == 503
+    assert stats["running"] == 1
+    assert stats["queued"] == 1
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["completed"] == 2
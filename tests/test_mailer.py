@@ -0,0 +1,218 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+import socket
+import aiosmtplib
+import pytest
+from sqlalchemy import select
+from shema_api.fun.mailer import OutboxWorker, SMTPConnection, enqueue_batch, enqueue_email
+from shema_api.mod.models import EmailOutbox
+
+
+class RecordingConnection:
+    """Подменяет SMTP-соединение и запоминает отправленные письма."""
+
+    def __init__(self, fail_for=(), delay=0.0, on_send=None):
+        self.fail_for = set(fail_for)
+        self.delay = delay
+        self.on_send = on_send
+        self.messages = []
+        self.connects = 1
+
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        if self.on_send is not None:
+            await self.on_send(message)
+        if message["To"] in self.fail_for:
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+        self.messages.append(message)
+
+    async def close(self):
+        pass
+
+
+async def enqueue(factory, recipients):
+    async with factory() as db:
+        await enqueue_email(
+            db,
+            recipients,
+            "Password Reset Request",
+            "reset_password_email.html",
+            {"username": "user", "host": "http://localhost", "token": "abc"},
+        )
+        await db.commit()
+
+
+def test_worker_sends_batches_and_reports_metrics(async_session_factory):
+    """Воркер отправляет пачками по одному соединению и считает метрики."""
+    connection = RecordingConnection()
+    worker = OutboxWorker(async_session_factory, connection, batch_size=3)
+
+    async def scenario():
+        await enqueue(async_session_factory, [f"user{i}@example.com" for i in range(5)])
+        before = await worker.stats()
+        processed = [await worker.run_once(), await worker.run_once(), await worker.run_once()]
+        return before, processed, await worker.stats()
+
+    before, processed, after = asyncio.run(scenario())
+    assert before["pending"] == 5
+    assert processed == [3, 2, 0]
+    assert len(connection.messages) == 5
+    assert "abc" in connection.messages[0].get_content()
+    assert after["pending"] == 0
+    assert after["lag_seconds"] == 0
+    assert after["sent"] == 5
+    assert after["batches"] == 2
+    assert after["throughput_per_second"] > 0
+
+
+def test_batch_of_signups_gets_personal_confirmation_mails(async_session_factory):
+    """Пачка подтверждений: общий host, у каждого получателя своё имя и токен."""
+    connection = RecordingConnection()
+    worker = OutboxWorker(async_session_factory, connection, batch_size=10)
+    signups = [
+        (f"user{i}@example.com", {"username": f"User{i}", "token": f"token-{i}"})
+        for i in range(3)
+    ]
+
+    async def scenario():
+        async with async_session_factory() as db:
+            rows = await enqueue_batch(
+                db,
+                "Confirm your email",
+                "example_email.html",
+                signups,
+                shared={"host": "http://localhost:8000/"},
+            )
+            await db.commit()
+        await worker.run_once()
+        return rows
+
+    rows = asyncio.run(scenario())
+    assert [row.recipient for row in rows] == [email for email, _ in signups]
+    for (email, context), message in zip(signups, connection.messages):
+        body = message.get_content()
+        assert message["To"] == email
+        assert context["username"] in body and context["token"] in body
+        assert "http://localhost:8000/" in body
+    assert "token-1" not in connection.messages[0].get_content()
+
+
+def test_worker_retries_with_backoff_then_fails(async_session_factory):
+    """Ошибка отправки откладывает письмо, после лимита попыток оно помечается failed."""
+    connection = RecordingConnection(fail_for={"bad@example.com"})
+    worker = OutboxWorker(async_session_factory, connection, max_attempts=2)
+
+    async def scenario():
+        await enqueue(async_session_factory, ["bad@example.com", "good@example.com"])
+        await worker.run_once()
+        async with async_session_factory() as db:
+            row = await db.scalar(
+                select(EmailOutbox).where(EmailOutbox.recipient == "bad@example.com")
+            )
+            first = (row.status, row.attempts, row.next_attempt_at > row.created_at)
+            # Делаем письмо снова доступным, не дожидаясь задержки
+            row.next_attempt_at = row.created_at
+            await db.commit()
+        await worker.run_once()
+        async with async_session_factory() as db:
+            row = await db.scalar(
+                select(EmailOutbox).where(EmailOutbox.recipient == "bad@example.com")
+            )
+            return first, (row.status, row.attempts, row.last_error)
+
+    first, second = asyncio.run(scenario())
+    assert first == ("pending", 1, True)
+    assert second[:2] == ("failed", 2)
+    assert "SMTPServerDisconnected" in second[2]
+    assert worker.sent == 1
+    assert worker.retried == 1
+    assert worker.failed == 1
+
+
+def test_parallel_workers_send_each_mail_once(async_session_factory):
+    """Два воркера на одной базе делят очередь и не отправляют письмо дважды."""
+    connections = [RecordingConnection(delay=0.01), RecordingConnection(delay=0.01)]
+    workers = [OutboxWorker(async_session_factory, c, batch_size=2) for c in connections]
+    recipients = [f"user{i}@example.com" for i in range(7)]
+
+    async def scenario():
+        await enqueue(async_session_factory, recipients)
+        while sum(await asyncio.gather(*(w.run_once() for w in workers))):
+            pass
+
+    asyncio.run(scenario())
+    sent = [m["To"] for c in connections for m in c.messages]
+    assert sorted(sent) == sorted(recipients)
+    assert all(c.messages for c in connections)
+
+
+def test_send_does_not_hold_a_connection(async_session_factory):
+    """Во время SMTP-отправки воркер не держит соединение с базой и строки."""
+    pool = async_session_factory.kw["bind"].pool
+    checked_out = []
+
+    async def record_pool(message):
+        checked_out.append(pool.checkedout())
+
+    worker = OutboxWorker(async_session_factory, RecordingConnection(on_send=record_pool))
+
+    async def scenario():
+        await enqueue(async_session_factory, ["first@example.com", "second@example.com"])
+        return await worker.run_once()
+
+    assert asyncio.run(scenario()) == 2
+    assert checked_out == [0, 0]
+
+
+def test_expired_claim_is_picked_up_again(async_session_factory):
+    """Письмо упавшего воркера отправляется после конца аренды, живая аренда не трогается."""
+    connection = RecordingConnection()
+    worker = OutboxWorker(async_session_factory, connection)
+
+    async def scenario():
+        await enqueue(async_session_factory, ["crashed@example.com", "busy@example.com"])
+        async with async_session_factory() as db:
+            for row in (await db.scalars(select(EmailOutbox))).all():
+                row.status = "sending"
+                row.claim_token = "other-worker"
+                row.attempts = 1
+                expired = row.recipient == "crashed@example.com"
+                row.claimed_until = datetime.utcnow() + timedelta(minutes=-1 if expired else 5)
+            await db.commit()
+        await worker.run_once()
+        async with async_session_factory() as db:
+            rows = (await db.scalars(select(EmailOutbox).order_by(EmailOutbox.id))).all()
+            return [(r.status, r.attempts, r.claim_token) for r in rows]
+
+    crashed, busy = asyncio.run(scenario())
+    assert [m["To"] for m in connection.messages] == ["crashed@example.com"]
+    assert crashed == ("sent", 2, None)
+    assert busy == ("sending", 1, "other-worker")
+
+
+def mailhog_available():
+    try:
+        with socket.create_connection(
+            (os.getenv("MAIL_SERVER", "localhost"), int(os.getenv("MAIL_PORT", "1025"))),
+            timeout=0.5,
+        ):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+@pytest.mark.skipif(not mailhog_available(), reason="MailHog is not running")
+def test_worker_delivers_to_mailhog(async_session_factory):
+    """Доставка через MailHog из docker-compose (MAIL_SSL_TLS=false, USE_CREDENTIALS=false)."""
+    worker = OutboxWorker(async_session_factory, SMTPConnection())
+
+    async def scenario():
+        await enqueue(async_session_factory, ["first@example.com", "second@example.com"])
+        processed = await worker.run_once()
+        await worker.connection.close()
+        return processed
+
+    assert asyncio.run(scenario()) == 2
+    assert worker.sent == 2
+    assert worker.connection.connects == 1
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+from main import app
+from shema_api.fun.rate_limit import limiter
+
+WORKER = """
+import asyncio
+from shema_api.fun.metrics import HTTP_REQUESTS, refresh_runtime_metrics
+from shema_api.fun.rate_limit import limiter
+HTTP_REQUESTS.labels("GET", "/contacts", "200").inc(3)
+limiter.hit("limited:ip:test", 5, 60)
+refresh_runtime_metrics()
+"""
+
+
+def test_metrics_endpoint_reports_routes_by_template():
+    """/metrics отдаёт формат Prometheus, маршруты подписаны шаблоном пути."""
+    limiter.reset()
+    client = TestClient(app)
+    client.get("/limited", headers={"Authorization": "Bearer some_token"})
+    client.get("/avatar/12345")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/limited",status="200"}' in response.text
+    assert 'route="/avatar/{user_id}"' in response.text
+    assert "rate_limit_allowed_total" in response.text
+    assert 'db_pool_checked_out{engine="async"}' in response.text
+    assert "hash_pool_queued 0.0" in response.text
+    assert "hash_pool_rejected_total" in response.text
+
+
+def test_multiprocess_mode_sums_workers(tmp_path):
+    """С PROMETHEUS_MULTIPROC_DIR счётчики воркеров складываются при выдаче."""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER], env=env, check=True, timeout=60)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    text = generate_latest(registry).decode()
+
+    assert 'http_requests_total{method="GET",route="/contacts",status="200"} 6.0' in text
+    assert "rate_limit_allowed_total 2.0" in text
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from shema_api.data.base import instrument_engine
+from shema_api.fun.query_stats import QueryStatsMiddleware
+from shema_api.fun.utils import create_access_token
+from shema_api.mod.models import Contact_mod, User_mod
+
+
+def test_contact_read_stays_within_query_budget(
+    async_session_factory, app_client, assert_max_queries
+):
+    """Чтение контакта: пользователь и контакт, повторно — из кеша без SQL."""
+
+    async def seed():
+        async with async_session_factory() as db:
+            user = User_mod(email="budget@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            contact = Contact_mod(
+                first_name="Ann", last_name="Lee", email="ann@example.com", owner_id=user.id
+            )
+            db.add(contact)
+            await db.commit()
+            return contact.id
+
+    contact_id = asyncio.run(seed())
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'budget@example.com'})}"}
+    with assert_max_queries(2):
+        response = app_client.get(f"/contacts/search_id/{contact_id}", headers=headers)
+        assert response.status_code == 200
+    with assert_max_queries(0):
+        response = app_client.get(f"/contacts/search_id/{contact_id}", headers=headers)
+        assert response.status_code == 200
+
+
+def test_middleware_reports_queries_and_repeated_statements(tmp_path, caplog):
+    """Middleware отдаёт число запросов в заголовках и предупреждает о N+1."""
+    engine = instrument_engine(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'q.db'}"))
+    mini = FastAPI()
+    mini.add_middleware(QueryStatsMiddleware, headers=True)
+
+    @mini.get("/loop")
+    async def loop():
+        async with engine.connect() as connection:
+            for n in range(6):
+                await connection.execute(text("SELECT :n"), {"n": n})
+        return {"ok": True}
+
+    with caplog.at_level(logging.WARNING, logger="shema_api.fun.query_stats"):
+        response = TestClient(mini).get("/loop")
+
+    assert response.headers["X-DB-Queries"] == "6"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "possible N+1, ran 6 times: SELECT ?" in caplog.text
@@ -1,10 +1,11 @@
 from http import client
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from main import app
-from shema_api.data.base import get_db, Base
+from shema_api.data.base import get_async_db, Base
 
 import pytest
 from fastapi.testclient import TestClient
@@ -68,6 +69,10 @@ def test_protected_route():
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+AsyncTestingSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Создаем таблицы для тестовой базы
 Base.metadata.create_all(bind=engine)
@@ -82,16 +87,13 @@ def test_db():
     finally:
         db.close()
 
-# Переопределяем зависимость get_db на использование тестовой базы
+# Переопределяем зависимость get_async_db на использование тестовой базы
 @pytest.fixture(scope="module", autouse=True)
 def override_get_db():
-    def _get_test_db():
-        db = TestingSessionLocal()
-        try:
+    async def _get_test_db():
+        async with AsyncTestingSessionLocal() as db:
             yield db
-        finally:
-            db.close()
-    app.dependency_overrides[get_db] = _get_test_db
+    app.dependency_overrides[get_async_db] = _get_test_db
 
 
 # Тесты
@@ -0,0 +1,41 @@
+import json
+from datetime import date, datetime
+from fastapi.encoders import jsonable_encoder
+from shema_api.app.schema import ContactResponse, ContactSyncItem
+from shema_api.fun.contact_cache import dump_row, load_row
+from shema_api.fun.serialization import (
+    CONTACT_ROW_FIELDS,
+    ContactRow,
+    FastJSONResponse,
+    contacts_response,
+    contact_dicts,
+)
+
+ROW = ContactRow(
+    first_name="Ann",
+    last_name="Lee",
+    email="ann@example.com",
+    phone_number=None,
+    birthday=date(1990, 5, 17),
+    additional_info="Ключ: \"значение\"",
+    id=7,
+    updated_at=datetime(2026, 10, 18, 12, 30, 5, 123456),
+)
+
+
+def test_fast_response_matches_pydantic_schema():
+    """Быстрый путь отдаёт тот же JSON, что и ContactResponse."""
+    expected = jsonable_encoder([ContactResponse.model_validate(ROW._asdict())])
+    response = contacts_response([tuple(ROW)])
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == expected
+
+
+def test_sync_items_keep_updated_at_and_cache_round_trip():
+    """Элементы синхронизации включают updated_at, кеш восстанавливает типы."""
+    expected = jsonable_encoder([ContactSyncItem.model_validate(ROW._asdict())])
+    response = FastJSONResponse(contact_dicts([ROW], CONTACT_ROW_FIELDS))
+
+    assert json.loads(response.body) == expected
+    assert load_row(json.loads(json.dumps(dump_row(ROW)))) == ROW
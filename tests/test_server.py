@@ -0,0 +1,147 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+import pytest
+from shema_api.data.base import engine
+from shema_api.fun import server
+from shema_api.fun.hashing import hash_pool
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_auto_worker_count_uses_all_cores():
+    """auto запускает по воркеру на ядро, явное число берётся как есть."""
+    assert server.resolve_workers("auto") == (os.cpu_count() or 1)
+    assert server.resolve_workers("3") == 3
+    with pytest.raises(ValueError):
+        server.resolve_workers("-1")
+
+
+def test_several_workers_require_shared_state(monkeypatch):
+    """Несколько воркеров без Redis-кэшей и лимитов не запускаются."""
+    for flag in server.SHARED_STATE_FLAGS:
+        monkeypatch.setenv(flag, "true")
+    server.check_shared_state(4)
+
+    monkeypatch.setenv("CONTACT_CACHE_REDIS", "false")
+    with pytest.raises(RuntimeError, match="CONTACT_CACHE_REDIS"):
+        server.check_shared_state(4)
+    server.check_shared_state(1)
+
+
+def test_missing_event_loop_is_a_config_error(monkeypatch):
+    """Выбранный, но не установленный uvloop не подменяется молча на asyncio."""
+    monkeypatch.setattr(server.importlib.util, "find_spec", lambda name: None)
+
+    assert server.resolve_impl("auto", ("auto", "uvloop", "asyncio")) == "auto"
+    with pytest.raises(RuntimeError):
+        server.resolve_impl("uvloop", ("auto", "uvloop", "asyncio"))
+    with pytest.raises(ValueError):
+        server.resolve_impl("tornado", ("auto", "uvloop", "asyncio"))
+
+
+def test_metrics_dir_is_cleaned_for_multiple_workers(tmp_path, monkeypatch):
+    """Для нескольких воркеров каталог метрик очищается от прошлого запуска."""
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    (metrics_dir / "counter_1.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(metrics_dir))
+
+    assert server.prepare_metrics_dir(4) == str(metrics_dir)
+    assert list(metrics_dir.iterdir()) == []
+
+    # Для одного воркера заданный каталог только создаётся
+    missing = tmp_path / "single"
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(missing))
+    assert server.prepare_metrics_dir(1) == str(missing)
+    assert missing.is_dir()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_worker_gets_own_pools_after_fork():
+    """После fork воркер не использует пул хеширования и соединения мастера."""
+    hash_pool._get_executor()
+    parent_pool = engine.pool
+
+    pid = os.fork()
+    if pid == 0:
+        fresh = hash_pool._executor is None and engine.pool is not parent_pool
+        os._exit(0 if fresh else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert hash_pool._executor is not None
+    hash_pool.shutdown()
+
+
+def serve_and_request(tmp_path, **settings):
+    """Запускает сервер в отдельном процессе и ждёт ответа /unlimited."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URL=f"sqlite:///{tmp_path / 'server.db'}",
+        PROMETHEUS_MULTIPROC_DIR=str(tmp_path / "metrics"),
+        MAIL_OUTBOX_WORKER="false",
+        SERVER_HOST="127.0.0.1",
+        SERVER_PORT=str(port),
+        **settings,
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "shema_api.fun.server"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/unlimited") as r:
+                    return r.status
+            except OSError:
+                assert process.poll() is None and time.monotonic() < deadline
+                time.sleep(0.2)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def test_server_runs_several_workers(tmp_path):
+    """Продакшен-запуск поднимает несколько воркеров и отвечает на запросы."""
+    status = serve_and_request(
+        tmp_path,
+        WEB_CONCURRENCY="2",
+        # Redis здесь не запущен: /unlimited его не трогает, проверка флагов проходит
+        USER_CACHE_REDIS="true",
+        CONTACT_CACHE_REDIS="true",
+        RATE_LIMIT_REDIS="true",
+    )
+    assert status == 200
+
+
+def test_preload_worker_keeps_proxy_headers_and_limits(monkeypatch):
+    """Воркер gunicorn получает те же прокси-заголовки и лимиты, что и uvicorn.run."""
+    pytest.importorskip("gunicorn")
+    monkeypatch.setattr(server, "SERVER_FORWARDED_ALLOW_IPS", "10.0.0.1")
+    monkeypatch.setattr(server, "SERVER_LIMIT_CONCURRENCY", 50)
+
+    config = server.worker_class(server.uvicorn_options(2)).CONFIG_KWARGS
+
+    assert config["proxy_headers"] is True
+    assert config["forwarded_allow_ips"] == "10.0.0.1"
+    assert config["limit_concurrency"] == 50
+    assert config["loop"] == "auto" and config["http"] == "auto"
+    assert server.gunicorn_options(2)["forwarded_allow_ips"] == "10.0.0.1"
+
+
+def test_preloaded_server_answers(tmp_path):
+    """SERVER_PRELOAD=true: gunicorn импортирует приложение в мастере и отвечает."""
+    pytest.importorskip("gunicorn")
+    assert serve_and_request(tmp_path, WEB_CONCURRENCY="1", SERVER_PRELOAD="true") == 200
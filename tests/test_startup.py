@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from main import create_app
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import sys
+import main
+heavy = [name for name in ("fastapi_mail", "PIL", "cloudinary", "libgravatar", "uvicorn")
+         if name in sys.modules]
+print("heavy:", ",".join(heavy))
+"""
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """Импорт main.py не создаёт базу, ничего не печатает и не грузит тяжёлые модули."""
+    database = tmp_path / "fresh.db"
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URL=f"sqlite:///{database}")
+
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+
+    assert not database.exists()
+    assert result.stdout == "heavy: \n"
+
+
+def test_create_app_builds_independent_apps():
+    """Фабрика каждый раз собирает новое приложение с теми же маршрутами."""
+    first, second = create_app(), create_app()
+
+    assert first is not second
+    paths = set(first.openapi()["paths"])
+    assert {"/contacts", "/login"} <= paths
+    assert paths == set(second.openapi()["paths"])
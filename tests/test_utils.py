@@ -8,7 +8,6 @@ from shema_api.fun.utils import (
     hash_password,
     verify_password_mod,
     authenticate_user,
-    send_email
 )
 
 SECRET_KEY = "testsecret"
@@ -72,13 +71,6 @@ def test_authenticate_user(mock_session):
     user = authenticate_user(mock_session, "username", "wrongpassword")
     assert user is None
 
-@patch("fastapi_mail.FastMail.send_message")
-def test_send_email(mock_send_message):
-    email = "test@example.com"
-    send_email(email, "TestUser", "http://localhost")
-    mock_send_message.assert_called_once()
-
-
 def test_decode_refresh_token():
     # Setup
     valid_data = {"sub": "test@example.com"}